@@ -0,0 +1,16 @@
+# accounts/api/pagination.py
+
+from rest_framework.pagination import CursorPagination
+
+
+class PortfolioCursorPagination(CursorPagination):
+    """
+    Portfólio do mais recente para o mais antigo. O cursor guarda a
+    posição (created_at), então cada página é uma consulta por índice,
+    sem OFFSET, e uploads novos não deslocam as páginas seguintes.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size = 24
+    page_size_query_param = "page_size"
+    max_page_size = 100
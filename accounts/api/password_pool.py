@@ -0,0 +1,85 @@
+# accounts/api/password_pool.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.contrib.auth import user_login_failed
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password, verify_password
+
+from rest_framework import exceptions
+
+from accounts.models import User
+
+
+# -------------------------------------------------------------------
+# 1. POOL LIMITADO PARA O HASH DE SENHA
+# -------------------------------------------------------------------
+# O PBKDF2 consome centenas de ms de CPU por tentativa. Em vez de cada
+# worker calcular o hash livremente, todas as verificações passam por
+# um pool com número fixo de threads e uma fila de tamanho limitado.
+# Quando a fila enche, o login é recusado com 429 sem calcular nada.
+HASH_WORKERS = getattr(settings, "LOGIN_HASH_WORKERS", 4)
+HASH_QUEUE_DEPTH = getattr(settings, "LOGIN_HASH_QUEUE_DEPTH", 16)
+HASH_TIMEOUT = getattr(settings, "LOGIN_HASH_TIMEOUT", 10)
+
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="login-hash")
+_slots = threading.BoundedSemaphore(HASH_WORKERS + HASH_QUEUE_DEPTH)
+
+
+class LoginBusy(exceptions.Throttled):
+    default_detail = "Muitas tentativas de login em andamento. Tente novamente em instantes."
+
+
+def run_hash(func, *args):
+    """
+    Executa `func(*args)` no pool de hash e aguarda o resultado.
+    Levanta LoginBusy se não houver vaga na fila.
+    """
+    if not _slots.acquire(blocking=False):
+        raise LoginBusy(wait=1)
+
+    try:
+        future = _executor.submit(func, *args)
+    except BaseException:
+        _slots.release()
+        raise
+
+    future.add_done_callback(lambda _f: _slots.release())
+    try:
+        return future.result(timeout=HASH_TIMEOUT)
+    except TimeoutError:
+        raise LoginBusy(wait=1)
+
+
+# -------------------------------------------------------------------
+# 2. AUTENTICAÇÃO (e-mail + senha)
+# -------------------------------------------------------------------
+def authenticate_offloaded(request, email, password):
+    """
+    Equivalente ao ModelBackend.authenticate, mas com o hash rodando no
+    pool. A busca do usuário e a eventual atualização do hash continuam
+    na thread da requisição (mesma conexão/transação do banco).
+    """
+    try:
+        user = User._default_manager.get_by_natural_key(email)
+    except User.DoesNotExist:
+        # Mesmo custo de CPU de uma senha errada (evita enumeração por tempo)
+        run_hash(make_password, password)
+        user = None
+    else:
+        is_correct, must_update = run_hash(verify_password, password, user.password)
+        if not is_correct or not ModelBackend().user_can_authenticate(user):
+            user = None
+        elif must_update:
+            user.set_password(password)
+            user.save(update_fields=["password"])
+
+    if user is None:
+        user_login_failed.send(
+            sender=__name__,
+            credentials={"username": email},
+            request=request,
+        )
+    return user
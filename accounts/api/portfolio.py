@@ -0,0 +1,87 @@
+# accounts/api/portfolio.py
+
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from rest_framework import exceptions
+
+from accounts.models import PortfolioItem
+from app_servicos.videos import METADATA, video_info
+from vagali_project.fastpath import file_url
+
+
+PREVIEW_PARAM = "portfolio_preview"
+MAX_PREVIEW = 12
+
+# colunas usadas na representação de um item
+ITEM_COLUMNS = ("id", "file", "is_video", "created_at", *METADATA)
+
+
+def portfolio_item(item_id, file, is_video, created_at, *video):
+    """Mesmo formato do endpoint /accounts/portfolio/ (`video`: app_servicos/videos.py)."""
+    return {
+        "id": item_id,
+        "file": file_url(file),
+        "is_video": is_video,
+        "created_at": created_at.isoformat(),
+        "video": video_info(*video),
+    }
+
+
+def preview_limit(request):
+    """N de ?portfolio_preview=N (0 = sem prévia), limitado a MAX_PREVIEW."""
+    raw = request.query_params.get(PREVIEW_PARAM) if request is not None else None
+    if not raw:
+        return 0
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise exceptions.ValidationError({PREVIEW_PARAM: "Informe um número inteiro."})
+    if limit < 0:
+        raise exceptions.ValidationError({PREVIEW_PARAM: "Informe um número positivo."})
+    return min(limit, MAX_PREVIEW)
+
+
+def portfolio_previews(user_ids, limit):
+    """
+    Os `limit` itens mais recentes de cada profissional, para a página
+    inteira, em uma única consulta:
+
+        ROW_NUMBER() OVER (PARTITION BY profile_id ORDER BY created_at DESC)
+
+    Devolve {user_id: [item, ...]}.
+    """
+    previews = {user_id: [] for user_id in user_ids}
+    if not previews or limit <= 0:
+        return previews
+
+    rows = (
+        PortfolioItem.objects.filter(profile__user_id__in=previews)
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("profile_id"),
+                order_by=[F("created_at").desc(), F("id").desc()],
+            )
+        )
+        .filter(position__lte=limit)
+        .order_by("profile__user_id", "position")
+        .values_list("profile__user_id", *ITEM_COLUMNS)
+    )
+    for user_id, *item in rows:
+        previews[user_id].append(portfolio_item(*item))
+    return previews
+
+
+def attach_previews(rows, limit, fields=None):
+    """
+    Acrescenta `portfolio_preview` às linhas já serializadas. O `id` vem
+    sempre (get_required_fields da view); se ?fields= (`fields`) não o
+    pediu, sai depois de usado.
+    """
+    previews = portfolio_previews([row["id"] for row in rows], limit)
+    for row in rows:
+        row[PREVIEW_PARAM] = previews[row["id"]]
+        if fields and "id" not in fields and not set(fields).isdisjoint(row):
+            del row["id"]
+    return rows
@@ -1,10 +1,11 @@
-from django.contrib.auth import authenticate
 from django.utils.translation import gettext_lazy as _
 from django.db import transaction
 
 from rest_framework import serializers
 
 from accounts.models import User, Profile
+from vagali_project.fastpath import FastRows, Field, SparseFieldsMixin, file_url, name_or_email
+from .password_pool import authenticate_offloaded
 
 
 # -------------------------------------------------------------------
@@ -99,7 +100,7 @@ class FullProfileSerializer(serializers.ModelSerializer):
 # -------------------------------------------------------------------
 # 3. PROFESSIONAL SERIALIZER (LISTAGEM / PERFIL PÚBLICO)
 # -------------------------------------------------------------------
-class ProfessionalSerializer(serializers.ModelSerializer):
+class ProfessionalSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer público usado no Home e Perfil Público.
     """
@@ -168,6 +169,29 @@ class ProfessionalSerializer(serializers.ModelSerializer):
         return None
 
 
+def _profession(profession, palavras):
+    if profession:
+        return profession
+    if palavras:
+        return palavras.split(",")[0].strip()
+    return None
+
+
+# leitura rápida da listagem (ver vagali_project/fastpath.py)
+ProfessionalSerializer.fast_rows = FastRows(
+    Field("id"),
+    Field("email"),
+    Field("full_name", "profile__full_name", "email", to=name_or_email),
+    Field("bio", "profile__bio"),
+    Field("rating", "profile__rating", to=lambda rating: rating or 0.0),
+    Field("address", "profile__address"),
+    Field("palavras_chave", "profile__palavras_chave", to=lambda palavras: palavras or ""),
+    Field("photo", "profile__photo", to=file_url),
+    Field("demands_count", "id", to=lambda _id: 0),
+    Field("profession", "profile__profession", "profile__palavras_chave", to=_profession),
+)
+
+
 # -------------------------------------------------------------------
 # 4. LOGIN VIA TOKEN (E-MAIL)
 # -------------------------------------------------------------------
@@ -188,10 +212,11 @@ class CustomAuthTokenSerializer(serializers.Serializer):
                 _("É necessário informar e-mail e senha.")
             )
 
-        user = authenticate(
-            request=self.context.get("request"),
-            username=email,
-            password=password,
+        # hash calculado no pool limitado (ver password_pool.py)
+        user = authenticate_offloaded(
+            self.context.get("request"),
+            email,
+            password,
         )
 
         if not user:
@@ -0,0 +1,106 @@
+# accounts/api/throttling.py
+
+import time
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+# trava por chave (cache.add): ler, recalcular e gravar o balde de uma vez
+LOCK_TIMEOUT = 2  # segundos; a trava de um processo que morreu expira sozinha
+LOCK_ATTEMPTS = 40
+LOCK_WAIT = 0.005
+
+
+# -------------------------------------------------------------------
+# 1. TOKEN BUCKET (base)
+# -------------------------------------------------------------------
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Throttle em "token bucket" guardado no cache do Django.
+
+    A taxa segue o formato do DRF ("5/min"): o balde comporta
+    `num_requests` fichas e é reabastecido continuamente à razão de
+    `num_requests / duration` fichas por segundo. Cada chave ocupa um
+    único par (fichas, timestamp) no cache, ao contrário do histórico
+    de timestamps do SimpleRateThrottle.
+
+    Leitura e gravação do par ficam sob uma trava por chave (cache.add),
+    então requests simultâneos não gastam a mesma ficha; se a trava não
+    sai em ~200 ms, o request segue sem ela e só é barrado com o balde
+    vazio. O limite só é
+    global se o cache for compartilhado (Redis, Memcached): com o
+    LocMemCache padrão cada processo tem o próprio balde, e o limite
+    efetivo é a taxa vezes o número de workers.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        lock = f"{self.key}:lock"
+        # trava ocupada além do esperado (worker lento ou morto): segue sem
+        # ela — melhor uma corrida rara que um 429 com fichas no balde
+        locked = self._acquire(lock)
+        try:
+            self.now = self.timer()
+            tokens, last = self.cache.get(self.key, (float(self.num_requests), self.now))
+
+            refill = (self.now - last) * self.num_requests / self.duration
+            self.tokens = min(float(self.num_requests), tokens + refill)
+
+            if self.tokens < 1:
+                return self.throttle_failure()
+            return self.throttle_success()
+        finally:
+            if locked:
+                self.cache.delete(lock)
+
+    def _acquire(self, lock):
+        for _ in range(LOCK_ATTEMPTS):
+            if self.cache.add(lock, 1, LOCK_TIMEOUT):
+                return True
+            time.sleep(LOCK_WAIT)
+        return False
+
+    def throttle_success(self):
+        self.tokens -= 1
+        self.cache.set(self.key, (self.tokens, self.now), self.duration)
+        return True
+
+    def wait(self):
+        """
+        Segundos até a próxima ficha ficar disponível.
+        """
+        missing = 1 - self.tokens
+        return max(missing * self.duration / self.num_requests, 0)
+
+
+# -------------------------------------------------------------------
+# 2. LOGIN — por IP e por conta (e-mail)
+# -------------------------------------------------------------------
+class LoginIPThrottle(TokenBucketThrottle):
+    scope = "login_ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class LoginEmailThrottle(TokenBucketThrottle):
+    scope = "login_email"
+
+    def get_cache_key(self, request, view):
+        email = request.data.get("email")
+        if not email:
+            return None
+
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": str(email).strip().lower(),
+        }
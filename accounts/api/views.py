@@ -12,17 +12,24 @@ from rest_framework.settings import api_settings
 from rest_framework.filters import SearchFilter
 
 from accounts.models import User, Profile, PortfolioItem
+from app_servicos.videos import METADATA, pending_fields, video_info
+from vagali_project.fastpath import FastListMixin, requested_fields
+from vagali_project.filters import IdsFilter
+from vagali_project.instrumentation import query_site
 from accounts.forms import ClientProfessionalCreationForm
 from .serializers import (
     ProfessionalSerializer,
     FullProfileSerializer,
     CustomAuthTokenSerializer,
 )
+from .throttling import LoginIPThrottle, LoginEmailThrottle
+from .pagination import PortfolioCursorPagination
+from .portfolio import ITEM_COLUMNS, attach_previews, portfolio_item, preview_limit
 
 # -------------------------------------------------------------------
 # 1. LISTAGEM PÚBLICA DE PROFISSIONAIS
 # -------------------------------------------------------------------
-class ProfessionalViewSet(viewsets.ReadOnlyModelViewSet):
+class ProfessionalViewSet(FastListMixin, viewsets.ReadOnlyModelViewSet):
     queryset = (
         User.objects.filter(is_professional=True, profile__isnull=False)
         .select_related("profile")
@@ -32,7 +39,7 @@ class ProfessionalViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = ProfessionalSerializer
     permission_classes = [permissions.AllowAny]
 
-    filter_backends = [SearchFilter]
+    filter_backends = [IdsFilter, SearchFilter]
     search_fields = [
         "email",
         "profile__full_name",
@@ -40,6 +47,30 @@ class ProfessionalViewSet(viewsets.ReadOnlyModelViewSet):
         "profile__address",
     ]
 
+    # ?portfolio_preview=N: últimos N itens do portfólio de cada profissional,
+    # uma consulta para a página inteira (ver accounts/api/portfolio.py)
+    def get_required_fields(self):
+        # a prévia é montada pelo id de cada linha, mesmo com ?fields= sem id
+        return ("id",) if preview_limit(self.request) else ()
+
+    def list(self, request, *args, **kwargs):
+        # busca (?search=) faz LIKE em 4 colunas: rotulada no log de consultas lentas
+        site = "ProfessionalViewSet.search" if request.query_params.get("search") else "ProfessionalViewSet.list"
+        with query_site(site):
+            response = super().list(request, *args, **kwargs)
+        limit = preview_limit(request)
+        if limit:
+            rows = response.data["results"] if isinstance(response.data, dict) else response.data
+            attach_previews(rows, limit, requested_fields(request))
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        limit = preview_limit(request)
+        if limit:
+            attach_previews([response.data], limit, requested_fields(request))
+        return response
+
 
 # -------------------------------------------------------------------
 # 2. PERFIL DO USUÁRIO LOGADO
@@ -70,6 +101,9 @@ class CustomAuthToken(ObtainAuthToken):
     serializer_class = CustomAuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 
+    # 429 antes de qualquer hash de senha
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
+
 
 # -------------------------------------------------------------------
 # 4. CADASTRO
@@ -91,17 +125,20 @@ class RegisterAPIView(APIView):
         form = ClientProfessionalCreationForm(data)
 
         if form.is_valid():
-            user = form.save(request)
-            profile = user.profile
+            profile_fields = {}
+            if form.cleaned_data.get("is_professional"):
+                profile_fields = {
+                    "profession": data.get("profession", ""),
+                    "cnpj": data.get("cnpj") or None,
+                    "bio": data.get("bio", ""),
+                    "cep": data.get("cep", ""),
+                    "address": data.get("address", ""),
+                    "has_completed_professional_setup": True,
+                }
 
-            if user.is_professional:
-                profile.profession = data.get("profession", "")
-                profile.cnpj = data.get("cnpj") or None
-                profile.bio = data.get("bio", "")
-                profile.cep = data.get("cep", "")
-                profile.address = data.get("address", "")
-                profile.has_completed_professional_setup = True
-                profile.save()
+            # User + Profile completos: um INSERT cada, na mesma transação
+            user = form.save(profile_fields=profile_fields)
+            profile = user.profile
 
             return Response(
                 {
@@ -155,22 +192,22 @@ class PortfolioItemListCreateView(APIView):
     def get(self, request):
         professional_id = request.query_params.get("professional_id")
 
-        if not professional_id:
-            return Response([], status=200)
+        # sem profissional: página vazia, no mesmo formato
+        items = PortfolioItem.objects.none()
+        if professional_id:
+            items = PortfolioItem.objects.filter(profile__user__id=professional_id)
 
-        items = PortfolioItem.objects.filter(
-            profile__user__id=professional_id
-        ).order_by("-created_at")
+        # paginação por cursor: {"next", "previous", "results"}
+        paginator = PortfolioCursorPagination()
+        page = paginator.paginate_queryset(items.only(*ITEM_COLUMNS), request, view=self)
 
-        return Response(
+        return paginator.get_paginated_response(
             [
-                {
-                    "id": item.id,
-                    "file": item.file.url if item.file else None,
-                    "is_video": item.is_video,
-                    "created_at": item.created_at.isoformat(),
-                }
-                for item in items
+                portfolio_item(
+                    item.id, item.file.name, item.is_video, item.created_at,
+                    *(getattr(item, column) for column in METADATA),
+                )
+                for item in page
             ]
         )
 
@@ -191,10 +228,12 @@ class PortfolioItemListCreateView(APIView):
         )
 
         # ✅ CORRETO
+        # vídeos entram na fila do process_videos (fast start + metadados)
         item = PortfolioItem.objects.create(
             profile=profile,
             file=file_obj,
             is_video=is_video,
+            **pending_fields(is_video),
         )
 
         return Response(
@@ -203,6 +242,7 @@ class PortfolioItemListCreateView(APIView):
                 "file": item.file.url,
                 "is_video": item.is_video,
                 "created_at": item.created_at.isoformat(),
+                "video": video_info(*(getattr(item, column) for column in METADATA)),
             },
             status=status.HTTP_201_CREATED,
         )
@@ -1,6 +1,7 @@
 # accounts/forms.py
 
 from django import forms
+from django.db import transaction
 from django.contrib.auth.forms import UserCreationForm
 from .models import User, Profile
 
@@ -25,17 +26,29 @@ class ClientProfessionalCreationForm(UserCreationForm):
             del self.fields['username']
 
     # Método crucial para salvar os dois modelos
-    def save(self, commit=True):
-        # 1. Salva o User (email, senha e is_professional)
+    def save(self, commit=True, profile_fields=None):
+        """
+        Cria User e Profile já preenchido em uma única transação:
+        exatamente dois INSERTs, sem UPDATEs posteriores.
+
+        `profile_fields` recebe campos extras do Profile (ex.: dados
+        profissionais enviados no cadastro).
+        """
+        # 1. Monta o User (email, senha e is_professional)
         user = super().save(commit=False)
+
         if commit:
-            user.save()
-            
-            # 2. Salva o Profile, que é criado via sinal, e o atualiza
-            # O Profile é criado automaticamente pelo sinal, agora nós o preenchemos.
-            user.profile.full_name = self.cleaned_data.get('full_name')
-            user.profile.cpf = self.cleaned_data.get('cpf')
-            user.profile.phone_number = self.cleaned_data.get('phone_number')
-            user.profile.save()
-            
-        return user
\ No newline at end of file
+            # 2. Monta o Profile completo e o anexa ao User; o sinal
+            #    create_user_profile vê o Profile em cache e não cria outro.
+            user.profile = Profile(
+                full_name=self.cleaned_data.get('full_name'),
+                cpf=self.cleaned_data.get('cpf'),
+                phone_number=self.cleaned_data.get('phone_number'),
+                **(profile_fields or {}),
+            )
+
+            with transaction.atomic():
+                user.save()
+                user.profile.save()
+
+        return user
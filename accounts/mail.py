@@ -0,0 +1,179 @@
+# accounts/mail.py
+"""
+Outbox de e-mails (reset de senha, ativação do djoser...):
+
+- OutboxBackend é o EMAIL_BACKEND: send_mail()/EmailMessage.send() só
+  gravam a mensagem, na transação corrente. O request não espera SMTP.
+- deliver_batch() (manage.py send_emails) pega as mensagens vencidas,
+  abre uma conexão com EMAIL_DELIVERY_BACKEND e envia o lote por ela.
+  Falha temporária: nova tentativa com backoff exponencial até
+  EMAIL_OUTBOX_MAX_ATTEMPTS.
+
+Entrega pelo menos uma vez: se o worker cair depois do envio e antes de
+marcar a mensagem, ela sai de novo quando o lease vence.
+"""
+
+import logging
+import random
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import OutgoingEmail
+
+
+logger = logging.getLogger("vagali.mail")
+
+BATCH_SIZE = 50
+
+# mensagens de um lote ficam reservadas por este tempo (outros workers pulam)
+LEASE = timedelta(minutes=5)
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+
+def max_attempts():
+    return getattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 8)
+
+
+def retry_delay(attempts):
+    """30 s, 1 min, 2 min... (EMAIL_OUTBOX_RETRY_SECONDS) até 1 h, com ±20%."""
+    base = getattr(settings, "EMAIL_OUTBOX_RETRY_SECONDS", 30) * 2 ** (attempts - 1)
+    return min(timedelta(seconds=base), MAX_RETRY_DELAY) * random.uniform(0.8, 1.2)
+
+
+# ---------------------------------------------------------
+# 1. Escrita — EMAIL_BACKEND
+# ---------------------------------------------------------
+class OutboxBackend(BaseEmailBackend):
+    """Grava as mensagens na tabela OutgoingEmail em vez de enviar."""
+
+    def send_messages(self, email_messages):
+        rows = []
+        for message in email_messages:
+            if message.attachments:
+                raise ValueError("A outbox de e-mails não guarda anexos.")
+            if not message.recipients():
+                continue
+            rows.append(
+                OutgoingEmail(
+                    subject=message.subject,
+                    body=message.body,
+                    from_email=message.from_email,
+                    to=list(message.to),
+                    cc=list(message.cc),
+                    bcc=list(message.bcc),
+                    reply_to=list(message.reply_to),
+                    headers=dict(message.extra_headers),
+                    alternatives=[list(alternative) for alternative in getattr(message, "alternatives", [])],
+                )
+            )
+        # junto com a transação do chamador, se houver: rollback não envia
+        with transaction.atomic():
+            OutgoingEmail.objects.bulk_create(rows)
+        return len(rows)
+
+
+def as_message(email, connection=None):
+    return EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        cc=email.cc,
+        bcc=email.bcc,
+        reply_to=email.reply_to,
+        headers=email.headers,
+        alternatives=[tuple(alternative) for alternative in email.alternatives],
+        connection=connection,
+    )
+
+
+# ---------------------------------------------------------
+# 2. Entrega em lotes
+# ---------------------------------------------------------
+def claim(batch_size, now):
+    """Reserva (lease) até `batch_size` mensagens vencidas e as devolve."""
+    with transaction.atomic():
+        ids = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(status="pendente", next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        OutgoingEmail.objects.filter(id__in=ids).update(next_attempt_at=now + LEASE)
+    return list(OutgoingEmail.objects.filter(id__in=ids).order_by("id"))
+
+
+def _permanent(exc):
+    """Recusa definitiva (5xx, destinatários recusados): não adianta repetir."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code >= 500
+
+
+def _failed(email, exc, now):
+    attempts = email.attempts + 1
+    gave_up = _permanent(exc) or attempts >= max_attempts()
+    logger.warning("Falha ao enviar e-mail #%s (tentativa %s): %s", email.pk, attempts, exc)
+    OutgoingEmail.objects.filter(pk=email.pk).update(
+        attempts=attempts,
+        status="falhou" if gave_up else "pendente",
+        next_attempt_at=now if gave_up else now + retry_delay(attempts),
+        last_error=f"{type(exc).__name__}: {exc}"[:2000],
+    )
+    return "falhou" if gave_up else "pendente"
+
+
+def deliver_batch(batch_size=BATCH_SIZE, now=None):
+    """
+    Envia um lote por uma única conexão (EMAIL_DELIVERY_BACKEND). Se a
+    conexão não abre, o lote inteiro volta para a fila com backoff.
+    Devolve {status: n}.
+    """
+    now = now or timezone.now()
+    emails = claim(batch_size, now)
+    counts = {}
+    if not emails:
+        return counts
+
+    connection = get_connection(settings.EMAIL_DELIVERY_BACKEND, fail_silently=False)
+    sent = []
+    try:
+        for index, email in enumerate(emails):
+            try:
+                connection.open()
+            except (smtplib.SMTPException, OSError) as exc:
+                # servidor fora: não vale esperar o timeout mensagem a mensagem
+                for pending in emails[index:]:
+                    status = _failed(pending, exc, now)
+                    counts[status] = counts.get(status, 0) + 1
+                break
+            try:
+                connection.send_messages([as_message(email, connection)])
+            except (smtplib.SMTPException, OSError) as exc:
+                status = _failed(email, exc, now)
+                counts[status] = counts.get(status, 0) + 1
+                # a conexão pode ter ficado inutilizável: a próxima reabre
+                connection.close()
+            else:
+                sent.append(email.pk)
+    finally:
+        connection.close()
+
+    OutgoingEmail.objects.filter(pk__in=sent).update(status="enviado", sent_at=timezone.now(), last_error="")
+    if sent:
+        counts["enviado"] = len(sent)
+    return counts
+
+
+def purge(now=None):
+    """Apaga as enviadas há mais de EMAIL_OUTBOX_RETENTION_DAYS. Devolve quantas."""
+    days = getattr(settings, "EMAIL_OUTBOX_RETENTION_DAYS", 7)
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    deleted, _ = OutgoingEmail.objects.filter(status="enviado", sent_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,64 @@
+# accounts/management/commands/bench_signup.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from accounts.forms import ClientProfessionalCreationForm
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede cadastros/segundo pelo fluxo do RegisterAPIView "
+        "(validação + User + Profile). Tudo é desfeito ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", "--count", type=int, default=200)
+        parser.add_argument(
+            "--fast-hasher",
+            action="store_true",
+            help="Usa MD5 no lugar do PBKDF2 para medir só o custo de banco/ORM.",
+        )
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        hashers = ["django.contrib.auth.hashers.MD5PasswordHasher"] if options["fast_hasher"] else None
+
+        with override_settings(**({"PASSWORD_HASHERS": hashers} if hashers else {})):
+            writes, elapsed = self._run(count)
+
+        self.stdout.write(
+            f"{count} cadastros em {elapsed:.2f}s -> {count / elapsed:.1f} cadastros/s "
+            f"({writes / count:.1f} escritas por cadastro)"
+        )
+
+    def _run(self, count):
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                for i in range(count):
+                    form = ClientProfessionalCreationForm(
+                        {
+                            "email": f"bench-{i}@vagali.invalid",
+                            "password1": "SenhaForte123",
+                            "password2": "SenhaForte123",
+                            "is_professional": i % 2 == 0,
+                            "full_name": f"Bench {i}",
+                            "cpf": f"{i:011d}",
+                        }
+                    )
+                    if not form.is_valid():
+                        raise ValueError(form.errors.as_json())
+                    form.save(profile_fields={"profession": "Pintor"} if i % 2 == 0 else None)
+                elapsed = time.perf_counter() - start
+
+            writes = sum(
+                1 for q in ctx.captured_queries
+                if q["sql"].split(" ", 1)[0].upper() in ("INSERT", "UPDATE", "DELETE")
+            )
+            transaction.set_rollback(True)
+
+        return writes, elapsed
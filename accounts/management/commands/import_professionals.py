@@ -0,0 +1,266 @@
+# accounts/management/commands/import_professionals.py
+
+import csv
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from accounts.models import User, Profile
+
+
+ONLY_DIGITS = re.compile(r"\D")
+
+
+# -------------------------------------------------------------------
+# 1. VALIDAÇÃO + HASH (roda nos processos do pool)
+# -------------------------------------------------------------------
+def _init_worker():
+    # Em plataformas com "spawn" o processo filho começa sem o Django.
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _text(value):
+    # NDJSON traz números (CPF, telefone) sem aspas
+    return "" if value is None else str(value).strip()
+
+
+def _digits(value, size, label, errors):
+    value = ONLY_DIGITS.sub("", _text(value))
+    if value and len(value) != size:
+        errors.append(f"{label} deve ter {size} dígitos.")
+    return value or None
+
+
+def prepare_row(item):
+    """
+    Recebe (linha, dict cru) e devolve (linha, email, campos, hash, erros).
+    Não acessa o banco — unicidade é checada no processo principal.
+    Qualquer exceção vira erro da linha, sem derrubar o pool.
+    """
+    try:
+        return _prepare(*item)
+    except Exception as exc:
+        return item[0], "", None, None, [f"Erro inesperado: {exc}"]
+
+
+def _prepare(line_no, raw):
+    if not isinstance(raw, dict):
+        return line_no, "", None, None, ["Linha não é um objeto JSON válido."]
+
+    errors = []
+
+    email = _text(raw.get("email"))
+    try:
+        validate_email(email)
+    except ValidationError:
+        errors.append("E-mail inválido.")
+    email = User.objects.normalize_email(email).lower()
+
+    fields = {
+        "full_name": _text(raw.get("full_name")),
+        "phone_number": _text(raw.get("phone_number")) or None,
+        "address": _text(raw.get("address")),
+        "bio": _text(raw.get("bio")),
+        "profession": _text(raw.get("profession")),
+        "cpf": _digits(raw.get("cpf"), 11, "CPF", errors),
+        "cnpj": _digits(raw.get("cnpj"), 14, "CNPJ", errors),
+        "cep": _digits(raw.get("cep"), 8, "CEP", errors) or "",
+    }
+
+    if not fields["full_name"]:
+        errors.append("Nome completo é obrigatório.")
+    if not fields["profession"]:
+        errors.append("Profissão é obrigatória.")
+    if len(fields["full_name"]) > 255 or len(fields["address"]) > 255:
+        errors.append("Nome/endereço excedem 255 caracteres.")
+    if fields["phone_number"] and len(fields["phone_number"]) > 15:
+        errors.append("Telefone excede 15 caracteres.")
+    if len(fields["profession"]) > 100:
+        errors.append("Profissão excede 100 caracteres.")
+
+    # Tags: lista (NDJSON) ou texto separado por , ; |
+    tags = raw.get("palavras_chave") or ""
+    if isinstance(tags, str):
+        tags = re.split(r"[,;|]", tags)
+    fields["palavras_chave"] = ", ".join(_text(t) for t in tags if _text(t))
+
+    if errors:
+        return line_no, email, None, None, errors
+
+    password = raw.get("password") or None
+    # sem senha -> senha inutilizável; o profissional usa "esqueci a senha"
+    return line_no, email, fields, make_password(password), []
+
+
+# -------------------------------------------------------------------
+# 2. LEITURA EM STREAMING
+# -------------------------------------------------------------------
+def read_rows(path, fmt):
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        if fmt == "csv":
+            reader = csv.DictReader(fh)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_no, line in enumerate(fh, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except json.JSONDecodeError:
+                    yield line_no, None
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# -------------------------------------------------------------------
+# 3. COMANDO
+# -------------------------------------------------------------------
+class Command(BaseCommand):
+    help = (
+        "Importa profissionais de CSV/NDJSON em lotes (bulk_create, sem sinais). "
+        "Retomável via arquivo de checkpoint; erros por linha vão para um CSV."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["csv", "ndjson"], default=None)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Processos para validar/gerar hash (0 = no processo atual).",
+        )
+        parser.add_argument("--errors", default=None, help="Padrão: <arquivo>.errors.csv")
+        parser.add_argument("--checkpoint", default=None, help="Padrão: <arquivo>.checkpoint")
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignora o checkpoint existente e começa do início.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"Arquivo não encontrado: {path}")
+
+        fmt = options["format"] or ("csv" if path.suffix.lower() == ".csv" else "ndjson")
+        checkpoint = Path(options["checkpoint"] or f"{path}.checkpoint")
+        errors_path = Path(options["errors"] or f"{path}.errors.csv")
+
+        resume_after = 0
+        if checkpoint.exists() and not options["restart"]:
+            resume_after = int(checkpoint.read_text().strip() or 0)
+            self.stdout.write(f"Retomando após a linha {resume_after}.")
+
+        rows = (item for item in read_rows(path, fmt) if item[0] > resume_after)
+
+        executor = None
+        if options["workers"] > 0:
+            executor = ProcessPoolExecutor(max_workers=options["workers"], initializer=_init_worker)
+
+        self.imported = self.failed = 0
+        self.seen = set()
+
+        mode = "a" if resume_after else "w"
+        try:
+            with open(errors_path, mode, newline="", encoding="utf-8") as err_fh:
+                self.report = csv.writer(err_fh)
+                if mode == "w":
+                    self.report.writerow(["linha", "email", "erro"])
+
+                for batch in batched(rows, options["batch_size"]):
+                    if executor:
+                        prepared = list(executor.map(prepare_row, batch, chunksize=64))
+                    else:
+                        prepared = [prepare_row(item) for item in batch]
+
+                    self._insert(prepared)
+                    checkpoint.write_text(str(batch[-1][0]))
+                    err_fh.flush()
+        finally:
+            if executor:
+                executor.shutdown()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{self.imported} profissionais importados, {self.failed} linhas com erro "
+                f"(relatório: {errors_path})."
+            )
+        )
+
+    def _insert(self, prepared):
+        valid = []
+        for line_no, email, fields, password, errors in prepared:
+            if not errors and email in self.seen:
+                errors = ["E-mail repetido no arquivo."]
+            if errors:
+                self._fail(line_no, email, errors)
+                continue
+            self.seen.add(email)
+            valid.append((line_no, email, fields, password))
+
+        if not valid:
+            return
+
+        # Unicidade contra o banco: um IN por lote para e-mail e CPF.
+        # Os e-mails do arquivo já vêm em minúsculas; os do banco, não necessariamente.
+        emails = {email for _, email, _, _ in valid}
+        cpfs = {fields["cpf"] for _, _, fields, _ in valid if fields["cpf"]}
+        taken_emails = set(
+            User.objects.annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=emails)
+            .values_list("email_lower", flat=True)
+        )
+        taken_cpfs = set(Profile.objects.filter(cpf__in=cpfs).values_list("cpf", flat=True))
+
+        users, profiles, batch_cpfs = [], [], set()
+        for line_no, email, fields, password in valid:
+            if email in taken_emails:
+                self._fail(line_no, email, ["E-mail já cadastrado."])
+                continue
+            if fields["cpf"] and (fields["cpf"] in taken_cpfs or fields["cpf"] in batch_cpfs):
+                self._fail(line_no, email, ["CPF já cadastrado."])
+                continue
+            if fields["cpf"]:
+                batch_cpfs.add(fields["cpf"])
+
+            user = User(email=email, password=password, is_professional=True)
+            users.append(user)
+            profiles.append(Profile(user=user, has_completed_professional_setup=True, **fields))
+
+        # bulk_create não dispara post_save: o Profile vai completo no mesmo lote
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            for profile in profiles:
+                profile.user_id = profile.user.pk
+            Profile.objects.bulk_create(profiles)
+
+        self.imported += len(users)
+
+    def _fail(self, line_no, email, errors):
+        self.failed += 1
+        self.report.writerow([line_no, email, "; ".join(errors)])
@@ -0,0 +1,56 @@
+# accounts/management/commands/send_emails.py
+
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts import mail
+
+
+class Command(BaseCommand):
+    help = (
+        "Entrega os e-mails da outbox (reset de senha, ativação...) em lotes, "
+        "uma conexão SMTP por lote, com novas tentativas e backoff. Apaga as "
+        "mensagens enviadas há mais de EMAIL_OUTBOX_RETENTION_DAYS. Com --loop, "
+        "fica rodando como worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=mail.BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Repete a cada --interval.")
+        parser.add_argument("--interval", type=float, default=2, help="Segundos entre varreduras (--loop).")
+
+    def handle(self, *args, **options):
+        self.running = True
+        if options["loop"]:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        while True:
+            totals = {}
+            while True:
+                counts = mail.deliver_batch(options["batch_size"])
+                for status, count in counts.items():
+                    totals[status] = totals.get(status, 0) + count
+                # lote incompleto: a fila vencida acabou
+                if sum(counts.values()) < options["batch_size"]:
+                    break
+            purged = mail.purge()
+            if totals or purged or not options["loop"]:
+                self.stdout.write(
+                    f"{totals.get('enviado', 0)} enviados, {totals.get('pendente', 0)} para nova tentativa, "
+                    f"{totals.get('falhou', 0)} desistidos; {purged} antigos apagados."
+                )
+            if not options["loop"]:
+                break
+
+            deadline = time.monotonic() + options["interval"]
+            while self.running and time.monotonic() < deadline:
+                time.sleep(min(1.0, deadline - time.monotonic()))
+            if not self.running:
+                break
+
+    def stop(self, *args):
+        self.stdout.write("Encerrando após o lote atual...")
+        self.running = False
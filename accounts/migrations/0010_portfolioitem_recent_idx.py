@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_alter_profile_palavras_chave_alter_profile_rating_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='portfolioitem',
+            index=models.Index(fields=['profile', '-created_at', '-id'], name='portfolio_profile_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:52
+
+from django.db import migrations, models
+
+
+def queue_existing_videos(apps, schema_editor):
+    # vídeos enviados antes: entram na fila do process_videos
+    PortfolioItem = apps.get_model("accounts", "PortfolioItem")
+    PortfolioItem.objects.using(schema_editor.connection.alias).filter(is_video=True).update(video_status="pendente")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_portfolioitem_recent_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portfolioitem',
+            name='video_codec',
+            field=models.CharField(blank=True, default='', max_length=16, verbose_name='Codec'),
+        ),
+        migrations.AddField(
+            model_name='portfolioitem',
+            name='video_duration',
+            field=models.FloatField(blank=True, null=True, verbose_name='Duração (s)'),
+        ),
+        migrations.AddField(
+            model_name='portfolioitem',
+            name='video_height',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Altura'),
+        ),
+        migrations.AddField(
+            model_name='portfolioitem',
+            name='video_status',
+            field=models.CharField(blank=True, choices=[('pendente', 'Pendente'), ('pronto', 'Pronto'), ('invalido', 'Inválido')], default='', max_length=10, verbose_name='Status do vídeo'),
+        ),
+        migrations.AddField(
+            model_name='portfolioitem',
+            name='video_width',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Largura'),
+        ),
+        migrations.RunPython(queue_existing_videos, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='portfolioitem',
+            index=models.Index(condition=models.Q(('video_status', 'pendente')), fields=['id'], name='portfolio_video_pending_idx'),
+        ),
+    ]
@@ -1,9 +1,12 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from vagali_project.mp4 import VIDEO_STATUS_CHOICES
+
 
 # ===============================================================
 # 1. Custom User Manager — login usando e-mail
@@ -125,15 +128,19 @@ class Profile(models.Model):
 # 4. Signals — cria Profile automaticamente
 # ===============================================================
 @receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
-        Profile.objects.create(user=instance)
-
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
+    """
+    Garante um Profile para usuários criados fora do cadastro
+    (createsuperuser, djoser, admin...).
 
-@receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    if hasattr(instance, "profile"):
-        instance.profile.save()
+    O cadastro (ClientProfessionalCreationForm) já anexa um Profile
+    preenchido ao User antes do INSERT — nesse caso não há nada a fazer.
+    """
+    if not created or raw:
+        return
+    if User.profile.related.is_cached(instance):
+        return
+    Profile.objects.create(user=instance)
 
 
 # ===============================================================
@@ -150,5 +157,68 @@ class PortfolioItem(models.Model):
     is_video = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # preenchidos por manage.py process_videos (app_servicos/videos.py)
+    video_status = models.CharField(_("Status do vídeo"), max_length=10, choices=VIDEO_STATUS_CHOICES, blank=True, default="")
+    video_duration = models.FloatField(_("Duração (s)"), null=True, blank=True)
+    video_width = models.PositiveIntegerField(_("Largura"), null=True, blank=True)
+    video_height = models.PositiveIntegerField(_("Altura"), null=True, blank=True)
+    video_codec = models.CharField(_("Codec"), max_length=16, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            # prévia por profissional (ROW_NUMBER) e paginação por cursor
+            models.Index(fields=["profile", "-created_at", "-id"], name="portfolio_profile_recent_idx"),
+            # fila do process_videos
+            models.Index(fields=["id"], condition=models.Q(video_status="pendente"), name="portfolio_video_pending_idx"),
+        ]
+
     def __str__(self):
         return f"Portfólio de {self.profile.user.email}"
+
+
+# ===============================================================
+# 6. Outbox de e-mails — enviados por manage.py send_emails
+# ===============================================================
+EMAIL_STATUS_CHOICES = [
+    ("pendente", "Pendente"),
+    ("enviado", "Enviado"),
+    ("falhou", "Falhou"),
+]
+
+
+class OutgoingEmail(models.Model):
+    """
+    Mensagem gravada pelo OutboxBackend (accounts/mail.py) na transação do
+    request; a entrega por SMTP acontece fora dele, em lotes.
+    """
+
+    subject = models.TextField(_("Assunto"))
+    body = models.TextField(_("Corpo"))
+    from_email = models.CharField(_("Remetente"), max_length=255)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list)
+    bcc = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list)
+    headers = models.JSONField(default=dict)
+    # [[conteúdo, mimetype], ...] — ex.: a versão HTML
+    alternatives = models.JSONField(default=list)
+
+    status = models.CharField(_("Status"), max_length=10, choices=EMAIL_STATUS_CHOICES, default="pendente")
+    attempts = models.PositiveSmallIntegerField(_("Tentativas"), default=0)
+    next_attempt_at = models.DateTimeField(_("Próxima tentativa"), default=timezone.now)
+    last_error = models.TextField(_("Último erro"), blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("E-mail na fila")
+        verbose_name_plural = _("E-mails na fila")
+        indexes = [
+            # mensagens vencidas para o próximo lote
+            models.Index(fields=["status", "next_attempt_at"], name="email_outbox_due_idx"),
+            # limpeza das já enviadas
+            models.Index(fields=["status", "sent_at"], name="email_outbox_sent_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
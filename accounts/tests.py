@@ -1,3 +1,371 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import smtplib
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail as django_mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from accounts import mail
+from accounts.models import OutgoingEmail, User, Profile, PortfolioItem
+from accounts.api import password_pool, throttling
+from accounts.api.throttling import LoginIPThrottle
+
+
+class LoginTests(APITestCase):
+    # usuários são copiados para os shards (VAGALI_SHARDS > 1)
+    databases = "__all__"
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("api_login")
+        self.user = User.objects.create_user(email="cliente@vagali.com", password="SenhaForte123")
+
+    def test_login_retorna_token(self):
+        response = self.client.post(
+            self.url, {"email": "cliente@vagali.com", "password": "SenhaForte123"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("token", response.data)
+
+    def test_senha_errada(self):
+        response = self.client.post(
+            self.url, {"email": "cliente@vagali.com", "password": "errada"}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_throttle_por_email_antes_do_hash(self):
+        payload = {"email": "cliente@vagali.com", "password": "errada"}
+        for _ in range(5):
+            self.client.post(self.url, payload, format="json")
+
+        with mock.patch.object(password_pool, "verify_password") as verify:
+            response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        verify.assert_not_called()
+
+    def test_token_bucket_sem_corrida_entre_requests_simultaneos(self):
+        class SlowCache:
+            # alarga a janela entre ler e gravar o balde
+            def get(self, *args, **kwargs):
+                value = cache.get(*args, **kwargs)
+                time.sleep(0.01)
+                return value
+
+            def __getattr__(self, name):
+                return getattr(cache, name)
+
+        request = RequestFactory().post(self.url, REMOTE_ADDR="10.0.0.1")
+        allowed = []
+
+        def hit():
+            allowed.append(LoginIPThrottle().allow_request(request, None))
+
+        # 30 x 10 ms na fila: espera longa o bastante para ninguém seguir sem a trava
+        with mock.patch.object(LoginIPThrottle, "cache", SlowCache()), mock.patch.object(throttling, "LOCK_ATTEMPTS", 400):
+            threads = [threading.Thread(target=hit) for _ in range(30)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        # login_ip = 20/min
+        self.assertEqual(allowed.count(True), 20)
+
+    def test_trava_presa_nao_barra_com_fichas_no_balde(self):
+        request = RequestFactory().post(self.url, REMOTE_ADDR="10.0.0.2")
+        with mock.patch.object(throttling, "LOCK_WAIT", 0), mock.patch.object(cache, "add", return_value=False):
+            allowed = [LoginIPThrottle().allow_request(request, None) for _ in range(21)]
+        # login_ip = 20/min: só o 21º encontra o balde vazio
+        self.assertEqual(allowed, [True] * 20 + [False])
+
+    def test_pool_cheio_retorna_429(self):
+        with mock.patch.object(password_pool, "_slots") as slots:
+            slots.acquire.return_value = False
+            response = self.client.post(
+                self.url, {"email": "cliente@vagali.com", "password": "SenhaForte123"}, format="json"
+            )
+        self.assertEqual(response.status_code, 429)
+
+
+class RegisterTests(APITestCase):
+    databases = "__all__"
+
+    payload = {
+        "email": "novo@vagali.com",
+        "password": "SenhaForte123",
+        "password2": "SenhaForte123",
+        "is_professional": False,
+        "profile": {"full_name": "Maria Silva", "cpf": "12345678901", "phone_number": "11999999999"},
+    }
+
+    def _writes(self, queries):
+        sql = [q["sql"].split(" ", 1)[0].upper() for q in queries]
+        return [s for s in sql if s in ("INSERT", "UPDATE", "DELETE")]
+
+    def test_cliente_dois_inserts_sem_updates(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse("register"), self.payload, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self._writes(ctx.captured_queries), ["INSERT", "INSERT"])
+
+        user = User.objects.get(email="novo@vagali.com")
+        self.assertTrue(user.check_password("SenhaForte123"))
+        self.assertFalse(user.is_professional)
+        self.assertEqual(user.profile.full_name, "Maria Silva")
+        self.assertEqual(user.profile.cpf, "12345678901")
+        self.assertEqual(user.profile.phone_number, "11999999999")
+        self.assertFalse(user.profile.has_completed_professional_setup)
+        self.assertEqual(Profile.objects.filter(user=user).count(), 1)
+
+    def test_profissional_dados_completos_em_dois_inserts(self):
+        payload = dict(
+            self.payload,
+            is_professional=True,
+            profession="Eletricista",
+            cnpj="",
+            bio="10 anos de experiência",
+            cep="01001000",
+            address="São Paulo",
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse("register"), payload, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self._writes(ctx.captured_queries), ["INSERT", "INSERT"])
+        self.assertEqual(response.data["profession"], "Eletricista")
+        self.assertIsNone(response.data["cnpj"])
+
+        profile = User.objects.get(email="novo@vagali.com").profile
+        self.assertEqual(profile.profession, "Eletricista")
+        self.assertIsNone(profile.cnpj)
+        self.assertEqual(profile.bio, "10 anos de experiência")
+        self.assertEqual(profile.cep, "01001000")
+        self.assertEqual(profile.address, "São Paulo")
+        self.assertTrue(profile.has_completed_professional_setup)
+
+    def test_rota_cadastro_usa_o_mesmo_fluxo(self):
+        response = self.client.post(reverse("api_cadastro"), self.payload, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(User.objects.get(email="novo@vagali.com").profile.full_name, "Maria Silva")
+
+    def test_dados_invalidos_nao_gravam_nada(self):
+        payload = dict(self.payload, password2="outra")
+        response = self.client.post(reverse("register"), payload, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Profile.objects.exists())
+
+    def test_create_user_continua_criando_profile(self):
+        user = User.objects.create_user(email="admin@vagali.com", password="x")
+        self.assertTrue(Profile.objects.filter(user=user).exists())
+
+        # salvar o User não regrava mais o Profile
+        with CaptureQueriesContext(connection) as ctx:
+            user.save()
+        self.assertEqual(self._writes(ctx.captured_queries), ["UPDATE"])
+
+
+class ImportProfessionalsTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(content)
+        return path
+
+    def test_importa_csv_com_relatorio_de_erros(self):
+        User.objects.create_user(email="existe@vagali.com", password="x")
+        path = self._write(
+            "profissionais.csv",
+            "email,full_name,cpf,profession,palavras_chave,cep\n"
+            "ana@vagali.com,Ana Souza,12345678901,Pintora,Pintura; Textura,01001-000\n"
+            "existe@vagali.com,Já Existe,,Pedreiro,,\n"
+            "invalido,Sem Email,,Eletricista,,\n"
+            "ana@vagali.com,Ana Repetida,,Pintora,,\n",
+        )
+
+        call_command("import_professionals", path, workers=0, stdout=io.StringIO())
+
+        user = User.objects.get(email="ana@vagali.com")
+        self.assertTrue(user.is_professional)
+        self.assertFalse(user.has_usable_password())
+        self.assertEqual(user.profile.full_name, "Ana Souza")
+        self.assertEqual(user.profile.cep, "01001000")
+        self.assertEqual(user.profile.palavras_chave, "Pintura, Textura")
+        self.assertTrue(user.profile.has_completed_professional_setup)
+
+        with open(path + ".errors.csv", encoding="utf-8") as fh:
+            report = list(csv.reader(fh))[1:]
+        self.assertEqual(sorted(r[0] for r in report), ["3", "4", "5"])
+
+    def test_retoma_a_partir_do_checkpoint(self):
+        path = self._write(
+            "profissionais.ndjson",
+            json.dumps({"email": "a@vagali.com", "full_name": "A", "profession": "Pintor"}) + "\n"
+            + json.dumps({"email": "b@vagali.com", "full_name": "B", "profession": "Pintor",
+                          "password": "SenhaForte123", "palavras_chave": ["Pintura", "Gesso"]}) + "\n",
+        )
+        with open(path + ".checkpoint", "w") as fh:
+            fh.write("1")
+
+        call_command("import_professionals", path, workers=0, stdout=io.StringIO())
+
+        self.assertFalse(User.objects.filter(email="a@vagali.com").exists())
+        user = User.objects.get(email="b@vagali.com")
+        self.assertTrue(user.check_password("SenhaForte123"))
+        self.assertEqual(user.profile.palavras_chave, "Pintura, Gesso")
+
+    def test_valores_numericos_e_email_com_maiusculas(self):
+        User.objects.create_user(email="Existe@vagali.com", password="x")
+        path = self._write(
+            "profissionais.ndjson",
+            json.dumps({"email": "num@vagali.com", "full_name": "Num", "profession": "Pintor",
+                        "cpf": 12345678901, "phone_number": 11987654321, "cep": 22041001}) + "\n"
+            + json.dumps({"email": "EXISTE@vagali.com", "full_name": "Já Existe", "profession": "Pedreiro"}) + "\n"
+            + json.dumps({"email": "tags@vagali.com", "full_name": "Tags", "profession": "Pintor",
+                          "palavras_chave": 5}) + "\n",
+        )
+
+        call_command("import_professionals", path, workers=0, stdout=io.StringIO())
+
+        profile = User.objects.get(email="num@vagali.com").profile
+        self.assertEqual((profile.cpf, profile.phone_number), ("12345678901", "11987654321"))
+        self.assertEqual(User.objects.filter(email__iexact="existe@vagali.com").count(), 1)
+
+        with open(path + ".errors.csv", encoding="utf-8") as fh:
+            report = {row[0]: row[2] for row in list(csv.reader(fh))[1:]}
+        self.assertEqual(set(report), {"2", "3"})
+        self.assertEqual(report["2"], "E-mail já cadastrado.")
+        self.assertTrue(report["3"].startswith("Erro inesperado"))
+
+
+class PortfolioPreviewTests(APITestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.pros = []
+        for n in range(3):
+            user = User.objects.create_user(email=f"pro{n}@vagali.com", password="x", is_professional=True)
+            for i in range(n + 2):
+                PortfolioItem.objects.create(profile=user.profile, file=f"portfolio/p{n}_{i}.jpg")
+            self.pros.append(user)
+
+    def test_previa_em_uma_consulta_para_a_pagina(self):
+        url = reverse("profissionais-list")
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {"portfolio_preview": 2})
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+        for row in response.data:
+            preview = row["portfolio_preview"]
+            self.assertEqual(len(preview), 2)
+            # mais recentes primeiro
+            self.assertGreater(preview[0]["id"], preview[1]["id"])
+
+        self.assertNotIn("portfolio_preview", self.client.get(url).data[0])
+
+    def test_previa_com_fields_sem_id(self):
+        url = reverse("profissionais-list")
+        for fast in ("1", "0"):
+            response = self.client.get(url, {"fields": "full_name", "portfolio_preview": 1, "fast": fast})
+            self.assertEqual(response.status_code, 200)
+            for row in response.data:
+                self.assertEqual(set(row), {"full_name", "portfolio_preview"})
+                self.assertEqual(len(row["portfolio_preview"]), 1)
+
+        response = self.client.get(
+            reverse("profissionais-detail", args=[self.pros[0].pk]), {"fields": "full_name", "portfolio_preview": 1}
+        )
+        self.assertEqual(set(response.data), {"full_name", "portfolio_preview"})
+
+    def test_portfolio_paginado_por_cursor(self):
+        url = reverse("portfolio-list-create")
+        pro = self.pros[2]
+        response = self.client.get(url, {"professional_id": pro.pk, "page_size": 3})
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertIsNotNone(response.data["next"])
+
+        rest = self.client.get(response.data["next"])
+        self.assertEqual(len(rest.data["results"]), 1)
+        self.assertIsNone(rest.data["next"])
+        ids = [item["id"] for item in response.data["results"] + rest.data["results"]]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+        # sem professional_id: página vazia no mesmo formato
+        self.assertEqual(self.client.get(url).data, {"next": None, "previous": None, "results": []})
+
+
+@override_settings(
+    EMAIL_BACKEND="accounts.mail.OutboxBackend",
+    EMAIL_DELIVERY_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+class EmailOutboxTests(APITestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="esqueci@vagali.com", password="SenhaForte123")
+
+    def reset_password(self):
+        response = self.client.post(reverse("user-reset-password"), {"email": self.user.email}, format="json")
+        self.assertEqual(response.status_code, 204)
+
+    def test_reset_de_senha_vai_para_a_outbox_e_o_worker_entrega(self):
+        self.reset_password()
+        # o request só grava: nada foi enviado ainda
+        self.assertEqual(django_mail.outbox, [])
+        queued = OutgoingEmail.objects.get()
+        self.assertEqual((queued.status, queued.to), ("pendente", [self.user.email]))
+
+        call_command("send_emails", stdout=io.StringIO())
+        self.assertEqual(len(django_mail.outbox), 1)
+        self.assertEqual(django_mail.outbox[0].to, [self.user.email])
+        self.assertEqual(django_mail.outbox[0].body, queued.body)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, "enviado")
+        self.assertIsNotNone(queued.sent_at)
+
+    def test_falha_temporaria_volta_para_a_fila_com_backoff(self):
+        self.reset_password()
+        now = timezone.now()
+        error = smtplib.SMTPServerDisconnected("conexão caiu")
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=error):
+            self.assertEqual(mail.deliver_batch(now=now), {"pendente": 1})
+
+        queued = OutgoingEmail.objects.get()
+        self.assertEqual((queued.status, queued.attempts), ("pendente", 1))
+        self.assertGreater(queued.next_attempt_at, now)
+        self.assertIn("SMTPServerDisconnected", queued.last_error)
+        # antes do backoff vencer, nada sai
+        self.assertEqual(mail.deliver_batch(now=now), {})
+
+        self.assertEqual(mail.deliver_batch(now=now + timedelta(hours=2)), {"enviado": 1})
+        self.assertEqual(len(django_mail.outbox), 1)
+
+    def test_recusa_definitiva_nao_repete(self):
+        self.reset_password()
+        error = smtplib.SMTPRecipientsRefused({self.user.email: (550, b"no such user")})
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=error):
+            self.assertEqual(mail.deliver_batch(), {"falhou": 1})
+        self.assertEqual(OutgoingEmail.objects.get().status, "falhou")
@@ -0,0 +1,108 @@
+# app_servicos/api/filters.py
+
+from datetime import datetime, time, timedelta
+
+import django_filters
+from django.db.models import Count
+from django.db.models.functions import Substr
+from django.utils import timezone
+
+from app_servicos import sharding
+from app_servicos.models import CEP_REGION_DIGITS, DEMANDA_STATUS_CHOICES, Demanda
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    pass
+
+
+class CharInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    pass
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+# ---------------------------------------------------------
+# 1. Filtros de demanda
+# ---------------------------------------------------------
+class DemandaFilter(django_filters.FilterSet):
+    """
+    ?service=1,2  ?status=pendente,em_andamento  ?cep_prefix=01
+    ?created_after=2025-01-01  ?created_before=2025-01-31
+
+    Todos viram comparações diretas nas colunas (igualdade, IN ou faixa),
+    cobertas pelos índices de Demanda.Meta.indexes.
+    """
+
+    service = NumberInFilter(field_name="service_id", lookup_expr="in")
+    status = CharInFilter(field_name="status", lookup_expr="in")
+    cep_prefix = django_filters.CharFilter(method="filter_cep_prefix")
+    created_after = django_filters.DateFilter(method="filter_created_after")
+    created_before = django_filters.DateFilter(method="filter_created_before")
+
+    class Meta:
+        model = Demanda
+        fields = ("service", "status", "cep_prefix", "created_after", "created_before")
+
+    def filter_cep_prefix(self, queryset, name, value):
+        # Faixa [prefixo, prefixo + ":") em vez de LIKE 'prefixo%': o ":" vem
+        # logo depois do "9" na tabela ASCII e a faixa usa o índice de cep.
+        prefix = "".join(ch for ch in value if ch.isdigit())[:8]
+        if not prefix:
+            return queryset
+        shards = sharding.shards_for_prefix(prefix)
+        if sharding.active() and len(shards) == 1:
+            # a faixa inteira mora em um shard: não precisa espalhar
+            queryset = queryset.using(shards[0])
+        return queryset.filter(cep__gte=prefix, cep__lt=prefix + ":")
+
+    def filter_created_after(self, queryset, name, value):
+        return queryset.filter(created_at__gte=_start_of_day(value))
+
+    def filter_created_before(self, queryset, name, value):
+        # dia inclusivo
+        return queryset.filter(created_at__lt=_start_of_day(value + timedelta(days=1)))
+
+
+# ---------------------------------------------------------
+# 2. Facetas — uma única consulta agrupada
+# ---------------------------------------------------------
+STATUS_LABELS = dict(DEMANDA_STATUS_CHOICES)
+
+
+def demanda_facets(queryset):
+    """
+    Contagens por serviço, status e região de CEP para o queryset já
+    filtrado. Um GROUP BY (serviço, status, região); as três facetas são
+    somadas em Python a partir dessas poucas linhas.
+    """
+    groups = (
+        queryset.annotate(region=Substr("cep", 1, CEP_REGION_DIGITS))
+        .values("service_id", "service__name", "status", "region")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+
+    services, statuses, regions = {}, {}, {}
+    for group in groups:
+        total = group["total"]
+        service = services.setdefault(
+            group["service_id"],
+            {"id": group["service_id"], "name": group["service__name"], "count": 0},
+        )
+        service["count"] += total
+        statuses[group["status"]] = statuses.get(group["status"], 0) + total
+        regions[group["region"]] = regions.get(group["region"], 0) + total
+
+    return {
+        "service": sorted(services.values(), key=lambda s: (-s["count"], s["name"])),
+        "status": [
+            {"value": value, "label": STATUS_LABELS.get(value, value), "count": count}
+            for value, count in sorted(statuses.items(), key=lambda s: -s[1])
+        ],
+        "region": [
+            {"value": value, "count": count}
+            for value, count in sorted(regions.items())
+        ],
+    }
@@ -1,8 +1,21 @@
 # app_servicos/api/serializers.py
 
+from django.db.models import OuterRef, Subquery
+
 from rest_framework import serializers
-from app_servicos.models import Service, Demanda, Offer, Feedback
+from app_servicos.models import Service, Demanda, Offer, Feedback, ArchivedOffer
+from app_servicos.videos import METADATA, video_info
 from accounts.models import User
+from vagali_project.fastpath import (
+    FastRows,
+    Field,
+    SparseFieldsMixin,
+    absolute_file_url,
+    decimal_string,
+    iso_datetime,
+    name_or_email,
+)
+from vagali_project.instrumentation import query_site
 
 class ServiceSerializer(serializers.ModelSerializer):
     class Meta:
@@ -11,12 +24,13 @@ class ServiceSerializer(serializers.ModelSerializer):
         read_only_fields = ["id"]
 
 
-class DemandaSerializer(serializers.ModelSerializer):
+class DemandaSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     service_name = serializers.SlugRelatedField(source="service", slug_field="name", read_only=True)
     client_name = serializers.SerializerMethodField()
     professional_name = serializers.SerializerMethodField()
     service_icon = serializers.SerializerMethodField()
     accepted_offer_value = serializers.SerializerMethodField()
+    video = serializers.SerializerMethodField()
 
     # Campos para upload (aceitam null/blank)
     photos = serializers.FileField(required=False, allow_null=True)
@@ -37,6 +51,7 @@ class DemandaSerializer(serializers.ModelSerializer):
             "cep",
             "photos",
             "videos",
+            "video",
             "status",
             "created_at",
             "service_icon",
@@ -56,9 +71,14 @@ class DemandaSerializer(serializers.ModelSerializer):
             return prof.profile.full_name or prof.email
         return prof.email if prof else None
 
+    def get_video(self, obj):
+        return video_info(*(getattr(obj, column) for column in METADATA))
+
     def get_service_icon(self, obj):
         return getattr(obj.service, "icon", "🛠️")
 
+    # uma consulta por demanda no caminho normal do DRF (o caminho rápido usa Subquery)
+    @query_site("DemandaSerializer.get_accepted_offer_value")
     def get_accepted_offer_value(self, obj):
         if obj.status in ["em_andamento", "concluida"]:
             accepted = obj.offers.filter(status="aceita").first()
@@ -67,7 +87,49 @@ class DemandaSerializer(serializers.ModelSerializer):
         return None
 
 
-class OfferSerializer(serializers.ModelSerializer):
+def _accepted_offer_value(status, value):
+    if status in ("em_andamento", "concluida") and value is not None:
+        return float(value)
+    return None
+
+
+# leitura rápida das listagens (ver vagali_project/fastpath.py)
+def demanda_rows(offer_model):
+    return FastRows(
+        Field("id"),
+        Field("service", "service_id"),
+        Field("service_name", "service__name"),
+        Field("client", "client_id"),
+        Field("client_name", "client__profile__full_name", "client__email", to=name_or_email),
+        Field("professional", "professional_id"),
+        Field("professional_name", "professional__profile__full_name", "professional__email", to=name_or_email),
+        Field("titulo"),
+        Field("descricao"),
+        Field("cep"),
+        Field("photos", to=absolute_file_url),
+        Field("videos", to=absolute_file_url),
+        Field("video", *METADATA, to=video_info),
+        Field("status"),
+        Field("created_at", to=iso_datetime),
+        Field("service_icon", "service__icon"),
+        Field("accepted_offer_value", "status", "accepted_value", to=_accepted_offer_value),
+        annotations={
+            "accepted_value": Subquery(
+                offer_model.objects.filter(demanda=OuterRef("pk"), status="aceita")
+                .order_by("pk")
+                .values("proposta_valor")[:1]
+            ),
+        },
+    )
+
+
+DemandaSerializer.fast_rows = demanda_rows(Offer)
+
+# mesmas chaves sobre o arquivo (app_servicos/archive.py)
+ARCHIVED_DEMANDA_ROWS = demanda_rows(ArchivedOffer)
+
+
+class OfferSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     professional_name = serializers.SerializerMethodField()
     demanda_client_name = serializers.SerializerMethodField()
 
@@ -99,7 +161,55 @@ class OfferSerializer(serializers.ModelSerializer):
         return client.email if client else None
 
 
-class FeedbackSerializer(serializers.ModelSerializer):
+OfferSerializer.fast_rows = FastRows(
+    Field("id"),
+    Field("demanda", "demanda_id"),
+    Field("professional", "professional_id"),
+    Field("professional_name", "professional__profile__full_name", "professional__email", to=name_or_email),
+    Field("proposta_valor", to=decimal_string(2)),
+    Field("proposta_prazo"),
+    Field("status"),
+    Field("created_at", to=iso_datetime),
+    Field(
+        "demanda_client_name",
+        "demanda__client__profile__full_name",
+        "demanda__client__email",
+        to=name_or_email,
+    ),
+)
+
+
+def _ranking(score, price, rating_avg, reviews, completed, cep_match, reference):
+    return {
+        "score": round(score, 4),
+        "price_score": round(price, 4),
+        "rating_avg": round(rating_avg, 2),
+        "reviews": int(reviews),
+        "completed_jobs": int(completed),
+        "cep_match_digits": cep_match,
+        "reference_price": round(reference, 2) if reference is not None else None,
+    }
+
+
+# ofertas de uma demanda com o score de app_servicos/ranking.py (as colunas
+# do ranking são anotações já aplicadas por ranked_offers)
+RANKED_OFFER_ROWS = FastRows(
+    *OfferSerializer.fast_rows.fields,
+    Field(
+        "ranking",
+        "score",
+        "price_score",
+        "rating_avg",
+        "reviews",
+        "completed_jobs",
+        "cep_match",
+        "reference_price",
+        to=_ranking,
+    ),
+)
+
+
+class FeedbackSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     client_name = serializers.SerializerMethodField()
     professional_name = serializers.SerializerMethodField()
 
@@ -129,3 +239,16 @@ class FeedbackSerializer(serializers.ModelSerializer):
         if prof and hasattr(prof, "profile"):
             return prof.profile.full_name or prof.email
         return prof.email if prof else None
+
+
+FeedbackSerializer.fast_rows = FastRows(
+    Field("id"),
+    Field("demanda", "demanda_id"),
+    Field("client", "client_id"),
+    Field("client_name", "client__profile__full_name", "client__email", to=name_or_email),
+    Field("professional", "professional_id"),
+    Field("professional_name", "professional__profile__full_name", "professional__email", to=name_or_email),
+    Field("rating"),
+    Field("comentario"),
+    Field("created_at", to=iso_datetime),
+)
@@ -2,7 +2,16 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ServiceViewSet, DemandaViewSet, OfferViewSet, FeedbackViewSet
+from .views import (
+    ServiceViewSet,
+    DemandaViewSet,
+    OfferViewSet,
+    FeedbackViewSet,
+    MarketplaceExportView,
+    ServiceAnalyticsView,
+    BootstrapView,
+    EventLogView,
+)
 
 router = DefaultRouter()
 router.register(r"servicos", ServiceViewSet, basename="service")
@@ -11,5 +20,17 @@ router.register(r"ofertas", OfferViewSet, basename="offer")
 router.register(r"feedbacks", FeedbackViewSet, basename="feedback")
 
 urlpatterns = [
+    # Carga inicial do SPA (usuário, catálogo, demandas e ofertas)
+    path("bootstrap/", BootstrapView.as_view(), name="bootstrap"),
+
+    # Log de eventos por offset (staff)
+    path("eventos/", EventLogView.as_view(), name="event-log"),
+
+    # Exportação em streaming (staff)
+    path("export/<str:entity>/", MarketplaceExportView.as_view(), name="marketplace-export"),
+
+    # Analytics (staff) — lê apenas o rollup diário
+    path("analytics/servicos/", ServiceAnalyticsView.as_view(), name="service-analytics"),
+
     path("", include(router.urls)),
 ]
@@ -1,12 +1,90 @@
 # app_servicos/api/views.py
 
+from datetime import timedelta
+
+from django.db.models import Q, Sum
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
 from rest_framework import viewsets, permissions, exceptions, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.views import APIView
+from django_filters.rest_framework import DjangoFilterBackend
+
+from app_servicos import archive, events, pricing, ranking, rollups, sharding, sync, videos
+from app_servicos.catalog import service_catalog
+from app_servicos.models import (
+    ARCHIVABLE_STATUSES,
+    ArchivedDemanda,
+    ArchivedFeedback,
+    DailyServiceStats,
+    Demanda,
+    Feedback,
+    Offer,
+    Service,
+    cep_region,
+)
+from app_servicos.export import EXPORTS, FORMATS, iter_bytes, iter_lines, iter_rows
+from vagali_project.fastpath import FastListMixin
+from vagali_project.filters import IdsFilter
+from accounts.api.serializers import FullProfileSerializer
+from .serializers import (
+    ARCHIVED_DEMANDA_ROWS,
+    RANKED_OFFER_ROWS,
+    DemandaSerializer,
+    FeedbackSerializer,
+    OfferSerializer,
+    ServiceSerializer,
+)
+from .filters import DemandaFilter, demanda_facets
+
+
+def demandas_visiveis(user):
+    """Profissional vê as demandas abertas; cliente vê as próprias."""
+    if user.is_professional:
+        return Demanda.objects.filter(status="pendente").order_by("-created_at")
+    return Demanda.objects.filter(client=user).order_by("-created_at")
+
+
+def demandas_fora_do_feed(user, since):
+    """
+    Demandas que saíram do feed aberto do profissional desde `since` —
+    só as que já existiam quando ele recebeu o cursor (as mais novas ele
+    nunca recebeu).
+    """
+    if not user.is_professional:
+        return []
+    return (
+        Demanda.objects.filter(updated_at__gt=since, created_at__lte=since + sync.OVERLAP)
+        .exclude(status="pendente")
+        .values_list("id", flat=True)
+    )
+
+
+def ofertas_visiveis(user):
+    """Profissional vê as ofertas que enviou; cliente, as recebidas."""
+    if user.is_professional:
+        return Offer.objects.filter(professional=user).order_by("-created_at")
+    return Offer.objects.filter(demanda__client=user).order_by("-created_at")
 
-from app_servicos.models import Service, Demanda, Offer, Feedback
-from .serializers import ServiceSerializer, DemandaSerializer, OfferSerializer, FeedbackSerializer
+
+def historico_response(request, tiers):
+    """
+    Resposta das rotas de histórico: ?limit=20 (até 100) e ?before=<id do
+    último item recebido>; `next_before` nulo indica o fim.
+    """
+    try:
+        limit = max(1, min(int(request.query_params.get("limit", 20)), 100))
+        before = request.query_params.get("before")
+        before = int(before) if before else None
+    except ValueError:
+        return Response({"detail": "limit e before devem ser inteiros."}, status=400)
+
+    results, next_before = archive.read_tiers(tiers, {"request": request}, limit, before)
+    return Response({"results": results, "next_before": next_before})
 
 
 class ServiceViewSet(viewsets.ModelViewSet):
@@ -14,26 +92,78 @@ class ServiceViewSet(viewsets.ModelViewSet):
     serializer_class = ServiceSerializer
     permission_classes = [permissions.AllowAny]
 
+    @action(detail=True, methods=["get"], url_path="precos")
+    def precos(self, request, pk=None):
+        """
+        Faixa de preços (p25/p50/p75) do serviço, lida dos sketches.
+        ?region=<2 primeiros dígitos do CEP> restringe à região.
+        """
+        service = self.get_object()
+        region = cep_region(request.query_params.get("region", ""))
+        return Response(
+            {
+                "service": service.id,
+                "region": region or None,
+                **pricing.price_summary(service.id, region),
+            }
+        )
 
-class DemandaViewSet(viewsets.ModelViewSet):
+
+class DemandaViewSet(sync.DeltaSyncMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = DemandaSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [IdsFilter, DjangoFilterBackend, filters.SearchFilter]
+    filterset_class = DemandaFilter
     search_fields = ["titulo", "descricao", "cep", "service__name"]
     parser_classes = [MultiPartParser, FormParser]  # aceita multipart (arquivos)
+    sync_entity = "demanda"
 
     def get_queryset(self):
         user = self.request.user
-        if user.is_professional:
-            return Demanda.objects.filter(status="pendente").order_by("-created_at")
-        return Demanda.objects.filter(client=user).order_by("-created_at")
+        if user.is_professional and self.action in ("retrieve", "concluir"):
+            # nas ações de detalhe o profissional também alcança as demandas que atende
+            return Demanda.objects.filter(Q(status="pendente") | Q(professional=user)).order_by("-created_at")
+        return demandas_visiveis(user)
+
+    def sync_departed(self, since):
+        return demandas_fora_do_feed(self.request.user, since)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Com ?facets=1 a resposta vira {"results": [...], "facets": {...}},
+        com as contagens por serviço/status/região dos mesmos filtros.
+        """
+        response = super().list(request, *args, **kwargs)
+        if request.query_params.get("facets") not in ("1", "true"):
+            return response
+
+        facets = demanda_facets(self.filter_queryset(self.get_queryset()))
+        if isinstance(response.data, dict):
+            response.data["facets"] = facets
+        else:
+            response.data = {"results": response.data, "facets": facets}
+        return response
 
     def perform_create(self, serializer):
         user = self.request.user
         if user.is_professional:
             raise exceptions.PermissionDenied("Profissionais não podem criar demandas.")
         # serializer.save aceita arquivos porque usamos multipart parser
-        serializer.save(client=user)
+        with sharding.atomic(sharding.shard_for_cep(serializer.validated_data.get("cep"))):
+            # vídeo novo entra na fila do process_videos
+            demanda = serializer.save(
+                client=user, **videos.pending_fields(bool(serializer.validated_data.get("videos")))
+            )
+            rollups.demanda_created(demanda)
+            events.emit(
+                "demanda.criada",
+                "demanda",
+                demanda.id,
+                client=demanda.client_id,
+                service=demanda.service_id,
+                cep=demanda.cep,
+                status=demanda.status,
+            )
 
     def perform_update(self, serializer):
         demanda = serializer.instance
@@ -42,12 +172,87 @@ class DemandaViewSet(viewsets.ModelViewSet):
             raise exceptions.PermissionDenied("Você só pode editar suas próprias demandas.")
         if demanda.status != "pendente":
             raise exceptions.PermissionDenied("Só é possível editar demandas pendentes.")
-        serializer.save()
+
+        data = serializer.validated_data
+        moved = (
+            ("service" in data and data["service"].pk != demanda.service_id)
+            or ("cep" in data and cep_region(data["cep"]) != cep_region(demanda.cep))
+        )
+        with sharding.atomic(sharding.shard_of(demanda)):
+            if moved:
+                rollups.apply_demanda(demanda, -1)
+            demanda = serializer.save(**(videos.pending_fields(bool(data["videos"])) if "videos" in data else {}))
+            if moved:
+                rollups.apply_demanda(demanda, +1)
+            target = sharding.shard_for_cep(demanda.cep)
+            if target != sharding.shard_of(demanda):
+                sharding.move([demanda.id], demanda._state.db, target)
+                demanda._state.db = target
+            events.emit("demanda.atualizada", "demanda", demanda.id, fields=sorted(data))
 
     def perform_destroy(self, instance):
         if instance.status != "pendente":
             raise exceptions.PermissionDenied("Só é possível excluir demandas pendentes.")
-        instance.delete()
+        with sharding.atomic(sharding.shard_of(instance)):
+            rollups.apply_demanda(instance, -1)
+            events.emit(
+                "demanda.excluida", "demanda", instance.id, client=instance.client_id, service=instance.service_id
+            )
+            # pendente até agora: estava no feed aberto dos profissionais
+            sync.bury(
+                "demanda",
+                [
+                    {
+                        "id": instance.id,
+                        "client_id": instance.client_id,
+                        "feed_from": instance.created_at,
+                        "feed_until": timezone.now(),
+                    }
+                ],
+            )
+            sync.bury(
+                "oferta",
+                [{**offer, "client_id": instance.client_id} for offer in instance.offers.values("id", "professional_id")],
+            )
+            instance.delete()
+
+    @action(detail=False, methods=["get"], url_path="historico")
+    def historico(self, request):
+        """
+        Demandas encerradas do usuário (cliente: as próprias; profissional:
+        as que atendeu), lidas da tabela quente e do arquivo.
+        """
+        user = request.user
+        owner = {"professional": user} if user.is_professional else {"client": user}
+        return historico_response(
+            request,
+            [
+                archive.Tier(
+                    Demanda.objects.filter(status__in=ARCHIVABLE_STATUSES, **owner),
+                    DemandaSerializer.fast_rows,
+                    archived=False,
+                ),
+                archive.Tier(ArchivedDemanda.objects.filter(**owner), ARCHIVED_DEMANDA_ROWS, archived=True),
+            ],
+        )
+
+    @action(detail=True, methods=["get"], url_path="ofertas-ranqueadas")
+    def ofertas_ranqueadas(self, request, pk=None):
+        """
+        Ofertas da demanda (somente o cliente dono) ordenadas pelo score de
+        app_servicos/ranking.py, com os componentes em `ranking`.
+        """
+        demanda = self.get_object()
+        if demanda.client != request.user:
+            raise exceptions.PermissionDenied("Apenas o cliente da demanda pode comparar as ofertas.")
+
+        typical = ranking.typical_price(demanda)
+        results = RANKED_OFFER_ROWS.serialize(
+            ranking.ranked_offers(demanda, typical), self.get_serializer_context()
+        )
+        return Response(
+            {"demanda": demanda.id, "typical_price": typical, "weights": ranking.WEIGHTS, "results": results}
+        )
 
     @action(detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated])
     def concluir(self, request, pk=None):
@@ -57,20 +262,27 @@ class DemandaViewSet(viewsets.ModelViewSet):
             raise exceptions.PermissionDenied("Apenas o profissional responsável pode concluir.")
         if demanda.status != "em_andamento":
             return Response({"detail": "A demanda não está em andamento."}, status=400)
-        demanda.status = "concluida"
-        demanda.save()
+        with sharding.atomic(sharding.shard_of(demanda)):
+            demanda.status = "concluida"
+            demanda.save()
+            events.emit(
+                "demanda.concluida",
+                "demanda",
+                demanda.id,
+                professional=user.id,
+                previous_status="em_andamento",
+                status="concluida",
+            )
         return Response(DemandaSerializer(demanda).data, status=200)
 
 
-class OfferViewSet(viewsets.ModelViewSet):
+class OfferViewSet(sync.DeltaSyncMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = OfferSerializer
     permission_classes = [permissions.IsAuthenticated]
+    sync_entity = "oferta"
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_professional:
-            return Offer.objects.filter(professional=user).order_by("-created_at")
-        return Offer.objects.filter(demanda__client=user).order_by("-created_at")
+        return ofertas_visiveis(self.request.user)
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -79,32 +291,88 @@ class OfferViewSet(viewsets.ModelViewSet):
         demanda = serializer.validated_data["demanda"]
         if demanda.status != "pendente":
             raise exceptions.PermissionDenied("Esta demanda não está aberta para ofertas.")
-        serializer.save(professional=user)
+        with sharding.atomic(sharding.shard_of(demanda)):
+            oferta = serializer.save(professional=user)
+            rollups.apply_offer(oferta, +1)
+            events.emit(
+                "oferta.criada",
+                "oferta",
+                oferta.id,
+                demanda=demanda.id,
+                professional=user.id,
+                valor=oferta.proposta_valor,
+            )
 
     def perform_update(self, serializer):
         raise exceptions.PermissionDenied("Não é permitido editar uma oferta.")
 
+    def perform_destroy(self, instance):
+        with sharding.atomic(sharding.shard_of(instance)):
+            rollups.apply_offer(instance, -1)
+            events.emit(
+                "oferta.excluida",
+                "oferta",
+                instance.id,
+                demanda=instance.demanda_id,
+                professional=instance.professional_id,
+            )
+            sync.bury(
+                "oferta",
+                [
+                    {
+                        "id": instance.id,
+                        "client_id": instance.demanda.client_id,
+                        "professional_id": instance.professional_id,
+                    }
+                ],
+            )
+            instance.delete()
+
     @action(detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated])
     def aceitar(self, request, pk=None):
         oferta = self.get_object()
         user = request.user
         if oferta.demanda.client != user:
             raise exceptions.PermissionDenied("Você não pode aceitar esta oferta.")
-        if oferta.demanda.status != "pendente":
-            return Response({"detail": "A demanda não está disponível para aceitar ofertas."}, status=400)
-        oferta.status = "aceita"
-        oferta.save()
-        demanda = oferta.demanda
-        demanda.status = "em_andamento"
-        demanda.professional = oferta.professional
-        demanda.save()
-        Offer.objects.filter(demanda=demanda).exclude(id=oferta.id).update(status="rejeitada")
+        shard = sharding.shard_of(oferta)
+        with sharding.atomic(shard):
+            # relê com trava (demanda e depois oferta, a mesma ordem do
+            # expire_stale): quem chegar depois vê o status novo
+            demanda = Demanda.objects.using(shard).select_for_update().get(pk=oferta.demanda_id)
+            oferta = Offer.objects.using(shard).select_for_update().get(pk=oferta.pk)
+            if demanda.status != "pendente":
+                return Response({"detail": "A demanda não está disponível para aceitar ofertas."}, status=400)
+            if oferta.status != "pendente":
+                return Response({"detail": "Esta oferta não está mais disponível."}, status=400)
+            oferta.demanda = demanda
+            oferta.status = "aceita"
+            oferta.save()
+            demanda.status = "em_andamento"
+            demanda.professional = oferta.professional
+            demanda.save()
+            rejected = demanda.offers.exclude(id=oferta.id)
+            rejected_ids = list(rejected.values_list("id", flat=True))
+            rejected.update(status="rejeitada", updated_at=timezone.now())
+            rollups.offer_accepted(oferta)
+            # um evento cobre as três transições: oferta aceita, demanda em
+            # andamento e demais ofertas rejeitadas
+            events.emit(
+                "oferta.aceita",
+                "oferta",
+                oferta.id,
+                demanda=demanda.id,
+                professional=oferta.professional_id,
+                valor=oferta.proposta_valor,
+                demanda_status="em_andamento",
+                rejeitadas=rejected_ids,
+            )
         return Response(OfferSerializer(oferta).data)
 
 
-class FeedbackViewSet(viewsets.ModelViewSet):
+class FeedbackViewSet(sync.DeltaSyncMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = FeedbackSerializer
     permission_classes = [permissions.IsAuthenticated]
+    sync_entity = "feedback"
 
     def get_queryset(self):
         user = self.request.user
@@ -112,6 +380,19 @@ class FeedbackViewSet(viewsets.ModelViewSet):
             return Feedback.objects.filter(client=user).order_by("-created_at")
         return Feedback.objects.filter(professional=user).order_by("-created_at")
 
+    @action(detail=False, methods=["get"], url_path="historico")
+    def historico(self, request):
+        """Feedbacks feitos (cliente) ou recebidos (profissional), nos dois níveis."""
+        user = request.user
+        owner = {"professional": user} if user.is_professional else {"client": user}
+        return historico_response(
+            request,
+            [
+                archive.Tier(Feedback.objects.filter(**owner), FeedbackSerializer.fast_rows, archived=False),
+                archive.Tier(ArchivedFeedback.objects.filter(**owner), FeedbackSerializer.fast_rows, archived=True),
+            ],
+        )
+
     def perform_create(self, serializer):
         user = self.request.user
         if user.is_professional:
@@ -123,4 +404,186 @@ class FeedbackViewSet(viewsets.ModelViewSet):
             raise exceptions.PermissionDenied("Só é possível avaliar após a conclusão.")
         if hasattr(demanda, "feedback"):
             raise exceptions.PermissionDenied("Você já avaliou esta demanda.")
-        serializer.save(client=user, professional=demanda.professional)
+        with sharding.atomic(sharding.shard_of(demanda)):
+            feedback = serializer.save(client=user, professional=demanda.professional)
+            events.emit(
+                "feedback.criado",
+                "feedback",
+                feedback.id,
+                demanda=demanda.id,
+                professional=feedback.professional_id,
+                rating=feedback.rating,
+            )
+
+
+class EventLogView(APIView):
+    """
+    Leitura do log de eventos por offset (somente staff):
+    GET /api/v1/eventos/?after=<último id processado>&limit=500
+
+    O consumidor guarda `next_after` e repete; lote vazio = em dia.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        try:
+            after = int(request.query_params.get("after", 0))
+            limit = int(request.query_params.get("limit", 500))
+        except ValueError:
+            return Response({"detail": "after e limit devem ser inteiros."}, status=400)
+
+        batch = events.read(after, limit)
+        return Response(
+            {
+                "events": [events.as_dict(event) for event in batch],
+                "next_after": batch[-1].id if batch else after,
+            }
+        )
+
+
+class MarketplaceExportView(APIView):
+    """
+    Exportação em streaming (somente staff):
+    GET /api/v1/export/<demandas|ofertas|feedbacks>/?fmt=csv&gzip=1&updated_after=2026-01-01T00:00:00Z
+
+    `updated_after` traz as linhas criadas ou alteradas depois do instante;
+    `since_id` só as de id maior (não vê alterações e, com shards, os ids
+    não seguem a ordem de criação).
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, entity):
+        if entity not in EXPORTS:
+            raise exceptions.NotFound("Tabela de exportação desconhecida.")
+
+        # "format" é reservado pelo DRF para negociação de conteúdo
+        fmt = request.query_params.get("fmt", "ndjson")
+        if fmt not in FORMATS:
+            return Response({"detail": "Formato inválido (ndjson ou csv)."}, status=400)
+
+        try:
+            since_id = int(request.query_params.get("since_id", 0))
+        except ValueError:
+            return Response({"detail": "since_id deve ser um inteiro."}, status=400)
+
+        updated_after = request.query_params.get("updated_after")
+        if updated_after:
+            try:
+                updated_after = parse_datetime(updated_after)
+            except ValueError:
+                updated_after = None
+            if updated_after is None:
+                return Response({"detail": "updated_after deve ser uma data/hora ISO 8601."}, status=400)
+            if timezone.is_naive(updated_after):
+                updated_after = timezone.make_aware(updated_after)
+
+        gzip = request.query_params.get("gzip") in ("1", "true")
+
+        rows = iter_rows(entity, since_id=since_id, updated_after=updated_after or None)
+        response = StreamingHttpResponse(
+            iter_bytes(iter_lines(entity, rows, fmt), gzip=gzip),
+            content_type="text/csv; charset=utf-8" if fmt == "csv" else "application/x-ndjson",
+        )
+
+        filename = f"{entity}.{fmt}" + (".gz" if gzip else "")
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ServiceAnalyticsView(APIView):
+    """
+    Indicadores por serviço (somente staff), lidos apenas do rollup diário:
+    GET /api/v1/analytics/servicos/?start=2025-01-01&end=2025-01-31&group_by=day,service,region
+
+    Filtros opcionais: service=<id>, region=<2 dígitos do CEP>.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+    GROUPS = {"day": "day", "service": "service_id", "region": "cep_region"}
+
+    def get(self, request):
+        params = request.query_params
+        today = timezone.localdate()
+
+        start = parse_date(params.get("start", "")) or today - timedelta(days=30)
+        end = parse_date(params.get("end", "")) or today
+
+        group_by = [g for g in params.get("group_by", "day,service").split(",") if g]
+        if not group_by or any(g not in self.GROUPS for g in group_by):
+            return Response({"detail": "group_by aceita: day, service, region."}, status=400)
+        columns = [self.GROUPS[g] for g in group_by]
+
+        queryset = DailyServiceStats.objects.filter(day__range=(start, end))
+        if params.get("service"):
+            queryset = queryset.filter(service_id=params["service"])
+        if params.get("region"):
+            queryset = queryset.filter(cep_region=params["region"])
+
+        rows = (
+            queryset.values(*columns)
+            .annotate(
+                demandas=Sum("demandas_created"),
+                offers=Sum("offers_created"),
+                accepted=Sum("offers_accepted"),
+                accepted_value=Sum("accepted_value_sum"),
+            )
+            .order_by(*columns)
+        )
+
+        results = []
+        for row in rows:
+            accepted = row.pop("accepted")
+            accepted_value = row.pop("accepted_value")
+            row["offers_accepted"] = accepted
+            row["acceptance_rate"] = round(accepted / row["offers"], 4) if row["offers"] else None
+            row["avg_accepted_price"] = float(round(accepted_value / accepted, 2)) if accepted else None
+            results.append(row)
+
+        return Response({"start": start, "end": end, "results": results})
+
+
+class BootstrapView(APIView):
+    """
+    Tudo o que o SPA precisa após o login, em uma única ida e volta:
+    usuário + perfil, catálogo de serviços e a primeira página de demandas
+    e ofertas (com os totais). Número fixo de consultas.
+
+    O catálogo é versionado: se o cliente mandar `If-None-Match` com a
+    versão que já tem, `catalog.data` vem nulo e `not_modified` verdadeiro.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    page_size = 20
+
+    def get(self, request):
+        user = request.user
+        context = {"request": request}
+
+        version, services = service_catalog()
+        etag = f'"{version}"'
+        not_modified = etag in [
+            tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")
+        ]
+
+        response = Response(
+            {
+                "user": FullProfileSerializer(user, context=context).data,
+                "catalog": {
+                    "version": version,
+                    "not_modified": not_modified,
+                    "data": None if not_modified else services,
+                },
+                "demandas": self._first_page(demandas_visiveis(user), DemandaSerializer, context),
+                "ofertas": self._first_page(ofertas_visiveis(user), OfferSerializer, context),
+            }
+        )
+        response["X-Catalog-ETag"] = etag
+        return response
+
+    def _first_page(self, queryset, serializer_class, context):
+        return {
+            "count": queryset.count(),
+            "results": serializer_class.fast_rows.serialize(queryset[: self.page_size], context),
+        }
@@ -0,0 +1,187 @@
+# app_servicos/archive.py
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
+from django.utils import timezone
+
+from app_servicos import events, sharding, sync
+from app_servicos.models import (
+    ARCHIVABLE_STATUSES,
+    ArchivedDemanda,
+    ArchivedFeedback,
+    ArchivedOffer,
+    Demanda,
+    Feedback,
+    Offer,
+)
+
+
+BATCH_SIZE = 500
+
+def archive_after():
+    return timedelta(days=30 * getattr(settings, "ARCHIVE_AFTER_MONTHS", 6))
+
+
+def _columns(hot, archived):
+    """Colunas em comum (o arquivo não guarda updated_at; tem archived_at)."""
+    names = {field.attname for field in archived._meta.concrete_fields}
+    return [field.attname for field in hot._meta.concrete_fields if field.attname in names]
+
+
+# ---------------------------------------------------------
+# 1. Um lote — copia para o arquivo e apaga da tabela quente
+# ---------------------------------------------------------
+def _copy(hot, archived, queryset):
+    rows = list(queryset.values(*_columns(hot, archived)))
+    archived.objects.bulk_create([archived(**row) for row in rows])
+    return rows
+
+
+def archive_batch(cutoff, batch_size=BATCH_SIZE, shard=DEFAULT_DB_ALIAS):
+    """
+    Move até `batch_size` demandas encerradas (concluída, cancelada,
+    expirada) do `shard` criadas antes de `cutoff`, com ofertas e feedback,
+    para as tabelas de arquivo (no default). Cópia e remoção na mesma
+    transação: cada linha está em exatamente um dos dois níveis. Devolve
+    (demandas, ofertas).
+    """
+    hot = {model: model.objects.using(shard) for model in (Demanda, Offer, Feedback)}
+    ids = list(
+        hot[Demanda].filter(status__in=ARCHIVABLE_STATUSES, created_at__lt=cutoff)
+        .order_by("created_at")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0, 0
+
+    with sharding.atomic(shard):
+        ids = list(
+            hot[Demanda].select_for_update()
+            .filter(id__in=ids, status__in=ARCHIVABLE_STATUSES)
+            .values_list("id", flat=True)
+        )
+        if not ids:
+            return 0, 0
+
+        left_feed = dict(hot[Demanda].filter(id__in=ids).values_list("id", "updated_at"))
+        demandas = _copy(Demanda, ArchivedDemanda, hot[Demanda].filter(id__in=ids))
+        offers = _copy(Offer, ArchivedOffer, hot[Offer].filter(demanda_id__in=ids))
+        feedbacks = _copy(Feedback, ArchivedFeedback, hot[Feedback].filter(demanda_id__in=ids))
+
+        # para a sincronização incremental, sair da tabela quente é uma
+        # remoção — para os donos; o feed aberto já perdeu a demanda quando
+        # ela foi encerrada (updated_at)
+        clients = {demanda["id"]: demanda["client_id"] for demanda in demandas}
+        sync.bury(
+            "demanda",
+            [
+                {
+                    "id": demanda["id"],
+                    "client_id": demanda["client_id"],
+                    "feed_from": demanda["created_at"],
+                    "feed_until": left_feed[demanda["id"]],
+                }
+                for demanda in demandas
+            ],
+        )
+        sync.bury("oferta", [{**offer, "client_id": clients[offer["demanda_id"]]} for offer in offers])
+        sync.bury("feedback", feedbacks)
+
+        # ofertas e feedback vão junto pelo CASCADE; os arquivos de mídia ficam
+        hot[Demanda].filter(id__in=ids).delete()
+
+        per_demanda = {}
+        for offer in offers:
+            per_demanda[offer["demanda_id"]] = per_demanda.get(offer["demanda_id"], 0) + 1
+        events.emit_many(
+            "demanda.arquivada",
+            "demanda",
+            [(demanda_id, {"ofertas": per_demanda.get(demanda_id, 0)}) for demanda_id in ids],
+        )
+    return len(ids), len(offers)
+
+
+def sweep(now=None, max_age=None, batch_size=BATCH_SIZE, pause=0.0, max_batches=None):
+    """
+    Arquiva lote a lote, shard a shard, até não sobrar nada mais velho
+    que `max_age` (padrão: ARCHIVE_AFTER_MONTHS) ou até `max_batches`.
+    Devolve as contagens.
+    """
+    cutoff = (now or timezone.now()) - (max_age or archive_after())
+    totals = {"demandas": 0, "ofertas": 0, "batches": 0}
+
+    for shard in sharding.aliases():
+        while max_batches is None or totals["batches"] < max_batches:
+            demandas, offers = archive_batch(cutoff, batch_size, shard)
+            if not demandas:
+                break
+            totals["demandas"] += demandas
+            totals["ofertas"] += offers
+            totals["batches"] += 1
+            time.sleep(pause)
+
+    return totals
+
+
+# ---------------------------------------------------------
+# 2. Leitura nos dois níveis (histórico)
+# ---------------------------------------------------------
+class Tier:
+    """Um nível da leitura: queryset já filtrado por usuário + FastRows."""
+
+    def __init__(self, queryset, fast_rows, archived):
+        self.queryset = queryset
+        self.fast_rows = fast_rows
+        self.archived = archived
+
+
+def _position(tiers, before):
+    for tier in tiers:
+        found = tier.queryset.filter(id=before).values_list("created_at", "id").first()
+        if found:
+            return found
+    return None
+
+
+def read_tiers(tiers, context, limit, before=None):
+    """
+    Página (mais recentes primeiro) que junta os níveis por
+    (created_at, id): até limit+1 chaves de cada nível pelos índices
+    (usuário, -created_at), intercaladas, e só as escolhidas são lidas
+    por completo. `before` é o id do último item da página anterior.
+    Devolve (linhas, id para a próxima página ou None).
+    """
+    if before is not None:
+        position = _position(tiers, before)
+        if position is None:
+            return [], None
+        created_at, pk = position
+        after = Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+    else:
+        after = Q()
+
+    keys = []
+    for index, tier in enumerate(tiers):
+        queryset = tier.queryset.filter(after).order_by("-created_at", "-id")
+        keys += [(created_at, pk, index) for pk, created_at in queryset.values_list("id", "created_at")[: limit + 1]]
+    keys.sort(reverse=True)
+    page = keys[:limit]
+
+    wanted = {}
+    for _, pk, index in page:
+        wanted.setdefault(index, []).append(pk)
+
+    rows = {}
+    for index, pks in wanted.items():
+        tier = tiers[index]
+        for row in tier.fast_rows.serialize(tier.queryset.filter(id__in=pks).order_by(), context):
+            row["arquivada"] = tier.archived
+            rows[(index, row["id"])] = row
+
+    results = [rows[(index, pk)] for _, pk, index in page]
+    next_before = page[-1][1] if len(keys) > limit else None
+    return results, next_before
@@ -0,0 +1,32 @@
+# app_servicos/catalog.py
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from app_servicos.api.serializers import ServiceSerializer
+from app_servicos.models import SERVICE_CATALOG_CACHE_KEY, Service
+
+
+def service_catalog():
+    """
+    (versão, dados) do catálogo de serviços. A versão é um hash do
+    conteúdo, usada como ETag. O par fica em cache até algum Service mudar
+    neste processo (invalidate_service_catalog em models.py) ou, nos
+    demais workers e após queryset.update(), por até
+    SERVICE_CATALOG_CACHE_SECONDS.
+    """
+    cached = cache.get(SERVICE_CATALOG_CACHE_KEY)
+    if cached is not None:
+        return cached
+
+    data = ServiceSerializer(Service.objects.order_by("name"), many=True).data
+    payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True).encode()
+    version = hashlib.sha1(payload).hexdigest()[:16]
+
+    cached = (version, list(data))
+    cache.set(SERVICE_CATALOG_CACHE_KEY, cached, getattr(settings, "SERVICE_CATALOG_CACHE_SECONDS", 60))
+    return cached
@@ -0,0 +1,89 @@
+# app_servicos/events.py
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from app_servicos.models import EventConsumerOffset, MarketplaceEvent
+
+
+# Um id só fica "definitivamente pulado" depois deste tempo: antes disso
+# pode ser de uma transação que ainda não fez commit (PostgreSQL reserva o
+# valor da sequência antes do commit; rollback deixa buraco permanente).
+GAP_TIMEOUT = timedelta(seconds=5)
+MAX_BATCH = 1000
+
+
+# ---------------------------------------------------------
+# 1. Escrita — na mesma transação da transição
+# ---------------------------------------------------------
+def emit(kind, entity, entity_id, **payload):
+    """
+    Acrescenta um evento ao log. Precisa rodar dentro do
+    transaction.atomic() que grava a transição: ou os dois são
+    gravados, ou nenhum.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        raise RuntimeError("events.emit() deve rodar dentro da transação da transição.")
+    return MarketplaceEvent.objects.create(kind=kind, entity=entity, entity_id=entity_id, payload=payload)
+
+
+def emit_many(kind, entity, items):
+    """
+    Vários eventos do mesmo tipo em um INSERT (jobs em lote).
+    `items` é uma sequência de (entity_id, payload).
+    """
+    if not transaction.get_connection().in_atomic_block:
+        raise RuntimeError("events.emit_many() deve rodar dentro da transação da transição.")
+    return MarketplaceEvent.objects.bulk_create(
+        [MarketplaceEvent(kind=kind, entity=entity, entity_id=entity_id, payload=payload) for entity_id, payload in items]
+    )
+
+
+# ---------------------------------------------------------
+# 2. Leitura por offset
+# ---------------------------------------------------------
+def read(after=0, limit=500, gap_timeout=GAP_TIMEOUT):
+    """
+    Até `limit` eventos com id > after, em ordem — uma leitura por faixa
+    da chave primária. Para antes de um buraco recente na sequência, para
+    não pular eventos de transações ainda abertas.
+    """
+    limit = max(1, min(limit, MAX_BATCH))
+    events = list(MarketplaceEvent.objects.filter(id__gt=after).order_by("id")[:limit])
+
+    settled = timezone.now() - gap_timeout
+    expected = after + 1
+    for index, event in enumerate(events):
+        if event.id != expected and event.created_at > settled:
+            return events[:index]
+        expected = event.id + 1
+    return events
+
+
+def consume(name, handler, batch_size=500):
+    """
+    Processa o próximo lote do consumidor `name`: chama handler(eventos) e
+    avança a posição na mesma transação (efeitos no banco: exatamente uma
+    vez; efeitos externos: pelo menos uma vez). Devolve quantos processou.
+    """
+    with transaction.atomic():
+        offset, _ = EventConsumerOffset.objects.select_for_update().get_or_create(name=name)
+        batch = read(offset.position, batch_size)
+        if batch:
+            handler(batch)
+            offset.position = batch[-1].id
+            offset.save(update_fields=["position", "updated_at"])
+        return len(batch)
+
+
+def as_dict(event):
+    return {
+        "id": event.id,
+        "kind": event.kind,
+        "entity": event.entity,
+        "entity_id": event.entity_id,
+        "payload": event.payload,
+        "created_at": event.created_at,
+    }
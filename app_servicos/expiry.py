@@ -0,0 +1,145 @@
+# app_servicos/expiry.py
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from app_servicos import events, sharding
+from app_servicos.models import Demanda, Offer
+
+
+BATCH_SIZE = 500
+
+
+def demanda_max_age():
+    return timedelta(days=getattr(settings, "DEMANDA_EXPIRY_DAYS", 30))
+
+
+def offer_max_age():
+    return timedelta(days=getattr(settings, "OFFER_EXPIRY_DAYS", 14))
+
+
+# ---------------------------------------------------------
+# 1. Um lote — transação curta, só com as linhas do lote
+# ---------------------------------------------------------
+def _locked_pending(model, ids, shard):
+    """
+    Relê as linhas do lote ainda pendentes, travando-as (no PostgreSQL,
+    pulando as que outra transação — ex.: aceitar — está usando). O
+    aceitar também trava a demanda e confere o status de novo: das duas
+    transições, só a primeira a travar acontece.
+    """
+    return list(
+        model.objects.using(shard).select_for_update(skip_locked=True)
+        .filter(id__in=ids, status="pendente")
+        .values_list("id", flat=True)
+    )
+
+
+def expire_demandas_batch(cutoff, batch_size=BATCH_SIZE, shard=DEFAULT_DB_ALIAS):
+    """
+    Expira até `batch_size` demandas pendentes do `shard` criadas antes de
+    `cutoff` (índice demanda_status_created_idx) e rejeita as ofertas
+    pendentes delas. Devolve (demandas, ofertas) alteradas.
+    """
+    ids = list(
+        Demanda.objects.using(shard).filter(status="pendente", created_at__lt=cutoff)
+        .order_by("created_at")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0, 0
+
+    with sharding.atomic(shard):
+        ids = _locked_pending(Demanda, ids, shard)
+        if not ids:
+            return 0, 0
+        Demanda.objects.using(shard).filter(id__in=ids).update(status="expirada", updated_at=timezone.now())
+
+        offers = list(
+            Offer.objects.using(shard).select_for_update(skip_locked=True)
+            .filter(demanda_id__in=ids, status="pendente")
+            .values_list("id", "demanda_id")
+        )
+        Offer.objects.using(shard).filter(id__in=[offer_id for offer_id, _ in offers]).update(
+            status="rejeitada", updated_at=timezone.now()
+        )
+
+        events.emit_many(
+            "demanda.expirada",
+            "demanda",
+            [(demanda_id, {"previous_status": "pendente", "status": "expirada"}) for demanda_id in ids],
+        )
+        events.emit_many(
+            "oferta.expirada",
+            "oferta",
+            [(offer_id, {"demanda": demanda_id, "motivo": "demanda_expirada"}) for offer_id, demanda_id in offers],
+        )
+    return len(ids), len(offers)
+
+
+def expire_offers_batch(cutoff, batch_size=BATCH_SIZE, shard=DEFAULT_DB_ALIAS):
+    """
+    Rejeita até `batch_size` ofertas pendentes do `shard` criadas antes de
+    `cutoff` (índice offer_status_created_idx). A demanda continua aberta.
+    """
+    ids = list(
+        Offer.objects.using(shard).filter(status="pendente", created_at__lt=cutoff)
+        .order_by("created_at")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0
+
+    with sharding.atomic(shard):
+        ids = _locked_pending(Offer, ids, shard)
+        if not ids:
+            return 0
+        offers = list(Offer.objects.using(shard).filter(id__in=ids).values_list("id", "demanda_id"))
+        Offer.objects.using(shard).filter(id__in=ids).update(status="rejeitada", updated_at=timezone.now())
+        events.emit_many(
+            "oferta.expirada",
+            "oferta",
+            [(offer_id, {"demanda": demanda_id, "motivo": "prazo"}) for offer_id, demanda_id in offers],
+        )
+    return len(ids)
+
+
+# ---------------------------------------------------------
+# 2. Varredura completa (lote a lote até esvaziar)
+# ---------------------------------------------------------
+def sweep(now=None, batch_size=BATCH_SIZE, pause=0.0, max_batches=None):
+    """
+    Roda lotes, shard a shard, até não sobrar nada vencido (ou até
+    `max_batches`), com `pause` segundos entre lotes para não disputar o
+    banco. Devolve as contagens.
+    """
+    now = now or timezone.now()
+    totals = {"demandas": 0, "ofertas_de_demandas": 0, "ofertas": 0, "batches": 0}
+
+    def budget_left():
+        return max_batches is None or totals["batches"] < max_batches
+
+    for shard in sharding.aliases():
+        while budget_left():
+            demandas, offers = expire_demandas_batch(now - demanda_max_age(), batch_size, shard)
+            if not demandas:
+                break
+            totals["demandas"] += demandas
+            totals["ofertas_de_demandas"] += offers
+            totals["batches"] += 1
+            time.sleep(pause)
+
+    for shard in sharding.aliases():
+        while budget_left():
+            offers = expire_offers_batch(now - offer_max_age(), batch_size, shard)
+            if not offers:
+                break
+            totals["ofertas"] += offers
+            totals["batches"] += 1
+            time.sleep(pause)
+
+    return totals
@@ -0,0 +1,159 @@
+# app_servicos/export.py
+
+import csv
+import io
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_datetime
+
+from app_servicos.models import Demanda, Offer, Feedback
+
+
+# ---------------------------------------------------------
+# Tabelas exportáveis: (model, colunas de values_list)
+# ---------------------------------------------------------
+EXPORTS = {
+    "demandas": (
+        Demanda,
+        (
+            "id",
+            "client_id",
+            "professional_id",
+            "service_id",
+            "service__name",
+            "titulo",
+            "descricao",
+            "cep",
+            "photos",
+            "videos",
+            "status",
+            "created_at",
+            "updated_at",
+        ),
+    ),
+    "ofertas": (
+        Offer,
+        (
+            "id",
+            "demanda_id",
+            "professional_id",
+            "proposta_valor",
+            "proposta_prazo",
+            "status",
+            "created_at",
+            "updated_at",
+        ),
+    ),
+    "feedbacks": (
+        Feedback,
+        (
+            "id",
+            "demanda_id",
+            "client_id",
+            "professional_id",
+            "rating",
+            "comentario",
+            "created_at",
+            "updated_at",
+        ),
+    ),
+}
+
+FORMATS = ("ndjson", "csv")
+CHUNK_SIZE = 2000
+
+
+def iter_rows(entity, since_id=0, updated_after=None, updated_until=None, chunk_size=CHUNK_SIZE):
+    """
+    Tuplas da tabela com id > since_id e, se informado, updated_at no
+    intervalo (updated_after, updated_until] — em ordem de updated_at no
+    incremental, de id no resto. `.iterator()` usa cursor do lado do
+    servidor no PostgreSQL e busca em blocos no SQLite — a memória não
+    cresce com o tamanho da tabela.
+    """
+    model, columns = EXPORTS[entity]
+    queryset = model.objects.filter(id__gt=since_id)
+    if updated_after is not None:
+        queryset = queryset.filter(updated_at__gt=updated_after)
+    if updated_until is not None:
+        queryset = queryset.filter(updated_at__lte=updated_until)
+    ordering = ("updated_at", "id") if updated_after or updated_until else ("id",)
+    return (
+        queryset.order_by(*ordering)
+        .values_list(*columns)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def iter_lines(entity, rows, fmt="ndjson"):
+    """
+    Converte as tuplas em linhas de texto (NDJSON ou CSV com cabeçalho).
+    """
+    _, columns = EXPORTS[entity]
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            # esvazia o buffer a cada linha para manter a memória constante
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+        return
+
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + "\n"
+
+
+def iter_bytes(lines, gzip=False, flush_every=64 * 1024):
+    """
+    Codifica em UTF-8 e agrupa em blocos de ~64 KB; com `gzip=True`
+    comprime em streaming (formato .gz).
+    """
+    compressor = zlib.compressobj(wbits=31) if gzip else None
+    pending, size = [], 0
+
+    for line in lines:
+        data = line.encode("utf-8")
+        pending.append(data)
+        size += len(data)
+        if size >= flush_every:
+            block = b"".join(pending)
+            pending, size = [], 0
+            if compressor:
+                block = compressor.compress(block)
+            if block:
+                yield block
+
+    block = b"".join(pending)
+    if compressor:
+        block = compressor.compress(block) + compressor.flush()
+    if block:
+        yield block
+
+
+# ---------------------------------------------------------
+# Watermark — updated_at da última exportação, por tabela
+# ---------------------------------------------------------
+def load_watermark(path):
+    """
+    {tabela: datetime ou None}. None (ou o id numérico do formato antigo,
+    que não pega alterações) faz a próxima exportação completa.
+    """
+    try:
+        with open(path, encoding="utf-8") as fh:
+            raw = json.load(fh)
+    except FileNotFoundError:
+        return {}
+    return {entity: parse_datetime(value) if isinstance(value, str) else None for entity, value in raw.items()}
+
+
+def save_watermark(path, watermark):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({entity: value.isoformat() if value else None for entity, value in watermark.items()}, fh)
@@ -0,0 +1,310 @@
+# app_servicos/loadtest.py
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from urllib import error, parse, request
+
+
+# ---------------------------------------------------------
+# 1. CLIENTE HTTP (stdlib, uma conexão por requisição)
+# ---------------------------------------------------------
+# 1x1 PNG usado como foto da demanda
+TINY_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+# /demandas/123/aceitar/ -> /demandas/{id}/aceitar/
+ID_IN_PATH = re.compile(r"/\d+(?=/|$)")
+
+
+def multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, (filename, content_type, data) in files.items():
+        parts.append(
+            (
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                f"Content-Type: {content_type}\r\n\r\n"
+            ).encode()
+            + data
+            + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class Recorder:
+    """Latências, status e nº de consultas por endpoint (thread-safe)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)  # endpoint -> [(segundos, status, consultas)]
+        self.started = time.monotonic()
+        self.flows = 0
+
+    def add(self, endpoint, seconds, status, queries):
+        with self.lock:
+            self.samples[endpoint].append((seconds, status, queries))
+
+    def flow_done(self):
+        with self.lock:
+            self.flows += 1
+
+    def report(self):
+        elapsed = time.monotonic() - self.started
+        endpoints = {}
+        total = 0
+        for endpoint, samples in sorted(self.samples.items()):
+            latencies = sorted(seconds for seconds, _, _ in samples)
+            queries = [q for _, _, q in samples if q is not None]
+            errors = sum(1 for _, status, _ in samples if status >= 400 or status == 0)
+            total += len(samples)
+            endpoints[endpoint] = {
+                "requests": len(samples),
+                "rps": round(len(samples) / elapsed, 2),
+                "p50_ms": percentile(latencies, 0.50),
+                "p95_ms": percentile(latencies, 0.95),
+                "p99_ms": percentile(latencies, 0.99),
+                "error_rate": round(errors / len(samples), 4),
+                "status": dict(sorted(count_by(status for _, status, _ in samples).items())),
+                "queries_avg": round(sum(queries) / len(queries), 1) if queries else None,
+                "queries_max": max(queries) if queries else None,
+            }
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "requests": total,
+            "rps": round(total / elapsed, 2) if elapsed else 0,
+            "flows": self.flows,
+            "endpoints": endpoints,
+        }
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return round(sorted_values[index] * 1000, 1)
+
+
+def count_by(values):
+    counts = defaultdict(int)
+    for value in values:
+        counts[str(value)] += 1
+    return counts
+
+
+class Session:
+    def __init__(self, base_url, recorder, token=None, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.token = token
+        self.timeout = timeout
+
+    def call(self, method, path, json_body=None, fields=None, files=None, params=None):
+        status, body, _ = self.request(method, path, json_body, fields, files, params)
+        return status, body
+
+    def request(self, method, path, json_body=None, fields=None, files=None, params=None):
+        """Como call(), mas devolve também os cabeçalhos da resposta."""
+        url = f"{self.base_url}{path}"
+        if params:
+            url = f"{url}?{parse.urlencode(params)}"
+
+        headers = {"Accept": "application/json"}
+        data = None
+        if files is not None:
+            data, headers["Content-Type"] = multipart(fields or {}, files)
+        elif json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+        if self.token:
+            headers["Authorization"] = f"Token {self.token}"
+
+        endpoint = f"{method} {ID_IN_PATH.sub('/{id}', path)}"
+        started = time.perf_counter()
+        status, body, response_headers = 0, None, {}
+        try:
+            with request.urlopen(request.Request(url, data=data, headers=headers, method=method), timeout=self.timeout) as resp:
+                status, raw, response_headers = resp.status, resp.read(), resp.headers
+        except error.HTTPError as exc:
+            status, raw, response_headers = exc.code, exc.read(), exc.headers
+        except (error.URLError, OSError):
+            raw = b""
+        seconds = time.perf_counter() - started
+
+        queries = response_headers.get("X-DB-Queries")
+        self.recorder.add(endpoint, seconds, status, int(queries) if queries else None)
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = None
+        return status, body, response_headers
+
+
+# ---------------------------------------------------------
+# 2. PREPARAÇÃO — contas de teste via API
+# ---------------------------------------------------------
+# todos os logins saem do mesmo IP: acima da taxa "login_ip" o servidor
+# responde 429 e o login espera o Retry-After antes de tentar de novo
+LOGIN_ATTEMPTS = 10
+
+
+def register_and_login(base_url, recorder, email, is_professional, password="Carga#2024senha"):
+    session = Session(base_url, recorder)
+    session.call(
+        "POST",
+        "/api/v1/accounts/register/",
+        json_body={
+            "email": email,
+            "password": password,
+            "password2": password,
+            "full_name": email.split("@")[0],
+            "cpf": f"{random.randrange(10**10, 10**11)}",
+            "is_professional": is_professional,
+            "profession": "Eletricista" if is_professional else "",
+        },
+    )
+    for _ in range(LOGIN_ATTEMPTS):
+        status, body, headers = session.request(
+            "POST", "/api/v1/auth/login/", json_body={"email": email, "password": password}
+        )
+        if status != 429:
+            break
+        time.sleep(float(headers.get("Retry-After") or 1))
+    if status == 429:
+        raise RuntimeError(
+            f"Login de {email} continua limitado (HTTP 429) após {LOGIN_ATTEMPTS} tentativas — "
+            "aumente a taxa \"login_ip\" do servidor ou use menos contas."
+        )
+    if status != 200 or not body or "token" not in body:
+        raise RuntimeError(f"Login falhou para {email} (HTTP {status}).")
+    session.token = body["token"]
+    return session
+
+
+# ---------------------------------------------------------
+# 3. FLUXO DO MARKETPLACE
+# ---------------------------------------------------------
+def marketplace_flow(client, professionals, service_id, offers_per_demand=2):
+    """
+    Um ciclo completo: navegar -> demanda (multipart) -> ofertas ->
+    aceitar -> concluir -> feedback. Para no primeiro passo que falhar
+    (a falha já está registrada no Recorder).
+    """
+    client.call("GET", "/api/v1/accounts/profissionais/")
+
+    status, demanda = client.call(
+        "POST",
+        "/api/v1/demandas/",
+        fields={
+            "service": service_id,
+            "titulo": "Teste de carga",
+            "descricao": "Demanda criada pelo gerador de carga.",
+            "cep": f"{random.randrange(10**7, 10**8)}",
+        },
+        files={"photos": ("foto.png", "image/png", TINY_PNG)},
+    )
+    if status != 201:
+        return False
+
+    offers = []
+    for professional in random.sample(professionals, min(offers_per_demand, len(professionals))):
+        status, offer = professional.call(
+            "POST",
+            "/api/v1/ofertas/",
+            json_body={
+                "demanda": demanda["id"],
+                "proposta_valor": f"{random.randint(80, 900)}.00",
+                "proposta_prazo": f"{random.randint(1, 10)} dias",
+            },
+        )
+        if status == 201:
+            offers.append((professional, offer))
+    if not offers:
+        return False
+
+    professional, offer = random.choice(offers)
+    status, _ = client.call("POST", f"/api/v1/ofertas/{offer['id']}/aceitar/")
+    if status != 200:
+        return False
+
+    status, _ = professional.call("POST", f"/api/v1/demandas/{demanda['id']}/concluir/")
+    if status != 200:
+        return False
+
+    status, _ = client.call(
+        "POST",
+        "/api/v1/feedbacks/",
+        json_body={
+            "demanda": demanda["id"],
+            "professional": offer["professional"],
+            "rating": random.randint(3, 5),
+            "comentario": "Ótimo serviço.",
+        },
+    )
+    return status == 201
+
+
+def run(base_url, clients=5, professionals=3, duration=30.0, iterations=None, seed=None):
+    """
+    Cria as contas, roda os fluxos em paralelo (uma thread por cliente)
+    e devolve o relatório.
+    """
+    random.seed(seed)
+    recorder = Recorder()
+    tag = uuid.uuid4().hex[:8]
+
+    status, services = Session(base_url, recorder).call("GET", "/api/v1/servicos/")
+    if status != 200 or not services:
+        raise RuntimeError("Nenhum serviço cadastrado — crie ao menos um em /api/v1/servicos/.")
+    services = services["results"] if isinstance(services, dict) else services
+    service_ids = [service["id"] for service in services]
+
+    pros = [register_and_login(base_url, recorder, f"carga-pro-{tag}-{n}@vagali.test", True) for n in range(professionals)]
+    users = [register_and_login(base_url, recorder, f"carga-cli-{tag}-{n}@vagali.test", False) for n in range(clients)]
+
+    deadline = time.monotonic() + duration
+
+    def worker(client):
+        done = 0
+        while (iterations is None or done < iterations) and time.monotonic() < deadline:
+            if marketplace_flow(client, pros, random.choice(service_ids)):
+                recorder.flow_done()
+            done += 1
+
+    recorder.started = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(client,), daemon=True) for client in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder.report()
+
+
+# ---------------------------------------------------------
+# 4. COMPARAÇÃO COM A BASELINE
+# ---------------------------------------------------------
+def compare(report, baseline):
+    """Linhas (endpoint, métrica, antes, depois, variação %) para p95, erros e consultas."""
+    rows = []
+    for endpoint, current in report["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if not before:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "error_rate", "queries_avg"):
+            old, new = before.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            change = ((new - old) / old * 100) if old else (0.0 if new == old else float("inf"))
+            rows.append((endpoint, metric, old, new, change))
+    return rows
@@ -0,0 +1,36 @@
+# app_servicos/management/commands/archive_closed.py
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from app_servicos import archive, sync
+
+
+class Command(BaseCommand):
+    help = (
+        "Move demandas concluídas/canceladas/expiradas mais antigas que "
+        "ARCHIVE_AFTER_MONTHS (com ofertas e feedback) para as tabelas de "
+        "arquivo, em lotes curtos, e apaga as lápides de sincronização vencidas "
+        "(SYNC_TOMBSTONE_DAYS)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months", type=int, default=None, help="Sobrepõe ARCHIVE_AFTER_MONTHS.")
+        parser.add_argument("--batch-size", type=int, default=archive.BATCH_SIZE)
+        parser.add_argument("--pause", type=float, default=0.05, help="Segundos entre lotes.")
+        parser.add_argument("--max-batches", type=int, default=None)
+
+    def handle(self, *args, **options):
+        months = options["months"]
+        totals = archive.sweep(
+            max_age=timedelta(days=30 * months) if months is not None else None,
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+            max_batches=options["max_batches"],
+        )
+        self.stdout.write(
+            f"{totals['demandas']} demandas arquivadas ({totals['ofertas']} ofertas) "
+            f"em {totals['batches']} lotes."
+        )
+        self.stdout.write(f"{sync.purge()} lápides vencidas apagadas.")
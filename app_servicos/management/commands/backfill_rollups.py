@@ -0,0 +1,33 @@
+# app_servicos/management/commands/backfill_rollups.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from app_servicos import pricing
+from app_servicos.rollups import backfill
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstrói o rollup diário (DailyServiceStats) a partir das tabelas "
+        "de demandas e ofertas. Sem --since, recalcula todo o histórico e "
+        "também os sketches de preço (PriceSketch)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", default=None, help="Dia inicial (AAAA-MM-DD).")
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            since = parse_date(options["since"])
+            if since is None:
+                raise CommandError("--since deve estar no formato AAAA-MM-DD.")
+
+        total = backfill(since=since)
+        self.stdout.write(self.style.SUCCESS(f"{total} linhas de rollup gravadas."))
+
+        # sketches não são particionados por dia: só a reconstrução completa
+        if since is None:
+            sketches = pricing.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"{sketches} sketches de preço gravados."))
@@ -0,0 +1,101 @@
+# app_servicos/management/commands/bench_serializers.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from accounts.api.serializers import ProfessionalSerializer
+from accounts.models import User, Profile
+from app_servicos import sharding
+from app_servicos.api.serializers import DemandaSerializer, OfferSerializer
+from app_servicos.models import Service, Demanda, Offer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara linhas/s do serializer DRF com o caminho rápido (FastRows) "
+        "nas listagens e confere se o JSON é idêntico. Os dados gerados são desfeitos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", "--rows", type=int, default=2000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    @override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+    def handle(self, *args, **options):
+        # transação em todos os shards: o rollback desfaz tudo
+        with sharding.atomic():
+            self._seed(options["rows"])
+
+            request = Request(APIRequestFactory().get("/api/v1/"))
+            context = {"request": request}
+
+            cases = [
+                ("profissionais", ProfessionalSerializer,
+                 User.objects.filter(is_professional=True).select_related("profile").order_by("id")),
+                ("demandas", DemandaSerializer,
+                 Demanda.objects.select_related("service", "client__profile", "professional__profile")),
+                ("ofertas", OfferSerializer,
+                 Offer.objects.select_related("professional__profile", "demanda__client__profile").order_by("-created_at")),
+            ]
+            for name, serializer_class, queryset in cases:
+                self._compare(name, serializer_class, queryset, context, options["repeat"])
+
+            for alias in sharding.aliases():
+                transaction.set_rollback(True, using=alias)
+
+    def _compare(self, name, serializer_class, queryset, context, repeat):
+        renderer = JSONRenderer()
+
+        slow = fast = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            slow_data = serializer_class(queryset.all(), many=True, context=context).data
+            slow = min(slow, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            fast_data = serializer_class.fast_rows.serialize(queryset.all(), context)
+            fast = min(fast, time.perf_counter() - start)
+
+        if renderer.render(slow_data) != renderer.render(fast_data):
+            raise CommandError(f"{name}: JSON do caminho rápido difere do serializer.")
+
+        rows = len(fast_data)
+        self.stdout.write(
+            f"{name:14} {rows:6} linhas | DRF {rows / slow:10.0f} linhas/s | "
+            f"rápido {rows / fast:10.0f} linhas/s | {slow / fast:5.1f}x"
+        )
+
+    def _seed(self, rows):
+        service = Service.objects.create(name="Bench (temporário)", description="-")
+        clients = [User.objects.create_user(email=f"bench-c{i}@vagali.invalid", password="x") for i in range(20)]
+        pros = [
+            User.objects.create_user(email=f"bench-p{i}@vagali.invalid", password="x", is_professional=True)
+            for i in range(50)
+        ]
+        Profile.objects.filter(user__in=pros).update(full_name="Profissional Bench", palavras_chave="Pintura, Reparos")
+
+        demandas = Demanda.objects.bulk_create(
+            [
+                Demanda(
+                    client=clients[i % len(clients)],
+                    service=service,
+                    titulo=f"Demanda {i}",
+                    descricao="Descrição de teste",
+                    cep="01001000",
+                )
+                for i in range(rows)
+            ]
+        )
+        Offer.objects.bulk_create(
+            [
+                Offer(demanda=d, professional=pros[i % len(pros)], proposta_valor="199.90", proposta_prazo="2 dias")
+                for i, d in enumerate(demandas)
+            ]
+        )
@@ -0,0 +1,48 @@
+# app_servicos/management/commands/expire_stale.py
+
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from app_servicos import expiry
+
+
+class Command(BaseCommand):
+    help = (
+        "Expira demandas pendentes antigas (DEMANDA_EXPIRY_DAYS) e rejeita ofertas "
+        "pendentes antigas (OFFER_EXPIRY_DAYS), em lotes curtos. Com --loop, "
+        "fica rodando como agendador."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=expiry.BATCH_SIZE)
+        parser.add_argument("--pause", type=float, default=0.05, help="Segundos entre lotes.")
+        parser.add_argument("--loop", action="store_true", help="Repete a varredura a cada --interval.")
+        parser.add_argument("--interval", type=float, default=300, help="Segundos entre varreduras (--loop).")
+
+    def handle(self, *args, **options):
+        self.running = True
+        if options["loop"]:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        while True:
+            totals = expiry.sweep(batch_size=options["batch_size"], pause=options["pause"])
+            self.stdout.write(
+                f"{totals['demandas']} demandas expiradas "
+                f"({totals['ofertas_de_demandas']} ofertas rejeitadas junto), "
+                f"{totals['ofertas']} ofertas vencidas rejeitadas em {totals['batches']} lotes."
+            )
+            if not options["loop"]:
+                break
+
+            deadline = time.monotonic() + options["interval"]
+            while self.running and time.monotonic() < deadline:
+                time.sleep(min(1.0, deadline - time.monotonic()))
+            if not self.running:
+                break
+
+    def stop(self, *args):
+        self.stdout.write("Encerrando após a varredura atual...")
+        self.running = False
@@ -0,0 +1,71 @@
+# app_servicos/management/commands/loadtest.py
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app_servicos import loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        "Gerador de carga contra um servidor rodando (runserver/gunicorn): "
+        "navegação, login, demanda multipart, ofertas, aceite, conclusão e feedback. "
+        "Relata req/s, p50/p95/p99, erros e consultas SQL por endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--clients", type=int, default=5, help="Clientes simultâneos (threads).")
+        parser.add_argument("--professionals", type=int, default=3)
+        parser.add_argument("--duration", type=float, default=30, help="Segundos de carga.")
+        parser.add_argument("--iterations", type=int, default=None, help="Fluxos por cliente (opcional).")
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--save-baseline", default=None, help="Grava o relatório em JSON.")
+        parser.add_argument("--compare", default=None, help="Compara com um relatório salvo.")
+
+    def handle(self, *args, **options):
+        try:
+            report = loadtest.run(
+                options["base_url"],
+                clients=options["clients"],
+                professionals=options["professionals"],
+                duration=options["duration"],
+                iterations=options["iterations"],
+                seed=options["seed"],
+            )
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(
+            f"{report['requests']} requisições em {report['elapsed_s']}s "
+            f"({report['rps']} req/s), {report['flows']} fluxos completos."
+        )
+        self.stdout.write(
+            f"{'endpoint':<45} {'req':>6} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'erro%':>6} {'sql':>6}"
+        )
+        for endpoint, stats in report["endpoints"].items():
+            self.stdout.write(
+                f"{endpoint:<45} {stats['requests']:>6} {stats['rps']:>7} "
+                f"{_fmt(stats['p50_ms'])} {_fmt(stats['p95_ms'])} {_fmt(stats['p99_ms'])} "
+                f"{stats['error_rate'] * 100:>6.1f} {_fmt(stats['queries_avg'], 6)}"
+            )
+            failures = {code: n for code, n in stats["status"].items() if code == "0" or int(code) >= 400}
+            if failures:
+                self.stdout.write(f"    falhas por status: {failures}")
+
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as fh:
+                baseline = json.load(fh)
+            self.stdout.write("\nComparação com a baseline:")
+            for endpoint, metric, old, new, change in loadtest.compare(report, baseline):
+                self.stdout.write(f"  {endpoint:<45} {metric:<12} {old:>9} -> {new:<9} ({change:+.1f}%)")
+
+        if options["save_baseline"]:
+            with open(options["save_baseline"], "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Baseline gravada em {options['save_baseline']}."))
+
+
+def _fmt(value, width=8):
+    return f"{'-' if value is None else value:>{width}}"
@@ -0,0 +1,73 @@
+# app_servicos/management/commands/media_gc.py
+
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app_servicos.media_gc import ReferenceSet, mark, sweep
+
+
+class Command(BaseCommand):
+    help = (
+        "Coleta de lixo do MEDIA_ROOT: marca os arquivos referenciados no banco "
+        "e remove (ou coloca em quarentena) os órfãos mais antigos que a carência. "
+        "Por padrão só lista (--dry-run); use --apply para agir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--apply", action="store_true", help="Remove/move de fato os órfãos.")
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Ignora arquivos modificados há menos de N horas (padrão: 24).",
+        )
+        parser.add_argument(
+            "--quarantine",
+            default=None,
+            help="Move os órfãos para este diretório em vez de apagar.",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=50,
+            help="Máximo de arquivos removidos/movidos por segundo (0 = sem limite).",
+        )
+        parser.add_argument("--verbose-list", action="store_true", help="Lista cada órfão.")
+
+    def handle(self, *args, **options):
+        if not os.path.isdir(settings.MEDIA_ROOT):
+            raise CommandError(f"MEDIA_ROOT não encontrado: {settings.MEDIA_ROOT}")
+
+        dry_run = not options["apply"]
+
+        def report(name, size):
+            if options["verbose_list"]:
+                self.stdout.write(f"  {name} ({size} bytes)")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            refs = ReferenceSet(os.path.join(tmp, "refs.sqlite3"))
+            try:
+                total = mark(refs)
+                self.stdout.write(f"{total} arquivos referenciados no banco.")
+                stats = sweep(
+                    refs,
+                    grace_seconds=options["grace_hours"] * 3600,
+                    dry_run=dry_run,
+                    quarantine=options["quarantine"],
+                    rate=options["rate"],
+                    on_orphan=report,
+                )
+            finally:
+                refs.close()
+
+        action = "seriam removidos" if dry_run else ("movidos para quarentena" if options["quarantine"] else "removidos")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{stats['scanned']} arquivos no disco, {stats['referenced']} em uso, "
+                f"{stats['recent']} dentro da carência; {stats['orphans']} órfãos "
+                f"({stats['bytes']} bytes) {action}."
+            )
+        )
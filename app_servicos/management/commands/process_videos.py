@@ -0,0 +1,49 @@
+# app_servicos/management/commands/process_videos.py
+
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from app_servicos import videos
+
+
+class Command(BaseCommand):
+    help = (
+        "Processa os vídeos pendentes (portfólio e demandas): lê duração, "
+        "resolução e codec, move o moov para o início do MP4 (fast start) e "
+        "marca como inválido o que não é MP4/MOV. Com --loop, fica rodando "
+        "como worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=videos.BATCH_SIZE)
+        parser.add_argument("--max-batches", type=int, default=None)
+        parser.add_argument("--loop", action="store_true", help="Repete a varredura a cada --interval.")
+        parser.add_argument("--interval", type=float, default=10, help="Segundos entre varreduras (--loop).")
+
+    def handle(self, *args, **options):
+        self.running = True
+        if options["loop"]:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        while True:
+            totals = videos.sweep(batch_size=options["batch_size"], max_batches=options["max_batches"])
+            if totals["batches"] or not options["loop"]:
+                self.stdout.write(
+                    f"{totals['pronto']} vídeos prontos, {totals['invalido']} inválidos "
+                    f"em {totals['batches']} lotes."
+                )
+            if not options["loop"]:
+                break
+
+            deadline = time.monotonic() + options["interval"]
+            while self.running and time.monotonic() < deadline:
+                time.sleep(min(1.0, deadline - time.monotonic()))
+            if not self.running:
+                break
+
+    def stop(self, *args):
+        self.stdout.write("Encerrando após a varredura atual...")
+        self.running = False
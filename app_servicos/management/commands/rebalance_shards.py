@@ -0,0 +1,48 @@
+# app_servicos/management/commands/rebalance_shards.py
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from accounts.models import Profile
+from app_servicos import sharding
+from app_servicos.models import Service
+
+
+class Command(BaseCommand):
+    help = (
+        "Move para o shard certo (CEP_SHARDS) as demandas que estão fora da "
+        "faixa do seu banco — depois de mudar o número de shards ou as faixas — "
+        "com ofertas e feedback, mantendo ids e datas. Com --reference, copia "
+        "antes usuários, perfis e serviços do default para todos os shards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true", help="Só conta o que seria movido.")
+        parser.add_argument(
+            "--reference",
+            action="store_true",
+            help="Sincroniza as tabelas de referência (shard novo, importações em lote).",
+        )
+
+    def handle(self, *args, **options):
+        if options["reference"] and not options["dry_run"]:
+            for model in (get_user_model(), Profile, Service):
+                sharding.replicate_all(model, options["batch_size"])
+                self.stdout.write(f"{model._meta.label}: copiado para os shards.")
+
+        for source in sharding.aliases():
+            moved = {}
+            for groups in sharding.misplaced(source, options["batch_size"]):
+                for target, ids in groups.items():
+                    if options["dry_run"]:
+                        count = len(ids)
+                    else:
+                        count, _ = sharding.move(ids, source, target)
+                    moved[target] = moved.get(target, 0) + count
+
+            verb = "seriam movidas" if options["dry_run"] else "movidas"
+            for target, count in moved.items():
+                self.stdout.write(f"{source} -> {target}: {count} demandas {verb}.")
+
+        self.stdout.write(self.style.SUCCESS("Shards em ordem."))
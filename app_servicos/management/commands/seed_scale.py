@@ -0,0 +1,351 @@
+# app_servicos/management/commands/seed_scale.py
+
+import itertools
+import random
+import zlib
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User, Profile
+from app_servicos import pricing, rollups, sharding
+from app_servicos.models import Service, Demanda, Offer, Feedback
+
+
+# -------------------------------------------------------------------
+# 1. VOCABULÁRIO (pt-BR)
+# -------------------------------------------------------------------
+SERVICES = [
+    ("Elétrica", "⚡", ["Eletricista", "Instalação elétrica", "Quadro de luz", "Tomadas"]),
+    ("Hidráulica", "🚰", ["Encanador", "Vazamento", "Caixa d'água", "Desentupimento"]),
+    ("Pintura", "🎨", ["Pintor", "Textura", "Grafiato", "Massa corrida"]),
+    ("Limpeza", "🧽", ["Diarista", "Faxina", "Pós-obra", "Limpeza de vidros"]),
+    ("Pedreiro", "🧱", ["Pedreiro", "Reboco", "Contrapiso", "Alvenaria"]),
+    ("Marcenaria", "🪚", ["Marceneiro", "Móveis planejados", "Armários", "Portas"]),
+    ("Jardinagem", "🌿", ["Jardineiro", "Poda", "Paisagismo", "Grama"]),
+    ("Ar-condicionado", "❄️", ["Climatização", "Instalação de split", "Manutenção", "Higienização"]),
+    ("Montagem de móveis", "🪛", ["Montador", "Guarda-roupa", "Cozinha", "Escritório"]),
+    ("Gesso", "🏗️", ["Gesseiro", "Forro", "Sanca", "Drywall"]),
+    ("Vidraçaria", "🪟", ["Vidraceiro", "Box", "Espelhos", "Janelas"]),
+    ("Serralheria", "🔩", ["Serralheiro", "Portões", "Grades", "Solda"]),
+    ("Dedetização", "🐜", ["Dedetizador", "Cupins", "Baratas", "Ratos"]),
+    ("Mudanças", "🚚", ["Frete", "Carreto", "Mudança residencial", "Içamento"]),
+    ("Informática", "💻", ["Técnico de informática", "Formatação", "Redes", "Wi-Fi"]),
+    ("Chaveiro", "🔑", ["Chaveiro", "Fechaduras", "Cópias", "Abertura de portas"]),
+]
+
+FIRST_NAMES = [
+    "Ana", "João", "Maria", "José", "Francisco", "Antônio", "Carlos", "Paulo", "Pedro", "Lucas",
+    "Luiz", "Marcos", "Luís", "Gabriel", "Rafael", "Daniel", "Marcelo", "Bruno", "Eduardo", "Felipe",
+    "Juliana", "Adriana", "Márcia", "Fernanda", "Patrícia", "Aline", "Sandra", "Camila", "Amanda", "Bruna",
+    "Jéssica", "Letícia", "Júlia", "Luciana", "Vanessa", "Mariana", "Gabriela", "Vera", "Vitória", "Larissa",
+]
+LAST_NAMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa",
+    "Rocha", "Dias", "Nascimento", "Andrade", "Moreira", "Nunes", "Marques", "Machado", "Mendes", "Freitas",
+]
+
+# (prefixo de CEP, cidade, peso) — concentração em capitais do Sudeste
+CITIES = [
+    ("01", "São Paulo - SP", 18), ("02", "São Paulo - SP", 10), ("03", "São Paulo - SP", 9),
+    ("04", "São Paulo - SP", 9), ("05", "São Paulo - SP", 8), ("08", "São Paulo - SP", 6),
+    ("09", "Santo André - SP", 4), ("13", "Campinas - SP", 4), ("20", "Rio de Janeiro - RJ", 9),
+    ("22", "Rio de Janeiro - RJ", 7), ("24", "Niterói - RJ", 3), ("30", "Belo Horizonte - MG", 6),
+    ("40", "Salvador - BA", 4), ("50", "Recife - PE", 3), ("60", "Fortaleza - CE", 3),
+    ("70", "Brasília - DF", 4), ("80", "Curitiba - PR", 4), ("90", "Porto Alegre - RS", 4),
+    ("66", "Belém - PA", 2), ("69", "Manaus - AM", 2),
+]
+
+TITLES = [
+    "Preciso de {tag}", "Orçamento para {tag}", "{tag} urgente", "{tag} no apartamento",
+    "{tag} na casa", "Serviço de {tag}", "{tag} para esta semana", "{tag} no comércio",
+]
+DESCRIPTIONS = [
+    "Gostaria de um orçamento o quanto antes.",
+    "Tenho disponibilidade pela manhã, de segunda a sexta.",
+    "O serviço é em um apartamento de dois quartos.",
+    "Preciso que traga o material, se possível.",
+    "Já tenho o material, só falta a mão de obra.",
+    "Local com estacionamento na rua.",
+    "Prefiro profissional com boas avaliações.",
+]
+COMMENTS = [
+    "Ótimo profissional, recomendo!", "Serviço rápido e bem feito.", "Pontual e caprichoso.",
+    "Bom atendimento, preço justo.", "Atrasou um pouco, mas resolveu.", "Deixou tudo limpo.",
+    "", "",
+]
+DEADLINES = ["1 dia", "2 dias", "3 dias", "5 dias", "1 semana", "2 semanas", "A combinar"]
+
+# status da demanda -> peso
+DEMANDA_STATUS = [("pendente", 35), ("em_andamento", 15), ("concluida", 40), ("cancelada", 10)]
+
+
+# -------------------------------------------------------------------
+# 2. DISTRIBUIÇÕES
+# -------------------------------------------------------------------
+def zipf_cum_weights(n, s=1.1):
+    """Pesos acumulados 1/rank^s — poucos itens concentram a maior parte."""
+    return list(itertools.accumulate(1.0 / (rank ** s) for rank in range(1, n + 1)))
+
+
+def cpf_for(number):
+    """CPF válido (com dígitos verificadores) derivado de um número."""
+    base = [int(d) for d in f"{number % 10**9:09d}"]
+    for size in (9, 10):
+        total = sum(d * w for d, w in zip(base, range(size + 1, 1, -1)))
+        digit = (total * 10) % 11
+        base.append(0 if digit == 10 else digit)
+    return "".join(map(str, base))
+
+
+def free_cpfs(start, chunk=500):
+    """
+    CPFs de cpf_for(start), cpf_for(start + 1)... pulando os já
+    cadastrados (carga anterior com outro --prefix, usuários reais).
+    """
+    number = start
+    while True:
+        candidates = [cpf_for(number + i) for i in range(chunk)]
+        taken = set(Profile.objects.filter(cpf__in=candidates).values_list("cpf", flat=True))
+        yield from (cpf for cpf in candidates if cpf not in taken)
+        number += chunk
+
+
+@contextmanager
+def keep_created_at(*models):
+    """
+    bulk_create chama pre_save, e auto_now_add sobrescreveria as datas
+    espalhadas no tempo: desliga o auto_now_add durante a carga.
+    """
+    fields = [model._meta.get_field("created_at") for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+# -------------------------------------------------------------------
+# 3. COMANDO
+# -------------------------------------------------------------------
+class Command(BaseCommand):
+    help = (
+        "Gera dados de escala (usuários, perfis, demandas, ofertas, feedbacks) com "
+        "distribuição realista e determinística pela semente. Usa bulk_create em "
+        "lotes (sem sinais) e recalcula rollups/sketches ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--demandas", type=int, default=50_000)
+        parser.add_argument("--professional-ratio", type=float, default=0.2)
+        parser.add_argument("--offers-per-demanda", type=float, default=2.5, help="Média de ofertas.")
+        parser.add_argument("--days", type=int, default=365, help="Janela de datas de criação.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--prefix", default="seed", help="Prefixo dos e-mails gerados.")
+        parser.add_argument("--skip-rollups", action="store_true", help="Não recalcula rollups/sketches.")
+
+    def handle(self, *args, **options):
+        if options["users"] < 2 or not 0 < options["professional_ratio"] < 1:
+            raise CommandError("Informe --users >= 2 e --professional-ratio entre 0 e 1.")
+        prefix = options["prefix"]
+        if User.objects.filter(email__startswith=f"{prefix}-").exists():
+            raise CommandError(f"Já existem usuários '{prefix}-*'; use outro --prefix.")
+
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.now = timezone.now()
+        self.days = options["days"]
+        # mesma senha para todos: um único hash
+        self.password = make_password("vagali123")
+
+        services = self.ensure_services()
+        pros, clients = self.create_users(options["users"], options["professional_ratio"], prefix, services)
+
+        with keep_created_at(Demanda, Offer, Feedback):
+            totals = self.create_marketplace(options["demandas"], options["offers_per_demanda"], services, pros, clients)
+
+        self.stdout.write(
+            f"{len(pros)} profissionais, {len(clients)} clientes, {totals['demandas']} demandas, "
+            f"{totals['offers']} ofertas, {totals['feedbacks']} feedbacks."
+        )
+
+        if not options["skip_rollups"]:
+            self.stdout.write("Recalculando rollups e sketches de preço...")
+            rollups.backfill()
+            pricing.rebuild()
+
+        self.stdout.write(self.style.SUCCESS("Carga concluída."))
+
+    # ------------------------------------------------------------------
+    def ensure_services(self):
+        existing = set(Service.objects.values_list("name", flat=True))
+        Service.objects.bulk_create(
+            [
+                Service(name=name, icon=icon, description=f"Serviços de {name.lower()}.")
+                for name, icon, _ in SERVICES
+                if name not in existing
+            ]
+        )
+        sharding.replicate_all(Service)
+        tags = {name: words for name, _, words in SERVICES}
+        return [(pk, tags.get(name, [name])) for pk, name in Service.objects.order_by("id").values_list("id", "name")]
+
+    def created_at(self):
+        # crescimento: datas recentes são mais prováveis
+        offset = self.days * (1 - self.rng.random() ** 0.5)
+        return self.now - timedelta(days=offset, seconds=self.rng.randrange(86400))
+
+    def city(self):
+        prefix, name, _ = self.rng.choices(CITIES, cum_weights=self.city_weights)[0]
+        return f"{prefix}{self.rng.randrange(10**6):06d}", name
+
+    def person(self):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def create_users(self, total, ratio, prefix, services):
+        rng = self.rng
+        self.city_weights = list(itertools.accumulate(weight for _, _, weight in CITIES))
+        service_weights = zipf_cum_weights(len(services))
+        # --seed e --prefix: outra carga com a mesma semente começa em outro ponto
+        cpfs = free_cpfs(rng.randrange(10**9) + zlib.crc32(prefix.encode()))
+        n_pros = max(1, int(total * ratio))
+
+        pros, clients = [], []
+        for batch in batched(range(total), self.batch_size):
+            users, profiles = [], []
+            for n in batch:
+                is_pro = n < n_pros
+                user = User(
+                    email=f"{prefix}-{'pro' if is_pro else 'cli'}-{n}@vagali.test",
+                    password=self.password,
+                    is_professional=is_pro,
+                )
+                cep, address = self.city()
+                fields = {
+                    "full_name": self.person(),
+                    "cpf": next(cpfs),
+                    "phone_number": f"({rng.randint(11, 99)}) 9{rng.randrange(10**8):08d}",
+                    "cep": cep,
+                    "address": address,
+                }
+                if is_pro:
+                    _, words = rng.choices(services, cum_weights=service_weights)[0]
+                    tags = rng.sample(words, k=rng.randint(1, len(words)))
+                    fields.update(
+                        profession=tags[0],
+                        palavras_chave=", ".join(tags),
+                        bio=f"{tags[0]} com {rng.randint(1, 30)} anos de experiência em {address}.",
+                        rating=Decimal(f"{min(5.0, max(1.0, rng.gauss(4.5, 0.4))):.2f}"),
+                        has_completed_professional_setup=True,
+                    )
+                users.append(user)
+                profiles.append(Profile(user=user, **fields))
+
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                for profile in profiles:
+                    profile.user_id = profile.user.pk
+                Profile.objects.bulk_create(profiles)
+            # bulk_create não dispara sinais: cópia para os shards à mão
+            sharding.replicate(users)
+            sharding.replicate(profiles)
+
+            for user in users:
+                (pros if user.is_professional else clients).append(user.pk)
+            self.stdout.write(f"  usuários: {len(pros) + len(clients)}/{total}")
+        return pros, clients
+
+    def create_marketplace(self, total, offers_mean, services, pros, clients):
+        rng = self.rng
+        service_weights = zipf_cum_weights(len(services))
+        client_weights = zipf_cum_weights(len(clients), s=0.8)
+        pro_weights = zipf_cum_weights(len(pros), s=0.9)
+        status_weights = list(itertools.accumulate(weight for _, weight in DEMANDA_STATUS))
+        totals = {"demandas": 0, "offers": 0, "feedbacks": 0}
+
+        for batch in batched(range(total), self.batch_size):
+            demandas, plans = [], []
+            for _ in batch:
+                service_id, words = rng.choices(services, cum_weights=service_weights)[0]
+                status = rng.choices(DEMANDA_STATUS, cum_weights=status_weights)[0][0]
+                created_at = self.created_at()
+                tag = rng.choice(words)
+                demanda = Demanda(
+                    client_id=rng.choices(clients, cum_weights=client_weights)[0],
+                    service_id=service_id,
+                    titulo=rng.choice(TITLES).format(tag=tag.lower()),
+                    descricao=rng.choice(DESCRIPTIONS),
+                    cep=self.city()[0],
+                    status=status,
+                    created_at=created_at,
+                )
+
+                # ofertas: número com cauda longa; profissionais populares recebem mais
+                wanted = min(len(pros), int(rng.expovariate(1 / offers_mean)) + (status != "pendente"))
+                bidders = list(dict.fromkeys(rng.choices(pros, cum_weights=pro_weights, k=wanted)))
+                base = Decimal(rng.choice([80, 120, 150, 200, 300, 450, 600, 900, 1500]))
+                offers = [
+                    Offer(
+                        professional_id=pro_id,
+                        proposta_valor=(base * Decimal(f"{rng.uniform(0.7, 1.5):.2f}")).quantize(Decimal("0.01")),
+                        proposta_prazo=rng.choice(DEADLINES),
+                        created_at=min(self.now, created_at + timedelta(hours=rng.uniform(0.5, 72))),
+                    )
+                    for pro_id in bidders
+                ]
+
+                if status in ("em_andamento", "concluida") and offers:
+                    accepted = rng.choice(offers)
+                    for offer in offers:
+                        offer.status = "aceita" if offer is accepted else "rejeitada"
+                    demanda.professional_id = accepted.professional_id
+                elif status in ("em_andamento", "concluida"):
+                    demanda.status = status = "pendente"
+
+                demandas.append(demanda)
+                plans.append((demanda, offers))
+
+            with sharding.atomic():
+                Demanda.objects.bulk_create(demandas)
+
+                offers, feedbacks = [], []
+                for demanda, demanda_offers in plans:
+                    for offer in demanda_offers:
+                        # a instância (não só o id) leva a oferta ao shard da demanda
+                        offer.demanda = demanda
+                        offers.append(offer)
+                    if demanda.status == "concluida" and rng.random() < 0.7:
+                        feedbacks.append(
+                            Feedback(
+                                demanda=demanda,
+                                client_id=demanda.client_id,
+                                professional_id=demanda.professional_id,
+                                rating=rng.choices([5, 4, 3, 2, 1], weights=[55, 25, 10, 5, 5])[0],
+                                comentario=rng.choice(COMMENTS) or None,
+                                created_at=min(self.now, demanda.created_at + timedelta(days=rng.uniform(1, 15))),
+                            )
+                        )
+                Offer.objects.bulk_create(offers)
+                Feedback.objects.bulk_create(feedbacks)
+
+            totals["demandas"] += len(demandas)
+            totals["offers"] += len(offers)
+            totals["feedbacks"] += len(feedbacks)
+            self.stdout.write(f"  demandas: {totals['demandas']}/{total}")
+        return totals
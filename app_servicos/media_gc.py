@@ -0,0 +1,148 @@
+# app_servicos/media_gc.py
+
+import os
+import shutil
+import sqlite3
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+
+
+# ---------------------------------------------------------
+# 1. MARCAÇÃO — todas as referências a arquivos no banco
+# ---------------------------------------------------------
+def file_fields():
+    """
+    (model, campo) de todo FileField/ImageField salvo no MEDIA_ROOT local.
+    Campos novos entram sozinhos na coleta.
+    """
+    media_root = os.path.realpath(settings.MEDIA_ROOT)
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if not isinstance(field, models.FileField):
+                continue
+            storage = field.storage
+            if isinstance(storage, FileSystemStorage) and os.path.realpath(storage.location) == media_root:
+                yield model, field
+
+
+class ReferenceSet:
+    """
+    Conjunto de caminhos em um SQLite temporário (chave primária = índice):
+    a memória não cresce com o número de arquivos.
+    """
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode = OFF")
+        self.db.execute("PRAGMA synchronous = OFF")
+        self.db.execute("CREATE TABLE IF NOT EXISTS refs (name TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    def add_many(self, names):
+        self.db.executemany("INSERT OR IGNORE INTO refs VALUES (?)", ((name,) for name in names))
+
+    def __contains__(self, name):
+        return self.db.execute("SELECT 1 FROM refs WHERE name = ?", (name,)).fetchone() is not None
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM refs").fetchone()[0]
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+def mark(refs, chunk_size=5000):
+    """Lê as colunas de arquivo em streaming e grava no conjunto."""
+    for model, field in file_fields():
+        names = (
+            model._default_manager.exclude(**{field.name: ""})
+            .exclude(**{f"{field.name}__isnull": True})
+            .order_by()
+            .values_list(field.name, flat=True)
+            .iterator(chunk_size=chunk_size)
+        )
+        refs.add_many(Path(name).as_posix() for name in names)
+    return len(refs)
+
+
+# ---------------------------------------------------------
+# 2. VARREDURA — os.scandir no MEDIA_ROOT
+# ---------------------------------------------------------
+def walk(root, skip=()):
+    """(caminho relativo, DirEntry) de cada arquivo, sem listas em memória."""
+    skip = {os.path.realpath(path) for path in skip}
+    stack = [""]
+    while stack:
+        relative = stack.pop()
+        with os.scandir(os.path.join(root, relative)) as entries:
+            for entry in entries:
+                name = f"{relative}/{entry.name}" if relative else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if os.path.realpath(entry.path) not in skip:
+                        stack.append(name)
+                elif entry.is_file(follow_symlinks=False):
+                    yield name, entry
+
+
+class Throttle:
+    """Limita as operações de disco a `rate` por segundo (0 = sem limite)."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.next_at = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if now < self.next_at:
+            time.sleep(self.next_at - now)
+        self.next_at = max(now, self.next_at) + self.interval
+
+
+def sweep(refs, grace_seconds, dry_run=True, quarantine=None, rate=0, on_orphan=None):
+    """
+    Remove (ou move para `quarantine`) arquivos sem referência e mais
+    antigos que o período de carência — uploads em andamento ou ainda não
+    gravados no banco ficam de fora. Devolve as contagens.
+    """
+    root = os.path.realpath(settings.MEDIA_ROOT)
+    cutoff = time.time() - grace_seconds
+    throttle = Throttle(rate)
+    stats = {"scanned": 0, "referenced": 0, "recent": 0, "orphans": 0, "bytes": 0}
+
+    skip = [quarantine] if quarantine else []
+    for name, entry in walk(root, skip=skip):
+        stats["scanned"] += 1
+        if name in refs:
+            stats["referenced"] += 1
+            continue
+
+        info = entry.stat(follow_symlinks=False)
+        if info.st_mtime > cutoff:
+            stats["recent"] += 1
+            continue
+
+        stats["orphans"] += 1
+        stats["bytes"] += info.st_size
+        if on_orphan:
+            on_orphan(name, info.st_size)
+        if dry_run:
+            continue
+
+        throttle.wait()
+        if quarantine:
+            target = Path(quarantine) / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(entry.path, target)
+        else:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+    return stats
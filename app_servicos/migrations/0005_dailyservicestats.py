@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_servicos', '0004_alter_service_options_remove_demanda_audio_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyServiceStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Dia')),
+                ('cep_region', models.CharField(max_length=2, verbose_name='Região do CEP')),
+                ('demandas_created', models.PositiveIntegerField(default=0)),
+                ('offers_created', models.PositiveIntegerField(default=0)),
+                ('offers_accepted', models.PositiveIntegerField(default=0)),
+                ('accepted_value_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='app_servicos.service')),
+            ],
+            options={
+                'verbose_name': 'Estatística diária',
+                'verbose_name_plural': 'Estatísticas diárias',
+                'unique_together': {('day', 'service', 'cep_region')},
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_servicos', '0005_dailyservicestats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cep_region', models.CharField(blank=True, max_length=2, verbose_name='Região do CEP')),
+                ('kind', models.CharField(choices=[('oferta', 'Ofertas enviadas'), ('aceita', 'Ofertas aceitas')], max_length=10, verbose_name='Tipo')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('zero_count', models.PositiveIntegerField(default=0)),
+                ('bins', models.JSONField(default=dict)),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_sketches', to='app_servicos.service')),
+            ],
+            options={
+                'verbose_name': 'Sketch de preços',
+                'verbose_name_plural': 'Sketches de preços',
+                'unique_together': {('service', 'cep_region', 'kind')},
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_servicos', '0006_pricesketch'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='demanda',
+            index=models.Index(fields=['status', '-created_at'], name='demanda_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='demanda',
+            index=models.Index(fields=['client', '-created_at'], name='demanda_client_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='demanda',
+            index=models.Index(fields=['service', 'status', '-created_at'], name='demanda_service_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='demanda',
+            index=models.Index(fields=['status', 'cep'], name='demanda_status_cep_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='demanda',
+            index=models.Index(fields=['cep'], name='demanda_cep_idx'),
+        ),
+    ]
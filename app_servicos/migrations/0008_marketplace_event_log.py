@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:15
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_servicos', '0007_demanda_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventConsumerOffset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Consumidor')),
+                ('position', models.BigIntegerField(default=0, verbose_name='Posição')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Posição de consumidor',
+                'verbose_name_plural': 'Posições de consumidores',
+            },
+        ),
+        migrations.CreateModel(
+            name='MarketplaceEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('demanda.criada', 'Demanda criada'), ('demanda.atualizada', 'Demanda atualizada'), ('demanda.excluida', 'Demanda excluída'), ('demanda.concluida', 'Demanda concluída'), ('oferta.criada', 'Oferta criada'), ('oferta.excluida', 'Oferta excluída'), ('oferta.aceita', 'Oferta aceita'), ('feedback.criado', 'Feedback criado')], max_length=40, verbose_name='Tipo')),
+                ('entity', models.CharField(max_length=20, verbose_name='Entidade')),
+                ('entity_id', models.BigIntegerField(verbose_name='ID da entidade')),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Evento',
+                'verbose_name_plural': 'Eventos',
+                'ordering': ['id'],
+            },
+        ),
+    ]
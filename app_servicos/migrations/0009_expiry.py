@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_servicos', '0008_marketplace_event_log'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='demanda',
+            name='status',
+            field=models.CharField(choices=[('pendente', 'Pendente'), ('aceita', 'Aceita'), ('em_andamento', 'Em Andamento'), ('concluida', 'Concluída'), ('cancelada', 'Cancelada'), ('expirada', 'Expirada')], default='pendente', max_length=20, verbose_name='Status'),
+        ),
+        migrations.AlterField(
+            model_name='marketplaceevent',
+            name='kind',
+            field=models.CharField(choices=[('demanda.criada', 'Demanda criada'), ('demanda.atualizada', 'Demanda atualizada'), ('demanda.excluida', 'Demanda excluída'), ('demanda.concluida', 'Demanda concluída'), ('demanda.expirada', 'Demanda expirada'), ('oferta.criada', 'Oferta criada'), ('oferta.excluida', 'Oferta excluída'), ('oferta.aceita', 'Oferta aceita'), ('oferta.expirada', 'Oferta expirada'), ('feedback.criado', 'Feedback criado')], max_length=40, verbose_name='Tipo'),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['status', 'created_at'], name='offer_status_created_idx'),
+        ),
+    ]
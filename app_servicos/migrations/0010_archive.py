@@ -0,0 +1,95 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_servicos', '0009_expiry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='marketplaceevent',
+            name='kind',
+            field=models.CharField(choices=[('demanda.criada', 'Demanda criada'), ('demanda.atualizada', 'Demanda atualizada'), ('demanda.excluida', 'Demanda excluída'), ('demanda.concluida', 'Demanda concluída'), ('demanda.expirada', 'Demanda expirada'), ('oferta.criada', 'Oferta criada'), ('oferta.excluida', 'Oferta excluída'), ('oferta.aceita', 'Oferta aceita'), ('oferta.expirada', 'Oferta expirada'), ('feedback.criado', 'Feedback criado'), ('demanda.arquivada', 'Demanda arquivada')], max_length=40, verbose_name='Tipo'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedDemanda',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('titulo', models.CharField(max_length=255, verbose_name='Título')),
+                ('descricao', models.TextField(verbose_name='Descrição')),
+                ('cep', models.CharField(max_length=8, verbose_name='CEP')),
+                ('photos', models.FileField(blank=True, null=True, upload_to='demandas/photos/')),
+                ('videos', models.FileField(blank=True, null=True, upload_to='demandas/videos/')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('aceita', 'Aceita'), ('em_andamento', 'Em Andamento'), ('concluida', 'Concluída'), ('cancelada', 'Cancelada'), ('expirada', 'Expirada')], max_length=20, verbose_name='Status')),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('professional', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app_servicos.service')),
+            ],
+            options={
+                'verbose_name': 'Demanda arquivada',
+                'verbose_name_plural': 'Demandas arquivadas',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedFeedback',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('rating', models.PositiveSmallIntegerField(choices=[(1, '1'), (2, '2'), (3, '3'), (4, '4'), (5, '5')], verbose_name='Avaliação')),
+                ('comentario', models.TextField(blank=True, null=True, verbose_name='Comentário')),
+                ('created_at', models.DateTimeField()),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('demanda', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='feedback', to='app_servicos.archiveddemanda')),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Feedback arquivado',
+                'verbose_name_plural': 'Feedbacks arquivados',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOffer',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('proposta_valor', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Valor')),
+                ('proposta_prazo', models.CharField(max_length=50, verbose_name='Prazo')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('aceita', 'Aceita'), ('rejeitada', 'Rejeitada')], max_length=20, verbose_name='Status Oferta')),
+                ('created_at', models.DateTimeField()),
+                ('demanda', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offers', to='app_servicos.archiveddemanda')),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Oferta arquivada',
+                'verbose_name_plural': 'Ofertas arquivadas',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archiveddemanda',
+            index=models.Index(fields=['client', '-created_at'], name='archdemanda_client_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archiveddemanda',
+            index=models.Index(fields=['professional', '-created_at'], name='archdemanda_prof_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedfeedback',
+            index=models.Index(fields=['client', '-created_at'], name='archfeedback_client_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedfeedback',
+            index=models.Index(fields=['professional', '-created_at'], name='archfeedback_prof_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedoffer',
+            index=models.Index(fields=['professional', '-created_at'], name='archoffer_prof_idx'),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:27
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def updated_from_created(apps, schema_editor):
+    # linhas antigas: "última alteração" = criação, não a hora da migração
+    for name in ("Demanda", "Offer", "Feedback"):
+        apps.get_model("app_servicos", name).objects.update(updated_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_servicos', '0010_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(max_length=20, verbose_name='Entidade')),
+                ('entity_id', models.BigIntegerField(verbose_name='ID da entidade')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Lápide',
+                'verbose_name_plural': 'Lápides',
+            },
+        ),
+        migrations.AddField(
+            model_name='demanda',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(updated_from_created, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='demanda',
+            index=models.Index(fields=['client', 'updated_at'], name='demanda_client_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='demanda',
+            index=models.Index(fields=['status', 'updated_at'], name='demanda_status_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['client', 'updated_at'], name='feedback_client_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['professional', 'updated_at'], name='feedback_prof_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['professional', 'updated_at'], name='offer_prof_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['updated_at'], name='offer_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['entity', 'deleted_at'], name='tombstone_entity_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_servicos', '0011_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShardSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Modelo')),
+                ('last', models.BigIntegerField(default=0, verbose_name='Último')),
+            ],
+            options={
+                'verbose_name': 'Sequência de shard',
+                'verbose_name_plural': 'Sequências de shard',
+            },
+        ),
+    ]
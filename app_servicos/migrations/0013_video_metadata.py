@@ -0,0 +1,78 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def queue_existing_videos(apps, schema_editor):
+    # vídeos enviados antes: entram na fila do process_videos
+    Demanda = apps.get_model("app_servicos", "Demanda")
+    Demanda.objects.using(schema_editor.connection.alias).exclude(videos="").exclude(videos=None).update(
+        video_status="pendente"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_servicos', '0012_sharding'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archiveddemanda',
+            name='video_codec',
+            field=models.CharField(blank=True, default='', max_length=16, verbose_name='Codec'),
+        ),
+        migrations.AddField(
+            model_name='archiveddemanda',
+            name='video_duration',
+            field=models.FloatField(blank=True, null=True, verbose_name='Duração (s)'),
+        ),
+        migrations.AddField(
+            model_name='archiveddemanda',
+            name='video_height',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Altura'),
+        ),
+        migrations.AddField(
+            model_name='archiveddemanda',
+            name='video_status',
+            field=models.CharField(blank=True, choices=[('pendente', 'Pendente'), ('pronto', 'Pronto'), ('invalido', 'Inválido')], default='', max_length=10, verbose_name='Status do vídeo'),
+        ),
+        migrations.AddField(
+            model_name='archiveddemanda',
+            name='video_width',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Largura'),
+        ),
+        migrations.AddField(
+            model_name='demanda',
+            name='video_codec',
+            field=models.CharField(blank=True, default='', max_length=16, verbose_name='Codec'),
+        ),
+        migrations.AddField(
+            model_name='demanda',
+            name='video_duration',
+            field=models.FloatField(blank=True, null=True, verbose_name='Duração (s)'),
+        ),
+        migrations.AddField(
+            model_name='demanda',
+            name='video_height',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Altura'),
+        ),
+        migrations.AddField(
+            model_name='demanda',
+            name='video_status',
+            field=models.CharField(blank=True, choices=[('pendente', 'Pendente'), ('pronto', 'Pronto'), ('invalido', 'Inválido')], default='', max_length=10, verbose_name='Status do vídeo'),
+        ),
+        migrations.AddField(
+            model_name='demanda',
+            name='video_width',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Largura'),
+        ),
+        migrations.RunPython(queue_existing_videos, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='demanda',
+            index=models.Index(condition=models.Q(('video_status', 'pendente')), fields=['id'], name='demanda_video_pending_idx'),
+        ),
+    ]
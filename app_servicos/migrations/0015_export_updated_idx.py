@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_servicos', '0014_tombstone_owner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='demanda',
+            index=models.Index(fields=['updated_at'], name='demanda_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['updated_at'], name='feedback_updated_idx'),
+        ),
+    ]
@@ -2,8 +2,15 @@
 
 from django.db import models
 from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
+from app_servicos.sharding import ShardedQuerySet
+from vagali_project.mp4 import VIDEO_STATUS_CHOICES
+
 # --- Status de demandas ---
 DEMANDA_STATUS_CHOICES = [
     ('pendente', 'Pendente'),
@@ -11,8 +18,17 @@ DEMANDA_STATUS_CHOICES = [
     ('em_andamento', 'Em Andamento'),
     ('concluida', 'Concluída'),
     ('cancelada', 'Cancelada'),
+    ('expirada', 'Expirada'),
 ]
 
+# --- Região de CEP: os 2 primeiros dígitos (sub-região postal) ---
+CEP_REGION_DIGITS = 2
+
+
+def cep_region(cep):
+    return (cep or "")[:CEP_REGION_DIGITS]
+
+
 # --- Status de ofertas ---
 OFFER_STATUS_CHOICES = [
     ('pendente', 'Pendente'),
@@ -38,6 +54,16 @@ class Service(models.Model):
         ordering = ['name']
 
 
+# Catálogo de serviços em cache (app_servicos/catalog.py); alteração em
+# Service descarta a versão atual do processo (os demais expiram sozinhos).
+SERVICE_CATALOG_CACHE_KEY = 'app_servicos:service_catalog'
+
+
+@receiver([post_save, post_delete], sender=Service)
+def invalidate_service_catalog(sender, **kwargs):
+    cache.delete(SERVICE_CATALOG_CACHE_KEY)
+
+
 # ---------------------------------------------------------
 # 2. Demanda (Pedido de cliente)
 # ---------------------------------------------------------
@@ -73,8 +99,20 @@ class Demanda(models.Model):
     photos = models.FileField(upload_to="demandas/photos/", null=True, blank=True)
     videos = models.FileField(upload_to="demandas/videos/", null=True, blank=True)
 
+    # preenchidos por manage.py process_videos (app_servicos/videos.py)
+    video_status = models.CharField(_('Status do vídeo'), max_length=10, choices=VIDEO_STATUS_CHOICES, blank=True, default='')
+    video_duration = models.FloatField(_('Duração (s)'), null=True, blank=True)
+    video_width = models.PositiveIntegerField(_('Largura'), null=True, blank=True)
+    video_height = models.PositiveIntegerField(_('Altura'), null=True, blank=True)
+    video_codec = models.CharField(_('Codec'), max_length=16, blank=True, default='')
+
     status = models.CharField(_('Status'), max_length=20, choices=DEMANDA_STATUS_CHOICES, default='pendente')
     created_at = models.DateTimeField(auto_now_add=True)
+    # sincronização incremental (?since=); update() em lote precisa setar à mão
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # shard pela região do CEP (app_servicos/sharding.py)
+    objects = ShardedQuerySet.as_manager()
 
     def __str__(self):
         return f"Demanda #{self.id} - {self.titulo}"
@@ -83,6 +121,24 @@ class Demanda(models.Model):
         verbose_name = _('Demanda')
         verbose_name_plural = _('Demandas')
         ordering = ['-created_at']
+        indexes = [
+            # feed do profissional (status) e filtros por data
+            models.Index(fields=['status', '-created_at'], name='demanda_status_created_idx'),
+            # lista do cliente
+            models.Index(fields=['client', '-created_at'], name='demanda_client_created_idx'),
+            # filtro por serviço (+ status / data)
+            models.Index(fields=['service', 'status', '-created_at'], name='demanda_service_status_idx'),
+            # filtro por prefixo de CEP (faixa) com ou sem status
+            models.Index(fields=['status', 'cep'], name='demanda_status_cep_idx'),
+            models.Index(fields=['cep'], name='demanda_cep_idx'),
+            # ?since= do cliente e do feed do profissional (app_servicos/sync.py)
+            models.Index(fields=['client', 'updated_at'], name='demanda_client_updated_idx'),
+            models.Index(fields=['status', 'updated_at'], name='demanda_status_updated_idx'),
+            # exportação incremental (app_servicos/export.py)
+            models.Index(fields=['updated_at'], name='demanda_updated_idx'),
+            # fila do process_videos
+            models.Index(fields=['id'], condition=models.Q(video_status='pendente'), name='demanda_video_pending_idx'),
+        ]
 
 
 # ---------------------------------------------------------
@@ -108,6 +164,10 @@ class Offer(models.Model):
 
     status = models.CharField(_('Status Oferta'), max_length=20, choices=OFFER_STATUS_CHOICES, default='pendente')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # mesmo shard da demanda
+    objects = ShardedQuerySet.as_manager()
 
     def __str__(self):
         return f"Oferta #{self.id} - {self.demanda.titulo}"
@@ -116,6 +176,13 @@ class Offer(models.Model):
         unique_together = ('demanda', 'professional')
         verbose_name = _('Oferta')
         verbose_name_plural = _('Ofertas')
+        indexes = [
+            # varredura de ofertas pendentes antigas (app_servicos/expiry.py)
+            models.Index(fields=['status', 'created_at'], name='offer_status_created_idx'),
+            # ?since= (profissional pelas próprias; cliente pela faixa de datas + join)
+            models.Index(fields=['professional', 'updated_at'], name='offer_prof_updated_idx'),
+            models.Index(fields=['updated_at'], name='offer_updated_idx'),
+        ]
 
 
 # ---------------------------------------------------------
@@ -146,6 +213,9 @@ class Feedback(models.Model):
     rating = models.PositiveSmallIntegerField(_('Avaliação'), choices=[(i, str(i)) for i in range(1, 6)])
     comentario = models.TextField(_('Comentário'), blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ShardedQuerySet.as_manager()
 
     def __str__(self):
         return f"Avaliação {self.rating} para {self.professional.email}"
@@ -153,3 +223,326 @@ class Feedback(models.Model):
     class Meta:
         verbose_name = _('Feedback')
         verbose_name_plural = _('Feedbacks')
+        indexes = [
+            models.Index(fields=['client', 'updated_at'], name='feedback_client_updated_idx'),
+            models.Index(fields=['professional', 'updated_at'], name='feedback_prof_updated_idx'),
+            # exportação incremental (app_servicos/export.py)
+            models.Index(fields=['updated_at'], name='feedback_updated_idx'),
+        ]
+
+
+# ---------------------------------------------------------
+# 5. Rollup diário (analytics) — dia x serviço x região de CEP
+# ---------------------------------------------------------
+class DailyServiceStats(models.Model):
+    """
+    Contadores pré-agregados, mantidos incrementalmente por
+    app_servicos/rollups.py e reconstruídos por `manage.py backfill_rollups`.
+
+    - Demandas contam no dia de criação da demanda.
+    - Ofertas (criadas / aceitas / valor aceito) contam no dia de criação
+      da oferta, com serviço e região da demanda.
+    """
+
+    day = models.DateField(_('Dia'))
+    service = models.ForeignKey(
+        Service,
+        on_delete=models.CASCADE,
+        related_name='daily_stats'
+    )
+    cep_region = models.CharField(_('Região do CEP'), max_length=CEP_REGION_DIGITS)
+
+    demandas_created = models.PositiveIntegerField(default=0)
+    offers_created = models.PositiveIntegerField(default=0)
+    offers_accepted = models.PositiveIntegerField(default=0)
+    accepted_value_sum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.day} - {self.service_id} - {self.cep_region}"
+
+    class Meta:
+        unique_together = ('day', 'service', 'cep_region')
+        verbose_name = _('Estatística diária')
+        verbose_name_plural = _('Estatísticas diárias')
+
+
+# ---------------------------------------------------------
+# 6. Sketch de preços — quantis por serviço x região de CEP
+# ---------------------------------------------------------
+PRICE_SKETCH_KINDS = [
+    ('oferta', 'Ofertas enviadas'),
+    ('aceita', 'Ofertas aceitas'),
+]
+
+
+class PriceSketch(models.Model):
+    """
+    Histograma logarítmico (ver app_servicos/pricing.py) dos valores de
+    oferta. `cep_region` vazio guarda o agregado de todas as regiões.
+    """
+
+    service = models.ForeignKey(
+        Service,
+        on_delete=models.CASCADE,
+        related_name='price_sketches'
+    )
+    cep_region = models.CharField(_('Região do CEP'), max_length=CEP_REGION_DIGITS, blank=True)
+    kind = models.CharField(_('Tipo'), max_length=10, choices=PRICE_SKETCH_KINDS)
+
+    count = models.PositiveIntegerField(default=0)
+    zero_count = models.PositiveIntegerField(default=0)
+    bins = models.JSONField(default=dict)
+
+    def __str__(self):
+        return f"{self.service_id} - {self.cep_region or 'todas'} - {self.kind}"
+
+    class Meta:
+        unique_together = ('service', 'cep_region', 'kind')
+        verbose_name = _('Sketch de preços')
+        verbose_name_plural = _('Sketches de preços')
+
+
+# ---------------------------------------------------------
+# 7. Log de eventos (outbox transacional)
+# ---------------------------------------------------------
+EVENT_KINDS = [
+    ('demanda.criada', 'Demanda criada'),
+    ('demanda.atualizada', 'Demanda atualizada'),
+    ('demanda.excluida', 'Demanda excluída'),
+    ('demanda.concluida', 'Demanda concluída'),
+    ('demanda.expirada', 'Demanda expirada'),
+    ('oferta.criada', 'Oferta criada'),
+    ('oferta.excluida', 'Oferta excluída'),
+    ('oferta.aceita', 'Oferta aceita'),
+    ('oferta.expirada', 'Oferta expirada'),
+    ('feedback.criado', 'Feedback criado'),
+    ('demanda.arquivada', 'Demanda arquivada'),
+]
+
+
+class MarketplaceEvent(models.Model):
+    """
+    Evento gravado na mesma transação da transição (app_servicos/events.py).
+    O id é a sequência: consumidores leem faixas `id > offset` pelo índice
+    da chave primária. Somente inserção — não há update nem delete.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(_('Tipo'), max_length=40, choices=EVENT_KINDS)
+    entity = models.CharField(_('Entidade'), max_length=20)
+    entity_id = models.BigIntegerField(_('ID da entidade'))
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"#{self.id} {self.kind} {self.entity}:{self.entity_id}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Eventos são somente inserção.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Eventos são somente inserção.")
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = _('Evento')
+        verbose_name_plural = _('Eventos')
+
+
+class EventConsumerOffset(models.Model):
+    """Última posição processada por cada consumidor do log de eventos."""
+
+    name = models.CharField(_('Consumidor'), max_length=100, unique=True)
+    position = models.BigIntegerField(_('Posição'), default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.position}"
+
+    class Meta:
+        verbose_name = _('Posição de consumidor')
+        verbose_name_plural = _('Posições de consumidores')
+
+
+# ---------------------------------------------------------
+# 8. Arquivo — demandas encerradas antigas (app_servicos/archive.py)
+# ---------------------------------------------------------
+# Mesmas colunas (e mesmos ids) das tabelas quentes; as listagens e buscas
+# do dia a dia não passam por aqui, só o histórico.
+ARCHIVABLE_STATUSES = ('concluida', 'cancelada', 'expirada')
+
+
+class ArchivedDemanda(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+
+    client = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    professional = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    service = models.ForeignKey(
+        Service,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+
+    titulo = models.CharField(_('Título'), max_length=255)
+    descricao = models.TextField(_('Descrição'))
+    cep = models.CharField(_('CEP'), max_length=8)
+
+    # os arquivos continuam onde estão (e contam como referenciados no media_gc)
+    photos = models.FileField(upload_to="demandas/photos/", null=True, blank=True)
+    videos = models.FileField(upload_to="demandas/videos/", null=True, blank=True)
+    video_status = models.CharField(_('Status do vídeo'), max_length=10, choices=VIDEO_STATUS_CHOICES, blank=True, default='')
+    video_duration = models.FloatField(_('Duração (s)'), null=True, blank=True)
+    video_width = models.PositiveIntegerField(_('Largura'), null=True, blank=True)
+    video_height = models.PositiveIntegerField(_('Altura'), null=True, blank=True)
+    video_codec = models.CharField(_('Codec'), max_length=16, blank=True, default='')
+
+    status = models.CharField(_('Status'), max_length=20, choices=DEMANDA_STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Demanda arquivada #{self.id} - {self.titulo}"
+
+    class Meta:
+        verbose_name = _('Demanda arquivada')
+        verbose_name_plural = _('Demandas arquivadas')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['client', '-created_at'], name='archdemanda_client_idx'),
+            models.Index(fields=['professional', '-created_at'], name='archdemanda_prof_idx'),
+        ]
+
+
+class ArchivedOffer(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+
+    demanda = models.ForeignKey(
+        ArchivedDemanda,
+        on_delete=models.CASCADE,
+        related_name='offers'
+    )
+    professional = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+
+    proposta_valor = models.DecimalField(_('Valor'), max_digits=10, decimal_places=2)
+    proposta_prazo = models.CharField(_('Prazo'), max_length=50)
+
+    status = models.CharField(_('Status Oferta'), max_length=20, choices=OFFER_STATUS_CHOICES)
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Oferta arquivada #{self.id}"
+
+    class Meta:
+        verbose_name = _('Oferta arquivada')
+        verbose_name_plural = _('Ofertas arquivadas')
+        indexes = [
+            models.Index(fields=['professional', '-created_at'], name='archoffer_prof_idx'),
+        ]
+
+
+class ArchivedFeedback(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+
+    demanda = models.OneToOneField(
+        ArchivedDemanda,
+        on_delete=models.CASCADE,
+        related_name='feedback'
+    )
+    client = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    professional = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+
+    rating = models.PositiveSmallIntegerField(_('Avaliação'), choices=[(i, str(i)) for i in range(1, 6)])
+    comentario = models.TextField(_('Comentário'), blank=True, null=True)
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Avaliação arquivada {self.rating} (#{self.id})"
+
+    class Meta:
+        verbose_name = _('Feedback arquivado')
+        verbose_name_plural = _('Feedbacks arquivados')
+        indexes = [
+            models.Index(fields=['client', '-created_at'], name='archfeedback_client_idx'),
+            models.Index(fields=['professional', '-created_at'], name='archfeedback_prof_idx'),
+        ]
+
+
+# ---------------------------------------------------------
+# 9. Lápides — remoções para a sincronização incremental
+# ---------------------------------------------------------
+class Tombstone(models.Model):
+    """
+    Registro de uma linha que saiu das tabelas quentes (exclusão ou
+    arquivo), devolvido em `removed` pelo ?since= (app_servicos/sync.py)
+    só a quem via a linha: o cliente e o profissional donos e, para
+    demandas, os profissionais que a tinham no feed aberto
+    (feed_from <= cursor < feed_until). Expira após SYNC_TOMBSTONE_DAYS.
+    """
+
+    entity = models.CharField(_('Entidade'), max_length=20)
+    entity_id = models.BigIntegerField(_('ID da entidade'))
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    client = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='+'
+    )
+    professional = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='+'
+    )
+    # período em que a demanda esteve no feed aberto (criação → saída)
+    feed_from = models.DateTimeField(null=True, blank=True)
+    feed_until = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.entity}:{self.entity_id} @ {self.deleted_at}"
+
+    class Meta:
+        verbose_name = _('Lápide')
+        verbose_name_plural = _('Lápides')
+        indexes = [
+            models.Index(fields=['entity', 'deleted_at'], name='tombstone_entity_deleted_idx'),
+            models.Index(fields=['client', 'entity', 'deleted_at'], name='tombstone_client_idx'),
+            models.Index(fields=['professional', 'entity', 'deleted_at'], name='tombstone_prof_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
+
+
+# ---------------------------------------------------------
+# 10. Contador de ids por shard (app_servicos/sharding.py)
+# ---------------------------------------------------------
+class ShardSequence(models.Model):
+    """Último id reservado de um modelo particionado neste banco."""
+
+    name = models.CharField(_('Modelo'), max_length=100, unique=True)
+    last = models.BigIntegerField(_('Último'), default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.last}"
+
+    class Meta:
+        verbose_name = _('Sequência de shard')
+        verbose_name_plural = _('Sequências de shard')
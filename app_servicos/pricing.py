@@ -0,0 +1,158 @@
+# app_servicos/pricing.py
+
+import math
+from itertools import chain
+
+from django.db import IntegrityError, transaction
+
+from app_servicos.models import PRICE_SKETCH_KINDS, ArchivedOffer, Offer, PriceSketch, cep_region
+
+
+# ---------------------------------------------------------
+# 1. Sketch de quantis (histograma logarítmico, estilo DDSketch)
+# ---------------------------------------------------------
+# Cada valor cai no balde ceil(log_gamma(v)); o quantil devolvido tem erro
+# relativo de no máximo ALPHA. Dois sketches se combinam somando baldes,
+# e o número de baldes é limitado (~460 entre R$ 1 e R$ 100 milhões).
+ALPHA = 0.02
+GAMMA = (1 + ALPHA) / (1 - ALPHA)
+LOG_GAMMA = math.log(GAMMA)
+
+
+class QuantileSketch:
+    def __init__(self, count=0, zero_count=0, bins=None):
+        self.count = count
+        self.zero_count = zero_count
+        # JSONField guarda as chaves como texto
+        self.bins = {int(k): v for k, v in (bins or {}).items()}
+
+    @classmethod
+    def from_model(cls, sketch):
+        return cls(sketch.count, sketch.zero_count, sketch.bins)
+
+    def add(self, value, weight=1):
+        value = float(value)
+        self.count += weight
+        if value <= 0:
+            self.zero_count += weight
+            return
+        index = math.ceil(math.log(value) / LOG_GAMMA)
+        total = self.bins.get(index, 0) + weight
+        if total:
+            self.bins[index] = total
+        else:
+            self.bins.pop(index, None)
+
+    def merge(self, other):
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for index, weight in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + weight
+        return self
+
+    def quantile(self, q):
+        if self.count <= 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                return 2 * GAMMA ** index / (GAMMA + 1)
+        return 2 * GAMMA ** max(self.bins) / (GAMMA + 1)
+
+    def summary(self):
+        def price(q):
+            value = self.quantile(q)
+            return None if value is None else round(value, 2)
+
+        return {"count": self.count, "p25": price(0.25), "p50": price(0.5), "p75": price(0.75)}
+
+    def as_fields(self):
+        return {
+            "count": self.count,
+            "zero_count": self.zero_count,
+            "bins": {str(k): v for k, v in self.bins.items()},
+        }
+
+
+# ---------------------------------------------------------
+# 2. Atualização incremental
+# ---------------------------------------------------------
+def _keys(demanda):
+    # região específica + agregado do serviço (região vazia)
+    return ((demanda.service_id, cep_region(demanda.cep)), (demanda.service_id, ""))
+
+
+def _update(service_id, region, kind, value, weight):
+    key = {"service_id": service_id, "cep_region": region, "kind": kind}
+
+    sketch = PriceSketch.objects.select_for_update().filter(**key).first()
+    if sketch is None:
+        try:
+            with transaction.atomic():
+                sketch = PriceSketch.objects.create(**key)
+        except IntegrityError:
+            sketch = PriceSketch.objects.select_for_update().get(**key)
+
+    data = QuantileSketch.from_model(sketch)
+    data.add(value, weight)
+    for field, field_value in data.as_fields().items():
+        setattr(sketch, field, field_value)
+    sketch.save(update_fields=["count", "zero_count", "bins"])
+
+
+def record(demanda, kind, value, weight=1):
+    """
+    Soma (weight=+1) ou retira (weight=-1) um valor dos sketches da demanda.
+    Deve rodar dentro da transação que altera a oferta.
+    """
+    for service_id, region in _keys(demanda):
+        _update(service_id, region, kind, value, weight)
+
+
+# ---------------------------------------------------------
+# 3. Reconstrução completa
+# ---------------------------------------------------------
+def rebuild():
+    """
+    Recalcula todos os sketches lendo as ofertas (quentes e arquivadas)
+    em streaming. Retorna o número de sketches gravados.
+    """
+    sketches = {}
+    rows = chain.from_iterable(
+        model.objects.order_by()
+        .values_list("demanda__service_id", "demanda__cep", "status", "proposta_valor")
+        .iterator(chunk_size=2000)
+        for model in (Offer, ArchivedOffer)
+    )
+    for service_id, cep, status, value in rows:
+        kinds = ("oferta", "aceita") if status == "aceita" else ("oferta",)
+        for region in (cep_region(cep), ""):
+            for kind in kinds:
+                sketches.setdefault((service_id, region, kind), QuantileSketch()).add(value)
+
+    with transaction.atomic():
+        PriceSketch.objects.all().delete()
+        PriceSketch.objects.bulk_create(
+            [
+                PriceSketch(service_id=service_id, cep_region=region, kind=kind, **sketch.as_fields())
+                for (service_id, region, kind), sketch in sketches.items()
+            ],
+            batch_size=500,
+        )
+    return len(sketches)
+
+
+def price_summary(service_id, region=""):
+    """
+    p25/p50/p75 de ofertas e de ofertas aceitas: uma consulta, duas linhas.
+    """
+    summary = {kind: QuantileSketch().summary() for kind, _ in PRICE_SKETCH_KINDS}
+    for sketch in PriceSketch.objects.filter(service_id=service_id, cep_region=region):
+        summary[sketch.kind] = QuantileSketch.from_model(sketch).summary()
+    return summary
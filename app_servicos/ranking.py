@@ -0,0 +1,169 @@
+# app_servicos/ranking.py
+
+from django.db.models import Avg, Case, Count, F, FloatField, OuterRef, Subquery, Sum, Value, When, Window
+from django.db.models.functions import Cast, Coalesce, Greatest, Least
+
+from app_servicos import pricing, sharding
+from app_servicos.models import ArchivedDemanda, ArchivedFeedback, Demanda, Feedback, cep_region
+
+
+# Peso de cada componente no score final (soma 1)
+WEIGHTS = {"preco": 0.4, "avaliacao": 0.3, "experiencia": 0.15, "proximidade": 0.15}
+
+# Média bayesiana da avaliação: quem tem poucas notas fica perto de PRIOR_RATING
+PRIOR_RATING = 3.0
+PRIOR_REVIEWS = 2
+
+# Serviços concluídos para o componente de experiência chegar a 0,5
+EXPERIENCE_HALF = 5
+
+CEP_DIGITS = 8
+
+
+# ---------------------------------------------------------
+# 1. Preço de referência — sketch de ofertas aceitas
+# ---------------------------------------------------------
+def typical_price(demanda):
+    """
+    Mediana das ofertas aceitas no serviço (região do CEP, senão todas as
+    regiões; sem aceites, a das ofertas enviadas). None sem dados.
+    """
+    regional = pricing.price_summary(demanda.service_id, cep_region(demanda.cep))
+    overall = pricing.price_summary(demanda.service_id)
+    for summary in (regional, overall):
+        for kind in ("aceita", "oferta"):
+            if summary[kind]["p50"] is not None:
+                return float(summary[kind]["p50"])
+    return None
+
+
+# ---------------------------------------------------------
+# 2. Componentes em SQL (subconsultas correlacionadas)
+# ---------------------------------------------------------
+def _per_professional(model, aggregate, **filters):
+    rows = (
+        model.objects.filter(professional=OuterRef("professional"), **filters)
+        .order_by()
+        .values("professional")
+        .annotate(value=aggregate)
+        .values("value")[:1]
+    )
+    return Coalesce(Subquery(rows), Value(0), output_field=FloatField())
+
+
+def _both_tiers(hot, archived, aggregate, **filters):
+    return _per_professional(hot, aggregate, **filters) + _per_professional(archived, aggregate, **filters)
+
+
+def _cep_match(cep):
+    """Dígitos iniciais do CEP do profissional iguais aos da demanda (0-8)."""
+    whens = [
+        When(professional__profile__cep__startswith=cep[:n], then=Value(n))
+        for n in range(min(len(cep), CEP_DIGITS), 0, -1)
+    ]
+    if not whens:
+        return Value(0)
+    return Case(*whens, default=Value(0))
+
+
+def _clamp(expression):
+    return Greatest(Value(0.0), Least(Value(1.0), expression))
+
+
+# ---------------------------------------------------------
+# 3. Com sharding — agregados de todos os shards como valores
+# ---------------------------------------------------------
+def _grouped(queryset, **aggregates):
+    return list(queryset.order_by().values("professional").annotate(**aggregates))
+
+
+def professional_stats(professional_ids):
+    """
+    {id: {"reviews", "rating_sum", "completed_jobs"}} somando todos os
+    shards e o arquivo. Com sharding, a subconsulta correlacionada veria
+    só o shard da demanda e o score dependeria da região do pedido.
+    """
+    ids = list(professional_ids)
+    stats = {pk: {"reviews": 0, "rating_sum": 0, "completed_jobs": 0} for pk in ids}
+    feedback = {"reviews": Count("id"), "rating_sum": Sum("rating")}
+    jobs = {"completed_jobs": Count("id")}
+
+    parts = sharding.scatter(
+        lambda alias: _grouped(Feedback.objects.using(alias).filter(professional_id__in=ids), **feedback)
+        + _grouped(Demanda.objects.using(alias).filter(professional_id__in=ids, status="concluida"), **jobs)
+    )
+    parts.append(_grouped(ArchivedFeedback.objects.filter(professional_id__in=ids), **feedback))
+    parts.append(_grouped(ArchivedDemanda.objects.filter(professional_id__in=ids, status="concluida"), **jobs))
+
+    for rows in parts:
+        for row in rows:
+            totals = stats[row.pop("professional")]
+            for key, value in row.items():
+                totals[key] += value or 0
+    return stats
+
+
+def _mapped(stats, key):
+    """CASE professional_id WHEN ... THEN <valor> — o agregado já calculado."""
+    whens = [When(professional_id=pk, then=Value(float(row[key]))) for pk, row in stats.items() if row[key]]
+    if not whens:
+        return Value(0.0)
+    return Case(*whens, default=Value(0.0), output_field=FloatField())
+
+
+# ---------------------------------------------------------
+# 4. Ranking
+# ---------------------------------------------------------
+def ranked_offers(demanda, typical=None):
+    """
+    Ofertas da demanda ordenadas pelo score composto, tudo em uma consulta:
+
+    - preço: 1,5 - valor/referência, limitado a [0, 1] (metade da
+      referência = 1; referência = 0,5). Sem referência, a média das
+      ofertas da própria demanda;
+    - avaliação: média bayesiana dos feedbacks (quente + arquivo) / 5;
+    - experiência: concluídas / (concluídas + EXPERIENCE_HALF);
+    - proximidade: prefixo comum dos CEPs / 8 (o CEP é hierárquico:
+      região, sub-região, setor...).
+
+    Com sharding, avaliações e serviços concluídos vêm de
+    professional_stats() (todos os shards) em vez das subconsultas.
+    """
+    valor = Cast("proposta_valor", FloatField())
+    if typical:
+        reference = Value(float(typical))
+    else:
+        reference = Window(Avg(valor), partition_by=[F("demanda_id")])
+
+    if sharding.active():
+        stats = professional_stats(demanda.offers.values_list("professional_id", flat=True))
+        per_professional = {key: _mapped(stats, key) for key in ("reviews", "rating_sum", "completed_jobs")}
+    else:
+        per_professional = {
+            "reviews": _both_tiers(Feedback, ArchivedFeedback, Count("id")),
+            "rating_sum": _both_tiers(Feedback, ArchivedFeedback, Sum("rating")),
+            "completed_jobs": _both_tiers(Demanda, ArchivedDemanda, Count("id"), status="concluida"),
+        }
+
+    return (
+        demanda.offers.all()
+        .annotate(
+            reference_price=reference,
+            **per_professional,
+            cep_match=_cep_match(demanda.cep or ""),
+        )
+        .annotate(
+            price_score=_clamp(Value(1.5) - valor / F("reference_price")),
+            rating_avg=(F("rating_sum") + Value(PRIOR_RATING * PRIOR_REVIEWS))
+            / (F("reviews") + Value(float(PRIOR_REVIEWS))),
+            experience_score=F("completed_jobs") / (F("completed_jobs") + Value(float(EXPERIENCE_HALF))),
+            proximity_score=Cast("cep_match", FloatField()) / Value(float(CEP_DIGITS)),
+        )
+        .annotate(
+            score=Value(WEIGHTS["preco"]) * F("price_score")
+            + Value(WEIGHTS["avaliacao"]) * F("rating_avg") / Value(5.0)
+            + Value(WEIGHTS["experiencia"]) * F("experience_score")
+            + Value(WEIGHTS["proximidade"]) * F("proximity_score"),
+        )
+        .order_by("-score", "proposta_valor", "id")
+    )
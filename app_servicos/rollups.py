@@ -0,0 +1,166 @@
+# app_servicos/rollups.py
+
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, Substr, TruncDate
+from django.utils import timezone
+
+from app_servicos import pricing
+from app_servicos.models import (
+    CEP_REGION_DIGITS,
+    ArchivedDemanda,
+    ArchivedOffer,
+    DailyServiceStats,
+    Demanda,
+    Offer,
+    cep_region,
+)
+
+
+# ---------------------------------------------------------
+# 1. Incremento atômico de uma linha do rollup
+# ---------------------------------------------------------
+def bump(day, service_id, region, **deltas):
+    """
+    Soma `deltas` nos contadores da chave (dia, serviço, região).
+    UPDATE com F() primeiro; se a linha não existe, INSERT (com nova
+    tentativa de UPDATE caso outra requisição crie a linha no meio).
+    """
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return
+
+    key = {"day": day, "service_id": service_id, "cep_region": region}
+    updates = {field: F(field) + value for field, value in deltas.items()}
+
+    if DailyServiceStats.objects.filter(**key).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            DailyServiceStats.objects.create(**key, **deltas)
+    except IntegrityError:
+        DailyServiceStats.objects.filter(**key).update(**updates)
+
+
+def _day(dt):
+    return timezone.localdate(dt)
+
+
+# ---------------------------------------------------------
+# 2. Transições de estado
+# ---------------------------------------------------------
+def demanda_created(demanda):
+    bump(_day(demanda.created_at), demanda.service_id, cep_region(demanda.cep), demandas_created=1)
+
+
+def offer_accepted(offer):
+    demanda = offer.demanda
+    bump(
+        _day(offer.created_at),
+        demanda.service_id,
+        cep_region(demanda.cep),
+        offers_accepted=1,
+        accepted_value_sum=Decimal(offer.proposta_valor),
+    )
+    pricing.record(demanda, "aceita", offer.proposta_valor)
+
+
+def apply_offer(offer, sign, demanda=None):
+    """
+    Soma (sign=+1) ou retira (sign=-1) a oferta do rollup, no estado atual.
+    """
+    demanda = demanda or offer.demanda
+    accepted = offer.status == "aceita"
+    bump(
+        _day(offer.created_at),
+        demanda.service_id,
+        cep_region(demanda.cep),
+        offers_created=sign,
+        offers_accepted=sign if accepted else 0,
+        accepted_value_sum=sign * Decimal(offer.proposta_valor) if accepted else 0,
+    )
+
+    pricing.record(demanda, "oferta", offer.proposta_valor, weight=sign)
+    if accepted:
+        pricing.record(demanda, "aceita", offer.proposta_valor, weight=sign)
+
+
+def apply_demanda(demanda, sign):
+    """
+    Soma ou retira a demanda e todas as suas ofertas do rollup. Usado
+    quando a demanda é excluída ou muda de serviço/CEP.
+    """
+    bump(_day(demanda.created_at), demanda.service_id, cep_region(demanda.cep), demandas_created=sign)
+
+    for offer in demanda.offers.only("created_at", "status", "proposta_valor"):
+        apply_offer(offer, sign, demanda=demanda)
+
+
+# ---------------------------------------------------------
+# 3. Backfill — recalcula a partir das tabelas brutas
+# ---------------------------------------------------------
+def _region_expr(field):
+    return Substr(field, 1, CEP_REGION_DIGITS)
+
+
+def backfill(since=None):
+    """
+    Apaga e recalcula o rollup (tudo ou a partir do dia `since`) com duas
+    consultas agrupadas por nível (tabelas quentes e arquivo — arquivar
+    não muda o rollup). Retorna o número de linhas gravadas.
+    """
+    rows = {}
+
+    def row(day, service_id, region):
+        key = (day, service_id, region)
+        if key not in rows:
+            rows[key] = DailyServiceStats(day=day, service_id=service_id, cep_region=region)
+        return rows[key]
+
+    for demanda_model, offer_model in ((Demanda, Offer), (ArchivedDemanda, ArchivedOffer)):
+        demandas = demanda_model.objects.all()
+        offers = offer_model.objects.all()
+        if since:
+            demandas = demandas.filter(created_at__date__gte=since)
+            offers = offers.filter(created_at__date__gte=since)
+
+        demanda_groups = (
+            demandas.annotate(day=TruncDate("created_at"), region=_region_expr("cep"))
+            .values("day", "service_id", "region")
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        for group in demanda_groups:
+            row(group["day"], group["service_id"], group["region"]).demandas_created += group["total"]
+
+        accepted = Q(status="aceita")
+        offer_groups = (
+            offers.annotate(
+                day=TruncDate("created_at"),
+                region=_region_expr("demanda__cep"),
+                service_id=F("demanda__service_id"),
+            )
+            .values("day", "service_id", "region")
+            .annotate(
+                total=Count("id"),
+                accepted=Count("id", filter=accepted),
+                value=Coalesce(Sum("proposta_valor", filter=accepted), Value(Decimal("0"))),
+            )
+            .order_by()
+        )
+        for group in offer_groups:
+            stats = row(group["day"], group["service_id"], group["region"])
+            stats.offers_created += group["total"]
+            stats.offers_accepted += group["accepted"]
+            stats.accepted_value_sum += group["value"]
+
+    with transaction.atomic():
+        stale = DailyServiceStats.objects.all()
+        if since:
+            stale = stale.filter(day__gte=since)
+        stale.delete()
+        DailyServiceStats.objects.bulk_create(rows.values(), batch_size=1000)
+
+    return len(rows)
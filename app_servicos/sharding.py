@@ -0,0 +1,485 @@
+# app_servicos/sharding.py
+"""
+Particionamento de Demanda/Offer/Feedback por região de CEP.
+
+- settings.CEP_SHARDS: faixas de região (2 primeiros dígitos do CEP) ->
+  alias em DATABASES. Com um único alias ("default") nada muda.
+- Cada banco tem o schema inteiro; User, Profile e Service são copiados
+  para todos os shards (tabelas de referência), então os joins das
+  listagens continuam locais a cada shard.
+- Gravações de demanda/oferta/feedback vão para o shard da demanda (pelo
+  CEP na criação; depois, onde a linha estiver). Consultas sem instância
+  de referência (ex.: "as demandas do cliente") são espalhadas em paralelo
+  por todos os shards e juntadas na ordem do queryset.
+- Ids: cada shard numera as próprias linhas numa faixa exclusiva
+  ((número do shard + 1) * ID_SPAN), então continuam únicos quando
+  `manage.py rebalance_shards` move linhas entre shards.
+
+Limites conhecidos: a transação que grava no shard e no default (eventos,
+rollups) confirma primeiro o shard; agregações SQL (GROUP BY, subconsultas)
+rodam por shard e as linhas são concatenadas — quem precisa do total soma
+os shards antes (ex.: ranking.professional_stats).
+"""
+
+import copy
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from itertools import chain
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, models, transaction
+from django.db.models import F
+from django.db.models.query import FlatValuesListIterable, ModelIterable, ValuesIterable, ValuesListIterable
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+
+SHARDED_MODELS = {"app_servicos.demanda", "app_servicos.offer", "app_servicos.feedback"}
+REFERENCE_MODELS = {"accounts.user", "accounts.profile", "app_servicos.service"}
+
+# ids abaixo de ID_SPAN são os da numeração automática (antes dos shards);
+# o teto (901 * ID_SPAN) fica abaixo de 2**53, seguro para o JavaScript
+ID_SPAN = 10**13
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="vagali-shard")
+
+
+# ---------------------------------------------------------
+# 1. Mapa de shards
+# ---------------------------------------------------------
+def shard_map():
+    """[(primeira região, última região, alias)], ex.: ("00", "49", "default")."""
+    return getattr(settings, "CEP_SHARDS", None) or [("00", "99", DEFAULT_DB_ALIAS)]
+
+
+def aliases():
+    seen = []
+    for _, _, alias in shard_map():
+        if alias not in seen:
+            seen.append(alias)
+    return seen
+
+
+def active():
+    return len(aliases()) > 1
+
+
+def shard_for_cep(cep):
+    from app_servicos.models import cep_region
+
+    region = cep_region(cep)
+    for first, last, alias in shard_map():
+        if first <= region <= last:
+            return alias
+    return DEFAULT_DB_ALIAS
+
+
+def shards_for_prefix(prefix):
+    """Shards que podem ter CEPs começando com `prefix` (só dígitos)."""
+    if len(prefix) >= 2:
+        return [shard_for_cep(prefix)]
+    regions = [f"{prefix}{n}" for n in range(10)] if prefix else [f"{n:02d}" for n in range(100)]
+    found = []
+    for region in regions:
+        alias = shard_for_cep(region)
+        if alias not in found:
+            found.append(alias)
+    return found
+
+
+def namespace(alias):
+    """Número do shard: 0 para "default", N para "shard<N>"."""
+    if alias == DEFAULT_DB_ALIAS:
+        return 0
+    match = re.search(r"(\d+)$", alias)
+    if not match:
+        raise ImproperlyConfigured(f"Alias de shard sem número: {alias!r} (use shard<N>).")
+    return int(match.group(1))
+
+
+def is_sharded(model):
+    return model._meta.label_lower in SHARDED_MODELS
+
+
+def shard_of(instance):
+    """Onde a linha está (se já existe) ou onde deve ficar (CEP da demanda)."""
+    if not instance._state.adding and instance._state.db:
+        return instance._state.db
+    if instance._meta.label_lower == "app_servicos.demanda":
+        return shard_for_cep(instance.cep)
+    # oferta e feedback ficam junto da demanda
+    return shard_of(instance.demanda)
+
+
+# ---------------------------------------------------------
+# 2. Ids por shard
+# ---------------------------------------------------------
+def allocate_ids(alias, model, count=1):
+    """
+    Reserva `count` ids de `model` na faixa do shard. O UPDATE vem antes
+    da leitura: trava a linha do contador até o fim da transação.
+    """
+    from app_servicos.models import ShardSequence
+
+    name = model._meta.label_lower
+    sequences = ShardSequence.objects.using(alias).filter(name=name)
+    with transaction.atomic(using=alias):
+        if not sequences.update(last=F("last") + count):
+            try:
+                with transaction.atomic(using=alias):
+                    ShardSequence.objects.using(alias).create(name=name, last=count)
+            except IntegrityError:
+                sequences.update(last=F("last") + count)
+        last = sequences.values_list("last", flat=True).get()
+    base = (namespace(alias) + 1) * ID_SPAN
+    return range(base + last - count + 1, base + last + 1)
+
+
+@receiver(pre_save)
+def assign_shard_id(sender, instance, raw, using, **kwargs):
+    if raw or instance.pk is not None or not is_sharded(sender) or not active():
+        return
+    instance.pk = allocate_ids(using, sender)[0]
+
+
+# ---------------------------------------------------------
+# 3. Roteador
+# ---------------------------------------------------------
+class CepShardRouter:
+    """
+    Leituras com instância de referência (demanda.offers, oferta.demanda...)
+    vão para o shard dela; o resto cai no default ou é espalhado pelo
+    ShardedQuerySet. Modelos não particionados gravam sempre no default.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if is_sharded(model) and instance is not None and is_sharded(type(instance)):
+            return shard_of(instance)
+        return None
+
+    def db_for_write(self, model, **hints):
+        if not is_sharded(model):
+            return DEFAULT_DB_ALIAS
+        return self.db_for_read(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        known = SHARDED_MODELS | REFERENCE_MODELS
+        if obj1._meta.label_lower in known and obj2._meta.label_lower in known:
+            return True
+        return None
+
+
+# ---------------------------------------------------------
+# 4. Espalhar e juntar
+# ---------------------------------------------------------
+def _run(fn, alias):
+    try:
+        return fn(alias)
+    finally:
+        # conexão da thread auxiliar; a da requisição não é tocada
+        connections[alias].close()
+
+
+def scatter(fn, targets=None):
+    """
+    fn(alias) em cada shard, em paralelo. Dentro de uma transação (ou com
+    um só shard) roda na thread atual, que enxerga as próprias gravações.
+    """
+    targets = list(targets or aliases())
+    if len(targets) == 1 or any(connections[alias].in_atomic_block for alias in targets):
+        return [fn(alias) for alias in targets]
+    futures = [_executor.submit(_run, fn, alias) for alias in targets]
+    return [future.result() for future in futures]
+
+
+def _order_keys(queryset):
+    query = queryset.query
+    if query.order_by:
+        names = query.order_by
+    elif query.default_ordering:
+        names = queryset.model._meta.ordering
+    else:
+        names = ()
+
+    keys = []
+    for name in names:
+        if not isinstance(name, str) or name == "?" or "__" in name:
+            return None
+        desc = name.startswith("-")
+        name = name.lstrip("-")
+        if name == "pk":
+            name = queryset.model._meta.pk.attname
+        keys.append((name, desc))
+    return keys
+
+
+def _getter(queryset, name):
+    iterable = queryset._iterable_class
+    if iterable is ModelIterable:
+        return lambda row: getattr(row, name)
+    if iterable is ValuesIterable:
+        return lambda row: row[name]
+    fields = list(queryset._fields) or [field.attname for field in queryset.model._meta.concrete_fields]
+    if name not in fields:
+        return None
+    if iterable is FlatValuesListIterable:
+        return lambda row: row
+    index = fields.index(name)
+    if iterable is ValuesListIterable or hasattr(iterable, "create_namedtuple_class"):
+        return lambda row: row[index]
+    return None
+
+
+def merge(queryset, parts):
+    """
+    Junta as listas de cada shard na ordem do queryset (ordenação estável
+    campo a campo, nulos como no SQLite). Sem como ordenar (expressões,
+    campos fora do SELECT), concatena.
+    """
+    rows = list(chain.from_iterable(parts))
+    keys = _order_keys(queryset)
+    if len(parts) < 2 or not keys:
+        return rows
+    getters = [(_getter(queryset, name), desc) for name, desc in keys]
+    if any(get is None for get, _ in getters):
+        return rows
+    for get, desc in reversed(getters):
+        rows.sort(key=lambda row: (get(row) is not None, get(row)), reverse=desc)
+    return rows
+
+
+def gather(queryset):
+    low, high = queryset.query.low_mark, queryset.query.high_mark
+    base = queryset._chain()
+    base.query.clear_limits()
+    if high is not None:
+        # cada shard devolve no máximo `high` linhas; a página sai do todo
+        base.query.set_limits(0, high)
+    parts = scatter(lambda alias: list(base.using(alias)))
+    return merge(queryset, parts)[low:high]
+
+
+def _scatters(queryset):
+    if queryset._db is not None or not active() or not is_sharded(queryset.model):
+        return False
+    instance = queryset._hints.get("instance")
+    return instance is None or not is_sharded(type(instance))
+
+
+class ShardedQuerySet(models.QuerySet):
+    """
+    QuerySet de Demanda/Offer/Feedback: sem .using() nem instância de
+    referência, lê (e atualiza/apaga) em todos os shards.
+    """
+
+    def _fetch_all(self):
+        if self._result_cache is None and _scatters(self):
+            self._result_cache = gather(self)
+        super()._fetch_all()
+
+    def iterator(self, chunk_size=None):
+        if not _scatters(self):
+            return super().iterator(chunk_size=chunk_size)
+        # streaming: shard a shard, sem intercalar a ordem
+        return chain.from_iterable(self.using(alias).iterator(chunk_size=chunk_size) for alias in aliases())
+
+    def count(self):
+        if self._result_cache is not None or not _scatters(self):
+            return super().count()
+        if self.query.is_sliced:
+            return len(self)
+        return sum(scatter(lambda alias: self.using(alias).count()))
+
+    def exists(self):
+        if self._result_cache is not None or not _scatters(self):
+            return super().exists()
+        return any(scatter(lambda alias: self.using(alias).exists()))
+
+    def update(self, **kwargs):
+        if not _scatters(self):
+            return super().update(**kwargs)
+        return sum(scatter(lambda alias: self.using(alias).update(**kwargs)))
+
+    def delete(self):
+        if not _scatters(self):
+            return super().delete()
+        total, per_model = 0, {}
+        for deleted, counts in scatter(lambda alias: self.using(alias).delete()):
+            total += deleted
+            for label, n in counts.items():
+                per_model[label] = per_model.get(label, 0) + n
+        return total, per_model
+
+    def create(self, **kwargs):
+        if self._db is not None or not active():
+            return super().create(**kwargs)
+        # sem using: o roteador escolhe o shard pela própria instância
+        obj = self.model(**kwargs)
+        obj.save(force_insert=True)
+        return obj
+
+    def bulk_create(self, objs, *args, **kwargs):
+        if not active():
+            return super().bulk_create(objs, *args, **kwargs)
+        objs = list(objs)
+        if self._db is None:
+            groups = {}
+            for obj in objs:
+                groups.setdefault(shard_of(obj), []).append(obj)
+            for alias, group in groups.items():
+                self.using(alias).bulk_create(group, *args, **kwargs)
+            return objs
+
+        missing = [obj for obj in objs if obj.pk is None]
+        for obj, pk in zip(missing, allocate_ids(self._db, self.model, len(missing)) if missing else ()):
+            obj.pk = pk
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+@contextmanager
+def atomic(*targets):
+    """
+    Transação no default (eventos, rollups, lápides) e nos shards
+    `targets` (sem argumentos: todos). Não é um commit em duas fases: os
+    shards confirmam antes do default.
+    """
+    with ExitStack() as stack:
+        stack.enter_context(transaction.atomic(using=DEFAULT_DB_ALIAS))
+        for alias in targets or aliases():
+            if alias != DEFAULT_DB_ALIAS:
+                stack.enter_context(transaction.atomic(using=alias))
+        yield
+
+
+# ---------------------------------------------------------
+# 5. Tabelas de referência (User, Profile, Service)
+# ---------------------------------------------------------
+def _copies(objs):
+    for obj in objs:
+        clone = copy.copy(obj)
+        clone._state = copy.copy(obj._state)
+        yield clone
+
+
+def replicate(objs, model=None):
+    """
+    Copia (upsert) linhas de referência gravadas no default para os demais
+    shards. Necessário depois de bulk_create/update(), que não têm sinais.
+    """
+    objs = list(objs)
+    if not objs or not active():
+        return
+    model = model or type(objs[0])
+    meta = model._meta
+    update_fields = [field.name for field in meta.concrete_fields if not field.primary_key]
+    for alias in aliases():
+        if alias == DEFAULT_DB_ALIAS:
+            continue
+        model._base_manager.using(alias).bulk_create(
+            list(_copies(objs)),
+            update_conflicts=True,
+            unique_fields=[meta.pk.name],
+            update_fields=update_fields,
+        )
+
+
+def replicate_all(model, batch_size=1000):
+    """Sincroniza a tabela de referência inteira (shard novo ou reparo)."""
+    queryset = model._base_manager.using(DEFAULT_DB_ALIAS).order_by("pk")
+    batch = []
+    for obj in queryset.iterator(chunk_size=batch_size):
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            replicate(batch, model)
+            batch = []
+    replicate(batch, model)
+
+
+@receiver(post_save)
+def replicate_reference(sender, instance, raw, using, **kwargs):
+    if raw or using != DEFAULT_DB_ALIAS or sender._meta.label_lower not in REFERENCE_MODELS or not active():
+        return
+    # o pai antes (ex.: Profile criado no post_save do User, antes da cópia dele)
+    for field in sender._meta.concrete_fields:
+        if field.is_relation and field.related_model._meta.label_lower in REFERENCE_MODELS:
+            parent = getattr(instance, field.name)
+            if parent is not None:
+                replicate([parent])
+    replicate([instance], sender)
+
+
+@receiver(post_delete)
+def delete_reference(sender, instance, using, **kwargs):
+    if using != DEFAULT_DB_ALIAS or sender._meta.label_lower not in REFERENCE_MODELS or not active():
+        return
+    for alias in aliases():
+        if alias != DEFAULT_DB_ALIAS:
+            # no shard, o CASCADE leva junto as demandas/ofertas do usuário
+            sender._base_manager.using(alias).filter(pk=instance.pk).delete()
+
+
+# ---------------------------------------------------------
+# 6. Mover demandas entre shards (rebalanceamento, troca de CEP)
+# ---------------------------------------------------------
+def _copy_rows(rows, target):
+    """Insere `rows` em `target` com os mesmos ids e datas (repetir é inofensivo)."""
+    if not rows:
+        return
+    model = type(rows[0])
+    stamps = {row.pk: (row.created_at, row.updated_at) for row in rows}
+    clones = list(_copies(rows))
+    model._base_manager.using(target).bulk_create(clones, ignore_conflicts=True)
+    # bulk_create aplica auto_now/auto_now_add; bulk_update grava os valores originais
+    for clone in clones:
+        clone.created_at, clone.updated_at = stamps[clone.pk]
+    model._base_manager.using(target).bulk_update(clones, ["created_at", "updated_at"])
+
+
+def move(ids, source, target):
+    """
+    Move as demandas `ids` de `source` para `target` com ofertas e
+    feedback, mantendo ids e datas. O destino confirma antes da remoção
+    na origem: uma falha no meio deixa cópias repetidas (que uma nova
+    execução resolve), nunca perde linhas. Devolve (demandas, ofertas).
+    """
+    from app_servicos.models import Demanda, Feedback, Offer
+
+    ids = list(ids)
+    if not ids or source == target:
+        return 0, 0
+    with transaction.atomic(using=source), transaction.atomic(using=target):
+        demandas = list(Demanda._base_manager.using(source).select_for_update().filter(id__in=ids))
+        offers = list(Offer._base_manager.using(source).filter(demanda_id__in=ids))
+        feedbacks = list(Feedback._base_manager.using(source).filter(demanda_id__in=ids))
+        for rows in (demandas, offers, feedbacks):
+            _copy_rows(rows, target)
+        # ofertas e feedback vão junto pelo CASCADE
+        Demanda._base_manager.using(source).filter(id__in=[demanda.pk for demanda in demandas]).delete()
+    return len(demandas), len(offers)
+
+
+def misplaced(source, batch_size=500):
+    """Lotes {destino: [ids]} das demandas de `source` fora da faixa do shard."""
+    from app_servicos.models import Demanda
+
+    last = 0
+    while True:
+        rows = list(
+            Demanda._base_manager.using(source)
+            .filter(id__gt=last)
+            .order_by("id")
+            .values_list("id", "cep")[:batch_size]
+        )
+        if not rows:
+            return
+        last = rows[-1][0]
+        groups = {}
+        for pk, cep in rows:
+            target = shard_for_cep(cep)
+            if target != source:
+                groups.setdefault(target, []).append(pk)
+        if groups:
+            yield groups
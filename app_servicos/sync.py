@@ -0,0 +1,134 @@
+# app_servicos/sync.py
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from rest_framework.response import Response
+
+from app_servicos.models import Tombstone
+
+
+SYNC_PARAM = "since"
+
+# Transações que começaram antes do cursor e só gravam depois dele ficariam
+# de fora; o cursor devolvido recua esta margem (linhas repetidas na próxima
+# sincronização são inofensivas: o cliente substitui pelo id).
+OVERLAP = timedelta(seconds=5)
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, "SYNC_TOMBSTONE_DAYS", 30))
+
+
+# ---------------------------------------------------------
+# 1. Cursor — microssegundos desde a época (opaco para o cliente)
+# ---------------------------------------------------------
+def encode_cursor(moment):
+    return str(int(moment.timestamp() * 1_000_000))
+
+
+def decode_cursor(value):
+    """Datetime do cursor; ValueError se não for um cursor válido."""
+    micros = int(value)
+    if micros < 0:
+        raise ValueError(value)
+    return datetime.fromtimestamp(micros / 1_000_000, tz=dt_timezone.utc)
+
+
+# ---------------------------------------------------------
+# 2. Lápides
+# ---------------------------------------------------------
+def bury(entity, rows):
+    """
+    Registra a saída das linhas (chamar na transação da remoção). Cada
+    linha é um dict com `id` e os donos: `client_id`, `professional_id` e,
+    para demandas, `feed_from`/`feed_until` (ver Tombstone).
+    """
+    Tombstone.objects.bulk_create(
+        [
+            Tombstone(
+                entity=entity,
+                entity_id=row["id"],
+                client_id=row.get("client_id"),
+                professional_id=row.get("professional_id"),
+                feed_from=row.get("feed_from"),
+                feed_until=row.get("feed_until"),
+            )
+            for row in rows
+        ]
+    )
+
+
+def removed_since(entity, since, user):
+    """Ids das lápides de `entity` desde `since` que `user` chegou a ver."""
+    if user.is_professional:
+        # o cursor recua OVERLAP: a carga que o gerou via o feed até since + OVERLAP
+        seen = Q(professional=user) | Q(feed_from__lte=since + OVERLAP, feed_until__gt=since)
+    else:
+        seen = Q(client=user)
+    # lápides anteriores aos donos (sem client) valem para todos até expirar
+    seen |= Q(client__isnull=True)
+    return (
+        Tombstone.objects.filter(seen, entity=entity, deleted_at__gt=since)
+        .values_list("entity_id", flat=True)
+    )
+
+
+def purge(now=None):
+    """Apaga as lápides mais velhas que SYNC_TOMBSTONE_DAYS. Devolve quantas."""
+    cutoff = (now or timezone.now()) - tombstone_retention()
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
+
+
+# ---------------------------------------------------------
+# 3. ?since= nas listagens
+# ---------------------------------------------------------
+class DeltaSyncMixin:
+    """
+    `list` com ?since=<cursor> devolve só o que mudou desde o cursor:
+
+        {"results": [criadas/alteradas], "removed": [ids], "cursor": "..."}
+
+    `?since=` vazio faz a carga completa no mesmo formato (e entrega o
+    primeiro cursor). `removed` junta as lápides que o usuário via e, via
+    `sync_departed`, linhas ainda existentes que saíram do conjunto visível.
+    Cursor mais velho que a retenção das lápides: 410 e o cliente recarrega.
+    """
+
+    sync_entity = None
+
+    def sync_departed(self, since):
+        """Ids que deixaram de ser visíveis para o usuário desde `since`."""
+        return []
+
+    def list(self, request, *args, **kwargs):
+        if SYNC_PARAM not in request.query_params:
+            return super().list(request, *args, **kwargs)
+
+        started = timezone.now()
+        since = None
+        if request.query_params[SYNC_PARAM]:
+            try:
+                since = decode_cursor(request.query_params[SYNC_PARAM])
+            except (ValueError, OverflowError, OSError):
+                return Response({"detail": "Cursor inválido."}, status=400)
+            if since < started - tombstone_retention():
+                return Response({"detail": "Cursor expirado; recarregue a lista.", "reset": True}, status=410)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        removed = []
+        if since is not None:
+            queryset = queryset.filter(updated_at__gt=since)
+            removed = sorted(set(removed_since(self.sync_entity, since, request.user)) | set(self.sync_departed(since)))
+
+        fast = self.get_fast_rows()
+        if fast is not None and request.query_params.get("fast") != "0":
+            results = fast.serialize(queryset, self.get_serializer_context())
+        else:
+            results = self.get_serializer(queryset, many=True).data
+
+        return Response({"results": results, "removed": removed, "cursor": encode_cursor(started - OVERLAP)})
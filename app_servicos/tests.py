@@ -1,3 +1,977 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import os
+import struct
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import LiveServerTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from accounts.api.throttling import LoginIPThrottle
+from accounts.models import PortfolioItem, User
+from app_servicos import archive, events, expiry, loadtest, pricing, ranking, sharding, sync
+from app_servicos.models import (
+    ArchivedDemanda,
+    ArchivedOffer,
+    Service,
+    Demanda,
+    Offer,
+    Feedback,
+    DailyServiceStats,
+    MarketplaceEvent,
+    PriceSketch,
+)
+from app_servicos.pricing import QuantileSketch
+from app_servicos.api.views import OfferViewSet
+from app_servicos.rollups import backfill
+from vagali_project import metrics, mp4
+
+
+class MarketplaceFixture:
+    # com VAGALI_SHARDS > 1, demandas e ofertas vivem em outros bancos
+    databases = "__all__"
+
+    def setUp(self):
+        self.service = Service.objects.create(name="Elétrica", description="Serviços elétricos")
+        self.client_user = User.objects.create_user(email="cliente@vagali.com", password="x")
+        self.professional = User.objects.create_user(
+            email="pro@vagali.com", password="x", is_professional=True
+        )
+        self.demanda = Demanda.objects.create(
+            client=self.client_user,
+            service=self.service,
+            titulo="Trocar tomada",
+            descricao="Tomada da cozinha",
+            cep="01001000",
+        )
+        self.offer = Offer.objects.create(
+            demanda=self.demanda,
+            professional=self.professional,
+            proposta_valor="150.00",
+            proposta_prazo="2 dias",
+        )
+
+
+class ExportTests(MarketplaceFixture, APITestCase):
+    def test_endpoint_restrito_a_staff(self):
+        self.client.force_authenticate(self.client_user)
+        response = self.client.get(reverse("marketplace-export", args=["demandas"]))
+        self.assertEqual(response.status_code, 403)
+
+    def test_endpoint_ndjson_gzip(self):
+        staff = User.objects.create_user(email="staff@vagali.com", password="x", is_staff=True)
+        self.client.force_authenticate(staff)
+
+        response = self.client.get(reverse("marketplace-export", args=["ofertas"]), {"gzip": "1"})
+
+        self.assertEqual(response.status_code, 200)
+        body = gzip.decompress(b"".join(response.streaming_content)).decode()
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["demanda_id"], self.demanda.id)
+        self.assertEqual(rows[0]["proposta_valor"], "150.00")
+
+    def test_comando_incremental_com_watermark(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            watermark = os.path.join(tmp, "watermark.json")
+            call_command("export_marketplace", tmp, format="csv", watermark=watermark, stdout=io.StringIO())
+            # fora da margem OVERLAP da primeira exportação
+            Demanda.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+
+            nova = Demanda.objects.create(
+                client=self.client_user, service=self.service, titulo="Chuveiro", descricao="-", cep="01001000"
+            )
+            # alteração de linha já exportada também entra
+            self.demanda.status = "cancelada"
+            self.demanda.save()
+            out = io.StringIO()
+            call_command("export_marketplace", tmp, format="csv", watermark=watermark, only=["demandas"], stdout=out)
+
+            self.assertIn("demandas: 2 linhas", out.getvalue())
+            target = out.getvalue().split("-> ")[1].strip()
+            with open(target, newline="") as fh:
+                rows = list(csv.DictReader(fh))
+            self.assertEqual({(int(r["id"]), r["status"]) for r in rows}, {(nova.pk, "pendente"), (self.demanda.pk, "cancelada")})
+            with open(watermark) as fh:
+                self.assertLess(parse_datetime(json.load(fh)["demandas"]), timezone.now())
+
+    def test_endpoint_updated_after(self):
+        staff = User.objects.create_user(email="staff@vagali.com", password="x", is_staff=True)
+        self.client.force_authenticate(staff)
+        url = reverse("marketplace-export", args=["demandas"])
+        Demanda.objects.update(updated_at=timezone.now() - timedelta(days=2))
+
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        self.assertEqual(b"".join(self.client.get(url, {"updated_after": since}).streaming_content), b"")
+        Demanda.objects.update(updated_at=timezone.now())
+        body = b"".join(self.client.get(url, {"updated_after": since}).streaming_content).decode()
+        self.assertEqual([json.loads(line)["id"] for line in body.splitlines()], [self.demanda.pk])
+        self.assertEqual(self.client.get(url, {"updated_after": "ontem"}).status_code, 400)
+
+
+class RollupTests(MarketplaceFixture, APITestCase):
+    def _snapshot(self):
+        return sorted(
+            DailyServiceStats.objects.values_list(
+                "day", "service_id", "cep_region",
+                "demandas_created", "offers_created", "offers_accepted", "accepted_value_sum",
+            )
+        )
+
+    def test_incremental_igual_ao_backfill(self):
+        # o fixture cria direto pelo ORM: parte do backfill
+        backfill()
+
+        self.client.force_authenticate(self.client_user)
+        response = self.client.post(
+            reverse("demanda-list"),
+            {"service": self.service.id, "titulo": "Pintar sala", "descricao": "-", "cep": "20040020"},
+        )
+        self.assertEqual(response.status_code, 201)
+        nova = Demanda.objects.get(pk=response.data["id"])
+
+        self.client.force_authenticate(self.professional)
+        response = self.client.post(
+            reverse("offer-list"),
+            {"demanda": nova.id, "proposta_valor": "300.00", "proposta_prazo": "1 dia"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+
+        self.client.force_authenticate(self.client_user)
+        response = self.client.post(reverse("offer-aceitar", args=[response.data["id"]]))
+        self.assertEqual(response.status_code, 200)
+
+        incremental = self._snapshot()
+        backfill()
+        self.assertEqual(incremental, self._snapshot())
+
+        stats = DailyServiceStats.objects.get(cep_region="20")
+        self.assertEqual(stats.demandas_created, 1)
+        self.assertEqual(stats.offers_accepted, 1)
+
+    def test_endpoint_le_somente_o_rollup(self):
+        backfill()
+        staff = User.objects.create_user(email="staff@vagali.com", password="x", is_staff=True)
+        self.client.force_authenticate(staff)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("service-analytics"), {"group_by": "service"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["results"],
+            [{
+                "service_id": self.service.id,
+                "demandas": 1,
+                "offers": 1,
+                "offers_accepted": 0,
+                "acceptance_rate": 0.0,
+                "avg_accepted_price": None,
+            }],
+        )
+        tables = " ".join(q["sql"] for q in ctx.captured_queries)
+        self.assertNotIn('"app_servicos_demanda"', tables)
+        self.assertNotIn('"app_servicos_offer"', tables)
+
+
+class PriceSketchTests(MarketplaceFixture, APITestCase):
+    def test_quantis_com_erro_relativo_limitado(self):
+        sketch = QuantileSketch()
+        for value in range(1, 1001):
+            sketch.add(value)
+
+        for q, expected in ((0.25, 250), (0.5, 500), (0.75, 750)):
+            self.assertAlmostEqual(sketch.quantile(q), expected, delta=expected * 0.03)
+
+        other = QuantileSketch()
+        other.add(5000)
+        self.assertEqual(sketch.merge(other).count, 1001)
+
+    def test_endpoint_atualizado_pelas_ofertas(self):
+        pricing.rebuild()
+        outro = User.objects.create_user(email="pro2@vagali.com", password="x", is_professional=True)
+        self.client.force_authenticate(outro)
+        response = self.client.post(
+            reverse("offer-list"),
+            {"demanda": self.demanda.id, "proposta_valor": "250.00", "proposta_prazo": "1 dia"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("service-precos", args=[self.service.id]), {"region": "01"})
+
+        self.assertEqual(response.data["region"], "01")
+        self.assertEqual(response.data["oferta"]["count"], 2)
+        self.assertAlmostEqual(response.data["oferta"]["p25"], 150, delta=3)
+        self.assertLessEqual(response.data["oferta"]["p50"], response.data["oferta"]["p75"])
+        self.assertEqual(response.data["aceita"]["count"], 0)
+
+        incremental = sorted(PriceSketch.objects.values_list("service_id", "cep_region", "kind", "count", "bins"))
+        pricing.rebuild()
+        rebuilt = sorted(PriceSketch.objects.values_list("service_id", "cep_region", "kind", "count", "bins"))
+        self.assertEqual(incremental, rebuilt)
+
+
+class DemandaFacetTests(MarketplaceFixture, APITestCase):
+    def setUp(self):
+        super().setUp()
+        pintura = Service.objects.create(name="Pintura", description="-")
+        for cep, service in (("01310100", pintura), ("20040020", pintura), ("01002000", self.service)):
+            Demanda.objects.create(
+                client=self.client_user, service=service, titulo="x", descricao="-", cep=cep
+            )
+        self.pintura = pintura
+        self.client.force_authenticate(self.client_user)
+
+    def test_filtros_combinados(self):
+        response = self.client.get(
+            reverse("demanda-list"),
+            {"service": f"{self.service.id},{self.pintura.id}", "cep_prefix": "01", "status": "pendente"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 3)
+
+    def test_facetas_em_uma_consulta_agrupada(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("demanda-list"), {"facets": "1"})
+
+        self.assertEqual(len(response.data["results"]), 4)
+        facets = response.data["facets"]
+        self.assertEqual(
+            [(s["name"], s["count"]) for s in facets["service"]],
+            [("Elétrica", 2), ("Pintura", 2)],
+        )
+        self.assertEqual(facets["region"], [{"value": "01", "count": 3}, {"value": "20", "count": 1}])
+        self.assertEqual(facets["status"][0]["count"], 4)
+
+        grouped = [q for q in ctx.captured_queries if "GROUP BY" in q["sql"]]
+        self.assertEqual(len(grouped), 1)
+
+
+class FastPathTests(MarketplaceFixture, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.professional.profile.full_name = "João Eletricista"
+        self.professional.profile.palavras_chave = "Elétrica, Reparos"
+        self.professional.profile.photo = "profiles/joao_perfil.jpg"
+        self.professional.profile.save()
+
+        self.client.force_authenticate(self.client_user)
+        self.client.post(reverse("offer-aceitar", args=[self.offer.id]))
+        Demanda.objects.create(
+            client=self.client_user, service=self.service, titulo="Com vídeo", descricao="-",
+            cep="01001000", videos="demandas/videos/a.mp4",
+        )
+
+    def assertSameJson(self, url, user):
+        self.client.force_authenticate(user)
+        fast = self.client.get(url)
+        slow = self.client.get(url, {"fast": "0"})
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.content, slow.content)
+        self.assertTrue(json.loads(fast.content))
+
+    def test_demandas(self):
+        self.assertSameJson(reverse("demanda-list"), self.client_user)
+
+    def test_ofertas(self):
+        self.assertSameJson(reverse("offer-list"), self.client_user)
+        self.assertSameJson(reverse("offer-list"), self.professional)
+
+    def test_feedbacks(self):
+        Demanda.objects.filter(pk=self.demanda.pk).update(status="concluida")
+        Feedback.objects.create(
+            demanda=self.demanda, client=self.client_user, professional=self.professional, rating=5
+        )
+        self.assertSameJson(reverse("feedback-list"), self.client_user)
+
+    def test_profissionais(self):
+        User.objects.create_user(email="sem-nome@vagali.com", password="x", is_professional=True)
+        self.assertSameJson(reverse("profissionais-list"), self.client_user)
+
+
+class SparseFieldsTests(MarketplaceFixture, APITestCase):
+    def test_fields_reduz_json_e_colunas(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(
+                reverse("profissionais-list"), {"fields": "id,full_name,photo,rating,profession"}
+            )
+
+        self.assertEqual(
+            list(response.data[0]), ["id", "full_name", "rating", "photo", "profession"]
+        )
+        sql = ctx.captured_queries[-1]["sql"]
+        self.assertNotIn('"bio"', sql)
+        self.assertNotIn('"address"', sql)
+
+        slow = self.client.get(
+            reverse("profissionais-list"), {"fields": "id,full_name,photo,rating,profession", "fast": "0"}
+        )
+        self.assertEqual(response.content, slow.content)
+
+    def test_fields_no_retrieve(self):
+        self.client.force_authenticate(self.client_user)
+        response = self.client.get(
+            reverse("demanda-detail", args=[self.demanda.id]), {"fields": "id,titulo,status"}
+        )
+        self.assertEqual(response.data, {"id": self.demanda.id, "titulo": "Trocar tomada", "status": "pendente"})
+
+    def test_ids_em_uma_consulta(self):
+        outra = Demanda.objects.create(
+            client=self.client_user, service=self.service, titulo="Outra", descricao="-", cep="01001000"
+        )
+        Demanda.objects.create(
+            client=self.client_user, service=self.service, titulo="Fora", descricao="-", cep="01001000"
+        )
+        self.client.force_authenticate(self.client_user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("demanda-list"), {"ids": f"{self.demanda.id},{outra.id}"})
+
+        self.assertEqual(sorted(d["id"] for d in response.data), sorted([self.demanda.id, outra.id]))
+        selects = [q for q in ctx.captured_queries if '"app_servicos_demanda"' in q["sql"]]
+        self.assertEqual(len(selects), 1)
+        self.assertIn(" IN (", selects[0]["sql"])
+
+    def test_ids_invalidos(self):
+        self.client.force_authenticate(self.client_user)
+        response = self.client.get(reverse("offer-list"), {"ids": "1,abc"})
+        self.assertEqual(response.status_code, 400)
+
+
+class BootstrapTests(MarketplaceFixture, APITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        # instância nova: o Profile não vem em cache do fixture
+        self.client.force_authenticate(User.objects.get(pk=self.client_user.pk))
+
+    def test_payload_unico_com_consultas_fixas(self):
+        self.client.get(reverse("bootstrap"))  # aquece o catálogo
+        for i in range(5):
+            Demanda.objects.create(
+                client=self.client_user, service=self.service, titulo=f"D{i}", descricao="-", cep="01001000"
+            )
+
+        self.client.force_authenticate(User.objects.get(pk=self.client_user.pk))
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("bootstrap"))
+
+        data = response.data
+        self.assertEqual(data["user"]["email"], "cliente@vagali.com")
+        self.assertEqual(data["catalog"]["data"][0]["name"], "Elétrica")
+        self.assertEqual(data["demandas"]["count"], 6)
+        self.assertEqual(data["ofertas"]["count"], 1)
+        self.assertEqual(data["ofertas"]["results"][0]["id"], self.offer.id)
+
+    def test_if_none_match_omite_catalogo(self):
+        version = self.client.get(reverse("bootstrap")).data["catalog"]["version"]
+
+        response = self.client.get(reverse("bootstrap"), HTTP_IF_NONE_MATCH=f'"{version}"')
+        self.assertTrue(response.data["catalog"]["not_modified"])
+        self.assertIsNone(response.data["catalog"]["data"])
+
+        Service.objects.create(name="Pintura", description="-")
+        response = self.client.get(reverse("bootstrap"), HTTP_IF_NONE_MATCH=f'"{version}"')
+        self.assertFalse(response.data["catalog"]["not_modified"])
+        self.assertNotEqual(response.data["catalog"]["version"], version)
+
+    def test_catalogo_expira_sem_sinal(self):
+        # update() não dispara post_save (como uma alteração feita em outro worker)
+        version = self.client.get(reverse("bootstrap")).data["catalog"]["version"]
+        Service.objects.update(description="Outra descrição")
+        self.assertEqual(self.client.get(reverse("bootstrap")).data["catalog"]["version"], version)
+
+        later = time.time() + settings.SERVICE_CATALOG_CACHE_SECONDS + 1
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertNotEqual(self.client.get(reverse("bootstrap")).data["catalog"]["version"], version)
+
+
+class MediaGcTests(MarketplaceFixture, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.media = self.tmp.name
+        self.settings_override = self.settings(MEDIA_ROOT=self.media)
+        self.settings_override.enable()
+
+        old = 1_000_000_000
+        for name in ("demandas/photos/usada.jpg", "demandas/photos/orfa.jpg", "portfolio/recente.jpg"):
+            path = os.path.join(self.media, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as fh:
+                fh.write(b"x" * 10)
+            if "recente" not in name:
+                os.utime(path, (old, old))
+
+        Demanda.objects.filter(pk=self.demanda.pk).update(photos="demandas/photos/usada.jpg")
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.media, name))
+
+    def test_dry_run_nao_apaga(self):
+        out = io.StringIO()
+        call_command("media_gc", stdout=out)
+        self.assertIn("1 órfãos", out.getvalue())
+        self.assertTrue(self.exists("demandas/photos/orfa.jpg"))
+
+    def test_apaga_so_orfaos_fora_da_carencia(self):
+        call_command("media_gc", "--apply", "--rate", "0", stdout=io.StringIO())
+        self.assertFalse(self.exists("demandas/photos/orfa.jpg"))
+        self.assertTrue(self.exists("demandas/photos/usada.jpg"))
+        self.assertTrue(self.exists("portfolio/recente.jpg"))
+
+    def test_quarentena(self):
+        quarantine = os.path.join(self.media, ".quarentena")
+        call_command("media_gc", "--apply", "--quarantine", quarantine, stdout=io.StringIO())
+        self.assertFalse(self.exists("demandas/photos/orfa.jpg"))
+        self.assertTrue(os.path.exists(os.path.join(quarantine, "demandas/photos/orfa.jpg")))
+
+        # a quarentena não é varrida de novo
+        out = io.StringIO()
+        call_command("media_gc", "--apply", "--quarantine", quarantine, stdout=out)
+        self.assertIn("0 órfãos", out.getvalue())
+
+
+class LoadTestSupportTests(MarketplaceFixture, APITestCase):
+    def test_cabecalho_de_consultas_so_quando_ativado(self):
+        url = reverse("service-list")
+        with self.settings(QUERY_COUNT_HEADER=True):
+            response = self.client_class().get(url)
+        self.assertEqual(response["X-DB-Queries"], "1")
+
+        with self.settings(QUERY_COUNT_HEADER=False):
+            self.assertFalse(self.client_class().get(url).has_header("X-DB-Queries"))
+
+    def test_relatorio_e_comparacao(self):
+        recorder = loadtest.Recorder()
+        for ms in range(1, 101):
+            recorder.add("GET /x/", ms / 1000, 200 if ms % 10 else 500, 3)
+        report = recorder.report()["endpoints"]["GET /x/"]
+        self.assertEqual((report["p50_ms"], report["p99_ms"]), (51.0, 99.0))
+        self.assertEqual(report["error_rate"], 0.1)
+
+        baseline = {"endpoints": {"GET /x/": dict(report, p95_ms=report["p95_ms"] / 2)}}
+        changes = {metric: change for _, metric, _, _, change in loadtest.compare({"endpoints": {"GET /x/": report}}, baseline)}
+        self.assertAlmostEqual(changes["p95_ms"], 100.0)
+        self.assertEqual(changes["queries_avg"], 0.0)
+
+
+class LoadTestFlowTests(LiveServerTestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        cache.clear()
+        Service.objects.create(name="Elétrica", description="Serviços elétricos")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.settings_override = self.settings(MEDIA_ROOT=self.tmp.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def test_fluxo_completo_contra_o_servidor(self):
+        # 1 login/s: o segundo e o terceiro login recebem 429 e esperam o Retry-After
+        rates = dict(LoginIPThrottle.THROTTLE_RATES, login_ip="1/s")
+        with mock.patch.object(LoginIPThrottle, "THROTTLE_RATES", rates):
+            report = loadtest.run(self.live_server_url, clients=1, professionals=2, iterations=1, seed=1)
+
+        self.assertEqual(report["flows"], 1)
+        self.assertEqual(report["endpoints"]["POST /api/v1/auth/login/"]["status"].get("200"), 3)
+        self.assertIn("429", report["endpoints"]["POST /api/v1/auth/login/"]["status"])
+        for endpoint in ("POST /api/v1/ofertas/{id}/aceitar/", "POST /api/v1/demandas/{id}/concluir/"):
+            self.assertEqual(report["endpoints"][endpoint]["status"], {"200": 1})
+        demanda = Demanda.objects.get()
+        self.assertEqual(demanda.status, "concluida")
+        self.assertTrue(Feedback.objects.filter(demanda=demanda).exists())
+
+
+class SeedScaleTests(APITestCase):
+    databases = "__all__"
+
+    def test_gera_dados_coerentes(self):
+        call_command("seed_scale", "--users", "40", "--demandas", "120", "--batch-size", "50", stdout=io.StringIO())
+
+        self.assertEqual(User.objects.filter(email__startswith="seed-").count(), 40)
+        self.assertEqual(Demanda.objects.count(), 120)
+        self.assertFalse(User.objects.filter(profile__isnull=True).exists())
+
+        for demanda in Demanda.objects.exclude(status__in=["pendente", "cancelada"]):
+            accepted = demanda.offers.get(status="aceita")
+            self.assertEqual(accepted.professional_id, demanda.professional_id)
+        self.assertFalse(Feedback.objects.exclude(demanda__status="concluida").exists())
+
+        # rollup recalculado ao final
+        self.assertEqual(
+            sum(DailyServiceStats.objects.values_list("demandas_created", flat=True)), 120
+        )
+
+        # mesma semente, outro prefixo: CPFs não colidem com a primeira carga
+        call_command(
+            "seed_scale", "--users", "40", "--demandas", "10", "--prefix", "seed2", "--skip-rollups",
+            stdout=io.StringIO(),
+        )
+        self.assertEqual(User.objects.filter(email__startswith="seed2-").count(), 40)
+
+
+class InstrumentationTests(MarketplaceFixture, APITestCase):
+    def test_server_timing_e_metrics(self):
+        with tempfile.TemporaryDirectory() as tmp, self.settings(METRICS_DIR=tmp):
+            metrics.registry.series.clear()
+            self.client.force_authenticate(self.client_user)
+            response = self.client.get(reverse("demanda-list"))
+            timing = response["Server-Timing"]
+            self.assertRegex(timing, r'db;dur=[\d.]+;desc="\d+ queries"')
+            self.assertIn("render;dur=", timing)
+            self.assertIn("total;dur=", timing)
+
+            text = self.client.get(reverse("metrics")).content.decode()
+            self.assertIn('vagali_http_request_duration_seconds_count{view="demanda-list",method="GET"} 1', text)
+            self.assertIn('vagali_http_responses_total{view="demanda-list",method="GET",status="2xx"} 1', text)
+            self.assertIn('le="+Inf"', text)
+
+
+class ProfilingTests(MarketplaceFixture, APITestCase):
+    def test_perfil_so_para_staff(self):
+        url = reverse("demanda-list")
+        self.client.force_login(self.client_user)
+        response = self.client.get(url, {"__profile": 1})
+        self.assertEqual(response["Content-Type"], "application/json")
+
+        staff = User.objects.create_user(email="staff@vagali.com", password="x", is_staff=True)
+        token = Token.objects.create(user=staff)
+        self.client.logout()
+        with self.settings(PROFILER_INTERVAL=0.0005):
+            response = self.client.get(url, HTTP_X_PROFILE="1", HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertEqual(response["X-Profiled-Status"], "200")
+        for line in response.content.decode().splitlines():
+            self.assertRegex(line, r"^\S.* \d+$")
+
+    def test_consulta_lenta_com_origem_e_plano(self):
+        self.client.force_authenticate(self.client_user)
+        Offer.objects.filter(pk=self.offer.pk).update(status="aceita")
+        Demanda.objects.filter(pk=self.demanda.pk).update(status="em_andamento")
+
+        with self.settings(SLOW_QUERY_MS=0), self.assertLogs("vagali.slow_query", "WARNING") as logs:
+            self.client.get(reverse("demanda-detail", args=[self.demanda.pk]))
+
+        records = [r for r in logs.records if r.site == "DemandaSerializer.get_accepted_offer_value"]
+        self.assertEqual(len(records), 1)
+        self.assertIn('"status" = ?', records[0].sql)
+        self.assertTrue(records[0].plan)
+        self.assertTrue(any("get_accepted_offer_value" in site for site in records[0].call_site))
+
+
+class EventLogTests(MarketplaceFixture, APITestCase):
+    def test_aceitar_grava_evento_na_transacao(self):
+        self.client.force_authenticate(self.client_user)
+        self.client.post(reverse("offer-aceitar", args=[self.offer.pk]))
+
+        event = MarketplaceEvent.objects.get()
+        self.assertEqual((event.kind, event.entity_id), ("oferta.aceita", self.offer.pk))
+        self.assertEqual(event.payload["demanda"], self.demanda.pk)
+        self.assertEqual(event.payload["valor"], "150.00")
+
+        with self.assertRaises(ValueError):
+            event.save()
+
+    def test_consumidor_avanca_por_offset_e_para_em_buraco_recente(self):
+        with transaction.atomic():
+            for n in range(5):
+                events.emit("demanda.criada", "demanda", n)
+        ids = list(MarketplaceEvent.objects.values_list("id", flat=True))
+
+        seen = []
+        self.assertEqual(events.consume("notificacoes", seen.extend, batch_size=3), 3)
+        self.assertEqual(events.consume("notificacoes", seen.extend, batch_size=3), 2)
+        self.assertEqual(events.consume("notificacoes", seen.extend), 0)
+        self.assertEqual([e.id for e in seen], ids)
+
+        # id pulado por uma transação ainda aberta: espera até o timeout
+        MarketplaceEvent.objects.create(id=ids[-1] + 2, kind="demanda.criada", entity="demanda", entity_id=9)
+        self.assertEqual(events.read(ids[-1]), [])
+        self.assertEqual(len(events.read(ids[-1], gap_timeout=timedelta(0))), 1)
+
+    def test_endpoint_staff(self):
+        staff = User.objects.create_user(email="staff@vagali.com", password="x", is_staff=True)
+        with transaction.atomic():
+            events.emit("demanda.criada", "demanda", self.demanda.pk)
+        self.client.force_authenticate(staff)
+        data = self.client.get(reverse("event-log"), {"after": 0}).data
+        self.assertEqual(len(data["events"]), 1)
+        self.assertEqual(data["next_after"], data["events"][0]["id"])
+
+
+class ExpiryTests(MarketplaceFixture, APITestCase):
+    def test_aceitar_reconfere_status_dentro_da_transacao(self):
+        # aceitar leu a demanda pendente; o expire_stale expira antes da transação dele
+        stale = Offer.objects.select_related("demanda").get(pk=self.offer.pk)
+        expiry.expire_demandas_batch(timezone.now() + timedelta(minutes=1))
+
+        self.client.force_authenticate(self.client_user)
+        with mock.patch.object(OfferViewSet, "get_object", return_value=stale):
+            response = self.client.post(reverse("offer-aceitar", args=[self.offer.pk]))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Demanda.objects.get(pk=self.demanda.pk).status, "expirada")
+        self.assertFalse(MarketplaceEvent.objects.filter(kind="oferta.aceita").exists())
+
+    def test_expira_demandas_e_ofertas_antigas_em_lotes(self):
+        old = timezone.now() - timedelta(days=60)
+        velhas = [
+            Demanda.objects.create(client=self.client_user, service=self.service, titulo=f"d{n}", descricao="x", cep="01001000")
+            for n in range(3)
+        ]
+        Demanda.objects.filter(pk__in=[d.pk for d in velhas] + [self.demanda.pk]).update(created_at=old)
+        Offer.objects.filter(pk=self.offer.pk).update(created_at=old)
+
+        recente = Demanda.objects.create(client=self.client_user, service=self.service, titulo="nova", descricao="x", cep="01001000")
+        oferta_velha = Offer.objects.create(demanda=recente, professional=self.professional, proposta_valor="90", proposta_prazo="1 dia")
+        Offer.objects.filter(pk=oferta_velha.pk).update(created_at=timezone.now() - timedelta(days=20))
+
+        totals = expiry.sweep(batch_size=2)
+        self.assertEqual(totals["demandas"], 4)
+        self.assertEqual(totals["ofertas_de_demandas"], 1)
+        self.assertEqual(totals["ofertas"], 1)
+
+        self.assertEqual(Demanda.objects.filter(status="pendente").get(), recente)
+        self.assertFalse(Offer.objects.filter(status="pendente").exists())
+        self.assertEqual(MarketplaceEvent.objects.filter(kind="demanda.expirada").count(), 4)
+        self.assertEqual(MarketplaceEvent.objects.filter(kind="oferta.expirada").count(), 2)
+
+        # nada mais a fazer
+        self.assertEqual(expiry.sweep()["batches"], 0)
+
+
+class ArchiveTests(MarketplaceFixture, APITestCase):
+    def test_arquiva_encerradas_antigas_e_historico_le_os_dois_niveis(self):
+        old = timezone.now() - timedelta(days=400)
+        Offer.objects.filter(pk=self.offer.pk).update(status="aceita", created_at=old)
+        Demanda.objects.filter(pk=self.demanda.pk).update(
+            status="concluida", professional=self.professional, created_at=old
+        )
+        Feedback.objects.create(demanda=self.demanda, client=self.client_user, professional=self.professional, rating=5)
+        recente = Demanda.objects.create(
+            client=self.client_user, service=self.service, titulo="recente", descricao="x", cep="01001000", status="cancelada"
+        )
+        aberta = Demanda.objects.create(client=self.client_user, service=self.service, titulo="aberta", descricao="x", cep="01001000")
+        backfill()
+        pricing.rebuild()
+        stats_before = list(DailyServiceStats.objects.order_by("day").values_list("day", "offers_accepted", "accepted_value_sum"))
+        sketches_before = list(PriceSketch.objects.order_by("id").values_list("kind", "count"))
+
+        totals = archive.sweep(batch_size=1)
+        self.assertEqual((totals["demandas"], totals["ofertas"]), (1, 1))
+        self.assertFalse(Demanda.objects.filter(pk=self.demanda.pk).exists())
+        self.assertFalse(Feedback.objects.exists())
+        self.assertEqual(ArchivedOffer.objects.get().demanda_id, self.demanda.pk)
+        self.assertEqual(ArchivedDemanda.objects.get().feedback.rating, 5)
+        self.assertEqual(MarketplaceEvent.objects.filter(kind="demanda.arquivada").count(), 1)
+
+        # o arquivo continua contando no rollup e nos sketches
+        backfill()
+        pricing.rebuild()
+        self.assertEqual(
+            list(DailyServiceStats.objects.order_by("day").values_list("day", "offers_accepted", "accepted_value_sum")), stats_before
+        )
+        self.assertEqual(list(PriceSketch.objects.order_by("kind").values_list("kind", "count")), sorted(sketches_before))
+
+        token = Token.objects.create(user=self.client_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        url = reverse("demanda-historico")
+        first = self.client.get(url, {"limit": 1}).json()
+        self.assertEqual([(r["id"], r["arquivada"]) for r in first["results"]], [(recente.pk, False)])
+        second = self.client.get(url, {"limit": 1, "before": first["next_before"]}).json()
+        self.assertEqual([(r["id"], r["arquivada"]) for r in second["results"]], [(self.demanda.pk, True)])
+        self.assertEqual(second["results"][0]["accepted_offer_value"], 150.0)
+        self.assertIsNone(second["next_before"])
+
+        feedbacks = self.client.get(reverse("feedback-historico")).json()["results"]
+        self.assertEqual([(f["demanda"], f["arquivada"]) for f in feedbacks], [(self.demanda.pk, True)])
+        self.assertNotIn(aberta.pk, [r["id"] for r in first["results"] + second["results"]])
+
+
+class DeltaSyncTests(MarketplaceFixture, APITestCase):
+    def test_since_devolve_so_alteracoes_e_remocoes(self):
+        token = Token.objects.create(user=self.client_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        url = reverse("demanda-list")
+
+        full = self.client.get(url, {"since": ""}).json()
+        self.assertEqual([r["id"] for r in full["results"]], [self.demanda.pk])
+        self.assertEqual(full["removed"], [])
+
+        # o cursor recua sync.OVERLAP: tudo anterior a ele fica de fora
+        Demanda.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        Offer.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        empty = self.client.get(url, {"since": full["cursor"]}).json()
+        self.assertEqual((empty["results"], empty["removed"]), ([], []))
+
+        nova = Demanda.objects.create(client=self.client_user, service=self.service, titulo="nova", descricao="x", cep="01001000")
+        backfill()
+        pricing.rebuild()
+        self.client.delete(reverse("demanda-detail", args=[self.demanda.pk]))
+        delta = self.client.get(url, {"since": full["cursor"]}).json()
+        self.assertEqual([r["id"] for r in delta["results"]], [nova.pk])
+        self.assertEqual(delta["removed"], [self.demanda.pk])
+
+        # a oferta da demanda excluída também vira lápide
+        offers = self.client.get(reverse("offer-list"), {"since": full["cursor"]}).json()
+        self.assertEqual(offers["removed"], [self.offer.pk])
+
+        self.assertEqual(self.client.get(url, {"since": "abc"}).status_code, 400)
+        old = sync.encode_cursor(timezone.now() - timedelta(days=400))
+        self.assertEqual(self.client.get(url, {"since": old}).status_code, 410)
+
+    def test_demanda_que_sai_do_feed_aparece_em_removed_para_o_profissional(self):
+        token = Token.objects.create(user=self.professional)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        url = reverse("demanda-list")
+        cursor = self.client.get(url, {"since": ""}).json()["cursor"]
+        Demanda.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+
+        expiry.expire_demandas_batch(timezone.now())
+        delta = self.client.get(url, {"since": cursor}).json()
+        self.assertEqual((delta["results"], delta["removed"]), ([], [self.demanda.pk]))
+
+    def test_lapides_so_para_quem_via_a_linha(self):
+        outro_cliente = User.objects.create_user(email="outro@vagali.com", password="x")
+        outro_pro = User.objects.create_user(email="outro-pro@vagali.com", password="x", is_professional=True)
+        since = sync.encode_cursor(timezone.now() - timedelta(minutes=1))
+        backfill()
+        pricing.rebuild()
+
+        self.client.force_authenticate(self.professional)
+        self.client.delete(reverse("offer-detail", args=[self.offer.pk]))
+        for user, expected in ((self.client_user, [self.offer.pk]), (self.professional, [self.offer.pk]),
+                               (outro_cliente, []), (outro_pro, [])):
+            self.client.force_authenticate(user)
+            self.assertEqual(self.client.get(reverse("offer-list"), {"since": since}).json()["removed"], expected)
+
+        # arquivo de demanda encerrada há meses: só o cliente recebe a lápide
+        Demanda.objects.filter(pk=self.demanda.pk).update(status="concluida")
+        Demanda.objects.filter(pk=self.demanda.pk).update(
+            created_at=timezone.now() - timedelta(days=400), updated_at=timezone.now() - timedelta(days=300)
+        )
+        archive.sweep()
+        for user, expected in ((self.client_user, [self.demanda.pk]), (self.professional, []), (outro_pro, [])):
+            self.client.force_authenticate(user)
+            self.assertEqual(self.client.get(reverse("demanda-list"), {"since": since}).json()["removed"], expected)
+
+
+class OfferRankingTests(MarketplaceFixture, APITestCase):
+    def test_ofertas_ranqueadas_em_uma_consulta(self):
+        # profissional experiente, bem avaliado e vizinho, mas um pouco mais caro
+        veterano = User.objects.create_user(email="veterano@vagali.com", password="x", is_professional=True)
+        veterano.profile.cep = "01001500"
+        veterano.profile.save()
+        feita = Demanda.objects.create(
+            client=self.client_user, service=self.service, titulo="t", descricao="x", cep="01001000",
+            professional=veterano, status="concluida",
+        )
+        Feedback.objects.create(demanda=feita, client=self.client_user, professional=veterano, rating=5)
+        Offer.objects.create(demanda=self.demanda, professional=veterano, proposta_valor="160.00", proposta_prazo="1 dia")
+        for n in range(3):
+            pro = User.objects.create_user(email=f"pro{n}@vagali.com", password="x", is_professional=True)
+            Offer.objects.create(demanda=self.demanda, professional=pro, proposta_valor="300.00", proposta_prazo="1 dia")
+
+        token = Token.objects.create(user=self.client_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        url = reverse("demanda-ofertas-ranqueadas", args=[self.demanda.pk])
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get(url).json()
+
+        ranking = [r["ranking"] for r in data["results"]]
+        self.assertEqual(data["results"][0]["professional"], veterano.pk)
+        self.assertEqual(data["results"][1]["id"], self.offer.pk)
+        self.assertEqual((ranking[0]["completed_jobs"], ranking[0]["reviews"], ranking[0]["cep_match_digits"]), (1, 1, 5))
+        self.assertEqual(ranking, sorted(ranking, key=lambda r: -r["score"]))
+        # sem sketch de preços: referência = média das ofertas da demanda
+        self.assertIsNone(data["typical_price"])
+        self.assertEqual(ranking[0]["reference_price"], 242.0)
+        ranked_queries = [q for q in ctx.captured_queries if '"app_servicos_offer"' in q["sql"]]
+        # com sharding, a lista de profissionais para professional_stats() é mais uma
+        self.assertEqual(len(ranked_queries), 2 if sharding.active() else 1)
+
+        pro_token = Token.objects.create(user=self.professional)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {pro_token.key}")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+
+class ShardingTests(MarketplaceFixture, APITestCase):
+    @override_settings(CEP_SHARDS=[("00", "49", "default"), ("50", "99", "shard1")])
+    def test_faixas_de_cep(self):
+        self.assertEqual(sharding.shard_for_cep("01001000"), "default")
+        self.assertEqual(sharding.shard_for_cep("50000000"), "shard1")
+        self.assertEqual(sharding.shard_for_cep(""), "default")
+        self.assertEqual(sharding.shards_for_prefix("4"), ["default"])
+        self.assertEqual(sharding.shards_for_prefix(""), ["default", "shard1"])
+        self.assertEqual(sharding.namespace("shard1"), 1)
+
+    def test_ids_na_faixa_do_shard_e_merge_ordenado(self):
+        first = sharding.allocate_ids("default", Demanda, 3)
+        second = sharding.allocate_ids("default", Demanda, 1)
+        self.assertEqual((len(first), second[0]), (3, first[-1] + 1))
+        self.assertEqual(first[0] // sharding.ID_SPAN, 1)
+
+        t = [timezone.now() - timedelta(minutes=n) for n in range(4)]
+        queryset = Demanda.objects.order_by("-created_at", "-id").values_list("id", "created_at")
+        merged = sharding.merge(queryset, [[(1, t[0]), (4, t[2])], [(3, t[1]), (2, t[2]), (5, t[3])]])
+        self.assertEqual([pk for pk, _ in merged], [1, 3, 4, 2, 5])
+
+    @skipUnless(sharding.active(), "rode com VAGALI_SHARDS=2 ou mais")
+    def test_roteamento_troca_de_cep_e_rebalanceamento(self):
+        far = sharding.aliases()[-1]
+        self.client.force_authenticate(self.client_user)
+        response = self.client.post(
+            reverse("demanda-list"),
+            {"service": self.service.id, "titulo": "Reformar", "descricao": "-", "cep": "99000000"},
+        )
+        nova = Demanda.objects.using(far).get(pk=response.data["id"])
+        self.assertEqual(nova.pk // sharding.ID_SPAN, sharding.namespace(far) + 1)
+        # lista do cliente: scatter-gather na ordem do queryset
+        listed = self.client.get(reverse("demanda-list")).json()
+        self.assertEqual([r["id"] for r in listed], [nova.pk, self.demanda.pk])
+
+        self.client.force_authenticate(self.professional)
+        self.client.post(
+            reverse("offer-list"),
+            {"demanda": nova.pk, "proposta_valor": "90.00", "proposta_prazo": "1 dia"},
+            format="json",
+        )
+        self.assertTrue(Offer.objects.using(far).filter(demanda_id=nova.pk).exists())
+
+        # trocar o CEP de região leva a demanda (e a oferta) para o outro shard
+        self.client.force_authenticate(self.client_user)
+        response = self.client.patch(reverse("demanda-detail", args=[nova.pk]), {"cep": "01002000"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Offer.objects.using("default").filter(demanda_id=nova.pk).count(), 1)
+        self.assertFalse(Demanda.objects.using(far).filter(pk=nova.pk).exists())
+
+        # faixas invertidas: rebalance_shards move tudo, mantendo ids e datas
+        shards = sharding.shard_map()
+        flipped = [(first, last, alias) for (first, last, _), alias in zip(shards, reversed(sharding.aliases()))]
+        with override_settings(CEP_SHARDS=flipped):
+            call_command("rebalance_shards", stdout=io.StringIO())
+        moved = Demanda.objects.using(far).get(pk=self.demanda.pk)
+        self.assertEqual(moved.created_at, self.demanda.created_at)
+        self.assertEqual(Offer.objects.using(far).filter(demanda_id=self.demanda.pk).count(), 1)
+        self.assertEqual(Demanda.objects.count(), 2)
+
+    @skipUnless(sharding.active(), "rode com VAGALI_SHARDS=2 ou mais")
+    def test_ranking_soma_historico_de_todos_os_shards(self):
+        # serviço concluído e avaliado em outra região (outro shard)
+        far_cep = next(
+            f"{region:02d}000000" for region in range(100)
+            if sharding.shard_for_cep(f"{region:02d}000000") != sharding.shard_of(self.demanda)
+        )
+        feita = Demanda.objects.create(
+            client=self.client_user, service=self.service, titulo="t", descricao="x", cep=far_cep,
+            professional=self.professional, status="concluida",
+        )
+        Feedback.objects.create(demanda=feita, client=self.client_user, professional=self.professional, rating=5)
+
+        ranked = ranking.ranked_offers(self.demanda).get(pk=self.offer.pk)
+        self.assertEqual((ranked.completed_jobs, ranked.reviews, ranked.rating_sum), (1, 1, 5))
+
+
+def _box(kind, payload=b""):
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def sample_mp4():
+    """MP4 mínimo como o de celular: ftyp, mdat com dois blocos e moov no fim."""
+    chunks = [b"FRAME-0" + bytes(50), b"FRAME-1" + bytes(50)]
+    ftyp = _box(b"ftyp", b"isom\0\0\0\0isomavc1")
+    mdat = _box(b"mdat", b"".join(chunks))
+    offsets = [len(ftyp) + 8, len(ftyp) + 8 + len(chunks[0])]
+    mvhd = _box(b"mvhd", bytes(4) + struct.pack(">IIII", 0, 0, 1000, 12500) + bytes(80))
+    tkhd = _box(b"tkhd", bytes(76) + struct.pack(">II", 1280 << 16, 720 << 16))
+    hdlr = _box(b"hdlr", bytes(8) + b"vide" + bytes(13))
+    stsd = _box(b"stsd", bytes(4) + struct.pack(">I", 1) + _box(b"avc1", bytes(78)))
+    stco = _box(b"stco", bytes(4) + struct.pack(">III", 2, *offsets))
+    stbl = _box(b"stbl", stsd + stco)
+    moov = _box(b"moov", mvhd + _box(b"trak", tkhd + _box(b"mdia", hdlr + _box(b"minf", stbl))))
+    return ftyp + mdat + moov
+
+
+class VideoProcessingTests(MarketplaceFixture, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.settings_override = self.settings(MEDIA_ROOT=self.tmp.name)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def test_faststart_move_o_moov_e_corrige_offsets(self):
+        src, dst = io.BytesIO(sample_mp4()), io.BytesIO()
+        info, boxes = mp4.probe(src)
+        self.assertEqual(info, mp4.VideoInfo(12.5, 1280, 720, "h264"))
+        self.assertTrue(mp4.faststart(src, dst, boxes))
+
+        out = dst.getvalue()
+        self.assertEqual([box.type for box in mp4.scan(io.BytesIO(out))], [b"ftyp", b"moov", b"mdat"])
+        stco = out.index(b"stco") + 12
+        for n, offset in enumerate(struct.unpack_from(">II", out, stco)):
+            self.assertEqual(out[offset:offset + 7], f"FRAME-{n}".encode())
+        # já em ordem: nada a fazer
+        self.assertFalse(mp4.faststart(io.BytesIO(out), io.BytesIO()))
+
+        with self.assertRaises(mp4.Mp4Error):
+            mp4.scan(io.BytesIO(sample_mp4()[:-20]))
+
+    def test_fila_processa_portfolio_e_marca_invalidos(self):
+        self.client.force_authenticate(self.professional)
+        upload = SimpleUploadedFile("clipe.mp4", sample_mp4(), content_type="video/mp4")
+        response = self.client.post(reverse("portfolio-list-create"), {"file": upload, "is_video": "true"})
+        self.assertEqual(response.data["video"]["status"], "pendente")
+
+        self.client.force_authenticate(self.client_user)
+        response = self.client.post(
+            reverse("demanda-list"),
+            {
+                "service": self.service.id, "titulo": "Vazamento", "descricao": "-", "cep": "01001000",
+                "videos": SimpleUploadedFile("video.mp4", b"isto nao e um mp4", content_type="video/mp4"),
+            },
+        )
+        demanda_id = response.data["id"]
+
+        out = io.StringIO()
+        with self.assertLogs("vagali.videos", "WARNING"):
+            call_command("process_videos", stdout=out)
+        self.assertIn("1 vídeos prontos, 1 inválidos", out.getvalue())
+
+        item = PortfolioItem.objects.get()
+        self.assertEqual((item.video_status, item.video_duration, item.video_codec), ("pronto", 12.5, "h264"))
+        with item.file.open("rb") as fh:
+            self.assertEqual([box.type for box in mp4.scan(fh)], [b"ftyp", b"moov", b"mdat"])
+        # o original (moov no fim) foi substituído
+        self.assertEqual(os.listdir(os.path.join(self.tmp.name, "portfolio")), [os.path.basename(item.file.name)])
+
+        data = self.client.get(reverse("demanda-detail", args=[demanda_id])).json()
+        self.assertEqual(data["video"]["status"], "invalido")
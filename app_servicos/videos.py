@@ -0,0 +1,118 @@
+# app_servicos/videos.py
+
+import logging
+import tempfile
+
+from django.core.files import File
+from django.utils import timezone
+
+from accounts.models import PortfolioItem
+from app_servicos.models import Demanda
+from vagali_project import mp4
+
+
+logger = logging.getLogger("vagali.videos")
+
+BATCH_SIZE = 20
+
+# (modelo, campo do arquivo) com as colunas video_* de metadados
+SOURCES = ((PortfolioItem, "file"), (Demanda, "videos"))
+
+METADATA = ("video_status", "video_duration", "video_width", "video_height", "video_codec")
+
+
+def pending_fields(has_video):
+    """Colunas a gravar junto de um upload (ou da remoção do vídeo)."""
+    return {
+        "video_status": "pendente" if has_video else "",
+        "video_duration": None,
+        "video_width": None,
+        "video_height": None,
+        "video_codec": "",
+    }
+
+
+def video_info(status, duration, width, height, codec):
+    """Chave `video` da API (None quando não há vídeo)."""
+    if not status:
+        return None
+    return {"status": status, "duration": duration, "width": width, "height": height, "codec": codec or None}
+
+
+# ---------------------------------------------------------
+# 1. Um vídeo — metadados + moov na frente (vagali_project/mp4.py)
+# ---------------------------------------------------------
+def process(obj, field_name):
+    """
+    Lê o vídeo de `obj` em streaming, grava duração/resolução/codec e, se
+    o moov estiver no fim, troca o arquivo por uma cópia com o moov na
+    frente. Arquivo que não é MP4/MOV válido fica como "invalido".
+    A gravação é condicional: se o vídeo mudou no meio, nada é alterado.
+    Devolve o status gravado (ou None).
+    """
+    model = type(obj)
+    field_file = getattr(obj, field_name)
+    storage, name = field_file.storage, field_file.name
+    new_name = None
+
+    try:
+        with storage.open(name, "rb") as src:
+            info, boxes = mp4.probe(src)
+            if mp4.needs_faststart(boxes):
+                with tempfile.TemporaryFile() as tmp:
+                    mp4.faststart(src, tmp, boxes)
+                    tmp.seek(0)
+                    new_name = storage.save(name, File(tmp, name=name))
+    except (mp4.Mp4Error, OSError) as exc:
+        logger.warning("Vídeo inválido (%s #%s, %s): %s", model._meta.label, obj.pk, name, exc)
+        fields = {"video_status": "invalido"}
+    else:
+        fields = {
+            "video_status": "pronto",
+            "video_duration": info.duration,
+            "video_width": info.width,
+            "video_height": info.height,
+            "video_codec": info.codec or "",
+        }
+        if new_name:
+            fields[field_name] = new_name
+
+    if any(field.name == "updated_at" for field in model._meta.concrete_fields):
+        fields["updated_at"] = timezone.now()
+    updated = (
+        model._base_manager.using(obj._state.db)
+        .filter(pk=obj.pk, video_status="pendente", **{field_name: name})
+        .update(**fields)
+    )
+    if new_name:
+        # a cópia substitui o original; se a linha mudou, a cópia é que sobra
+        storage.delete(name if updated else new_name)
+    return fields["video_status"] if updated else None
+
+
+# ---------------------------------------------------------
+# 2. Fila — linhas com video_status = "pendente"
+# ---------------------------------------------------------
+def process_batch(model, field_name, batch_size=BATCH_SIZE):
+    """Processa até `batch_size` vídeos pendentes de `model`. Devolve {status: n}."""
+    counts = {}
+    pending = model.objects.filter(video_status="pendente").only("id", field_name).order_by("id")[:batch_size]
+    for obj in pending:
+        status = process(obj, field_name)
+        if status:
+            counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+def sweep(batch_size=BATCH_SIZE, max_batches=None):
+    """Esvazia a fila (ou para em `max_batches`). Devolve as contagens."""
+    totals = {"pronto": 0, "invalido": 0, "batches": 0}
+    for model, field_name in SOURCES:
+        while max_batches is None or totals["batches"] < max_batches:
+            counts = process_batch(model, field_name, batch_size)
+            if not counts:
+                break
+            for status, count in counts.items():
+                totals[status] += count
+            totals["batches"] += 1
+    return totals
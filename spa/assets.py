@@ -0,0 +1,245 @@
+# spa/assets.py
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele geramos só .gz
+    brotli = None
+
+
+MANIFEST_NAME = "manifest.json"
+SHELL_NAME = "index.html"
+ASSETS_PREFIX = "assets/"
+
+# Arquivos que o Vite já nomeia com hash de conteúdo (ex.: index-B3x9_aZk.js)
+VITE_HASHED = re.compile(r"-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+
+COMPRESSIBLE = {".js", ".mjs", ".css", ".html", ".svg", ".json", ".map", ".txt", ".xml", ".ico", ".webmanifest"}
+MIN_COMPRESS_SIZE = 256
+
+
+def build_dir():
+    return Path(settings.SPA_BUILD_DIR)
+
+
+def output_dir():
+    return Path(settings.SPA_ASSETS_DIR)
+
+
+def content_hash(data, size=12):
+    return hashlib.sha256(data).hexdigest()[:size]
+
+
+# -------------------------------------------------------------
+# 1. BUILD — roda uma vez por deploy (manage.py build_spa)
+# -------------------------------------------------------------
+def hashed_name(relative, data):
+    """
+    Caminho final (sempre sob assets/). Arquivos do Vite já com hash
+    mantêm o nome; os demais (pasta public/) ganham o hash no nome.
+    """
+    path = Path(relative)
+    if relative.startswith(ASSETS_PREFIX) and VITE_HASHED.search(path.name):
+        return relative
+    return f"{ASSETS_PREFIX}{path.stem}.{content_hash(data)}{path.suffix}"
+
+
+def precompress(target, data):
+    """
+    Grava irmãos .br/.gz quando ficam menores que o original.
+    Devolve a lista de codificações geradas.
+    """
+    if target.suffix.lower() not in COMPRESSIBLE or len(data) < MIN_COMPRESS_SIZE:
+        return []
+
+    encodings = []
+    if brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        if len(compressed) < len(data):
+            target.with_name(target.name + ".br").write_bytes(compressed)
+            encodings.append("br")
+
+    # mtime=0: mesma entrada gera o mesmo .gz (build reprodutível)
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(compressed) < len(data):
+        target.with_name(target.name + ".gz").write_bytes(compressed)
+        encodings.append("gzip")
+    return encodings
+
+
+def build(source=None, destination=None):
+    """
+    Lê o build do Vite (`dist/`), grava os arquivos com nomes por hash e as
+    versões pré-comprimidas, reescreve as referências no index.html e
+    salva o manifesto. Devolve o manifesto.
+    """
+    source = Path(source or build_dir())
+    destination = Path(destination or output_dir())
+
+    shell_path = source / SHELL_NAME
+    if not shell_path.exists():
+        raise FileNotFoundError(f"{shell_path} não encontrado — rode `npm run build` no frontend.")
+
+    builds = builds_dir(destination)
+    builds.mkdir(parents=True, exist_ok=True)
+    staging = builds / ".staging"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+
+    files = {}
+    renamed = {}
+    for path in sorted(source.rglob("*")):
+        if not path.is_file() or path == shell_path:
+            continue
+        relative = path.relative_to(source).as_posix()
+        data = path.read_bytes()
+        name = hashed_name(relative, data)
+
+        target = staging / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+
+        files[name] = {
+            "source": relative,
+            "etag": content_hash(data),
+            "encodings": precompress(target, data),
+        }
+        if name != relative:
+            renamed[relative] = name
+
+    # index.html: troca "/vite.svg" por "/assets/vite.<hash>.svg" etc.
+    shell = shell_path.read_text(encoding="utf-8")
+    for original, name in sorted(renamed.items(), key=lambda item: -len(item[0])):
+        shell = re.sub(
+            r'(["\'(])/' + re.escape(original) + r'(["\')?#])',
+            lambda match: f"{match.group(1)}/{name}{match.group(2)}",
+            shell,
+        )
+    shell_bytes = shell.encode("utf-8")
+    (staging / SHELL_NAME).write_bytes(shell_bytes)
+
+    manifest = {
+        "shell": {
+            "etag": content_hash(shell_bytes),
+            "encodings": precompress(staging / SHELL_NAME, shell_bytes),
+        },
+        "files": files,
+        "renamed": renamed,
+        "previous": _carry_previous(destination, staging, files),
+    }
+    manifest_bytes = json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8")
+    (staging / MANIFEST_NAME).write_bytes(manifest_bytes)
+
+    build_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{content_hash(manifest_bytes, 8)}"
+    if (builds / build_id).exists():
+        shutil.rmtree(staging)  # mesmo conteúdo, mesmo segundo: já publicado
+    else:
+        staging.rename(builds / build_id)
+    publish(destination, builds / build_id)
+    return manifest
+
+
+def builds_dir(destination):
+    """Builds publicados, um diretório por versão (SPA_ASSETS_DIR aponta para um)."""
+    return destination.with_name(destination.name + ".builds")
+
+
+def _carry_previous(destination, staging, files):
+    """
+    Copia para o novo build os arquivos com hash do build atual que
+    saíram dele: quem ainda tem o index.html anterior continua achando os
+    bundles por mais um ciclo. Devolve as entradas para o manifesto.
+    """
+    try:
+        current = json.loads((destination / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (FileNotFoundError, NotADirectoryError):
+        return {}
+
+    previous = {}
+    for name, entry in current["files"].items():
+        if name in files:
+            continue
+        target = staging / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        for suffix in ("", ".br", ".gz"):
+            source = destination / (name + suffix)
+            if source.exists():
+                shutil.copy2(source, target.with_name(target.name + suffix))
+        previous[name] = entry
+    return previous
+
+
+def publish(destination, build):
+    """
+    Troca atômica: `destination` é um symlink para o build e é substituído
+    com os.replace — nenhum request vê o diretório vazio ou pela metade.
+    Mantém o build anterior (requests em andamento) e apaga os mais velhos.
+    """
+    previous = destination.resolve() if destination.is_symlink() else None
+    if destination.exists() and not destination.is_symlink():
+        # layout antigo (diretório comum): vira um build, uma única vez
+        previous = builds_dir(destination) / "legacy"
+        shutil.rmtree(previous, ignore_errors=True)
+        destination.rename(previous)
+
+    link = destination.with_name(destination.name + ".link")
+    link.unlink(missing_ok=True)
+    link.symlink_to(build.resolve(), target_is_directory=True)
+    os.replace(link, destination)
+
+    keep = {build.resolve(), previous}
+    for old in builds_dir(destination).iterdir():
+        if old.is_dir() and old.name != ".staging" and old.resolve() not in keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+# -------------------------------------------------------------
+# 2. LEITURA DO MANIFESTO (em memória, recarrega se mudar)
+# -------------------------------------------------------------
+_manifest_cache = {"mtime": None, "data": None}
+
+
+def load_manifest():
+    path = output_dir() / MANIFEST_NAME
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    # cada build tem o seu manifesto (outro inode): troca do symlink recarrega
+    mtime = (stat.st_ino, stat.st_mtime_ns)
+
+    if _manifest_cache["mtime"] != mtime:
+        _manifest_cache["data"] = json.loads(path.read_text(encoding="utf-8"))
+        _manifest_cache["mtime"] = mtime
+    return _manifest_cache["data"]
+
+
+def negotiate(accept_encoding, available):
+    """
+    Escolhe br > gzip > identidade entre as versões disponíveis,
+    respeitando `q=0` no Accept-Encoding.
+    """
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            quality = float(match.group(1))
+        if token:
+            accepted[token.lower()] = quality
+
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
@@ -0,0 +1,33 @@
+# spa/management/commands/build_spa.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from spa import assets
+
+
+class Command(BaseCommand):
+    help = (
+        "Processa o build do Vite (vagali_frontend/dist): nomes com hash, "
+        "versões .br/.gz e manifesto para o Django servir o SPA."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", default=None, help="Padrão: settings.SPA_BUILD_DIR")
+        parser.add_argument("--output", default=None, help="Padrão: settings.SPA_ASSETS_DIR")
+
+    def handle(self, *args, **options):
+        try:
+            manifest = assets.build(options["source"], options["output"])
+        except FileNotFoundError as exc:
+            raise CommandError(str(exc))
+
+        files = manifest["files"]
+        compressed = sum(1 for entry in files.values() if entry["encodings"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(files)} arquivos publicados ({compressed} pré-comprimidos), "
+                f"{len(manifest['renamed'])} renomeados com hash."
+            )
+        )
+        if assets.brotli is None:
+            self.stdout.write("brotli não instalado: apenas versões .gz foram geradas.")
@@ -0,0 +1,88 @@
+import gzip
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from spa import assets
+
+
+class SpaAssetsTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.dist = root / "dist"
+        (self.dist / "assets").mkdir(parents=True)
+        (self.dist / "index.html").write_text(
+            '<link rel="icon" href="/vite.svg" />'
+            '<script type="module" src="/assets/index-B3x9_aZk.js"></script>',
+            encoding="utf-8",
+        )
+        (self.dist / "assets" / "index-B3x9_aZk.js").write_text("console.log('vagali');\n" * 50)
+        (self.dist / "vite.svg").write_text("<svg></svg>")
+
+        self.settings_override = override_settings(SPA_BUILD_DIR=self.dist, SPA_ASSETS_DIR=root / "out")
+        self.settings_override.enable()
+        self.manifest = assets.build()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.tmp.cleanup()
+
+    def test_build_gera_hash_dos_arquivos_e_reescreve_o_shell(self):
+        svg = self.manifest["renamed"]["vite.svg"]
+        self.assertRegex(svg, r"^assets/vite\.[0-9a-f]{12}\.svg$")
+        self.assertIn("assets/index-B3x9_aZk.js", self.manifest["files"])
+        self.assertIn("gzip", self.manifest["files"]["assets/index-B3x9_aZk.js"]["encodings"])
+
+        shell = (assets.output_dir() / "index.html").read_text(encoding="utf-8")
+        self.assertIn(f'href="/{svg}"', shell)
+        self.assertIn('src="/assets/index-B3x9_aZk.js"', shell)
+
+    def test_asset_servido_pre_comprimido_e_imutavel(self):
+        url = reverse("spa-asset", args=["index-B3x9_aZk.js"])
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, br;q=0")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("Accept-Encoding", response["Vary"])
+        body = gzip.decompress(b"".join(response.streaming_content))
+        self.assertTrue(body.startswith(b"console.log"))
+
+        plain = self.client.get(url)
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertNotEqual(plain["ETag"], response["ETag"])
+
+        self.assertEqual(self.client.get(reverse("spa-asset", args=["nao-existe.js"])).status_code, 404)
+
+    def test_shell_revalida_com_etag(self):
+        response = self.client.get(reverse("home"))
+        self.assertEqual(response["Cache-Control"], "no-cache")
+
+        again = self.client.get(reverse("home"), HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+    def test_rebuild_troca_symlink_e_mantem_bundles_anteriores_por_um_ciclo(self):
+        self.assertTrue(assets.output_dir().is_symlink())
+        old_url = reverse("spa-asset", args=["index-B3x9_aZk.js"])
+
+        def rebuild(bundle):
+            for old in (self.dist / "assets").iterdir():
+                old.unlink()
+            (self.dist / "assets" / bundle).write_text(f"console.log('{bundle}');\n" * 50)
+            (self.dist / "index.html").write_text(f'<script type="module" src="/assets/{bundle}"></script>')
+            return assets.build()
+
+        manifest = rebuild("index-Cc44_bbQ.js")
+        self.assertIn("assets/index-B3x9_aZk.js", manifest["previous"])
+        self.assertIn("index-Cc44_bbQ.js", self.client.get(reverse("home")).getvalue().decode())
+        # quem ainda tem o index.html anterior continua achando o bundle antigo
+        self.assertEqual(self.client.get(old_url).status_code, 200)
+        self.assertEqual(self.client.get(old_url, HTTP_ACCEPT_ENCODING="gzip")["Content-Encoding"], "gzip")
+
+        rebuild("index-Dd55_ccR.js")
+        self.assertEqual(self.client.get(old_url).status_code, 404)
+        self.assertEqual(self.client.get(reverse("spa-asset", args=["index-Cc44_bbQ.js"])).status_code, 200)
+        # build atual + anterior; os mais velhos são apagados
+        self.assertEqual(len(list(assets.builds_dir(assets.output_dir()).iterdir())), 2)
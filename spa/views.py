@@ -0,0 +1,83 @@
+# spa/views.py
+
+import mimetypes
+
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from django.views.generic import TemplateView
+
+from . import assets
+
+
+ENCODING_SUFFIX = {"br": ".br", "gzip": ".gz"}
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _etag_matches(request, etag):
+    header = request.headers.get("If-None-Match", "")
+    return etag in [tag.strip() for tag in header.split(",")] or header.strip() == "*"
+
+
+def _serve(request, path, entry, content_type, cache_control):
+    """
+    Entrega o arquivo (ou o irmão .br/.gz) com ETag e Vary corretos.
+    """
+    encoding = assets.negotiate(request.headers.get("Accept-Encoding"), entry["encodings"])
+    etag = f'"{entry["etag"]}{"-" + encoding if encoding else ""}"'
+
+    if _etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        target = path.with_name(path.name + ENCODING_SUFFIX[encoding]) if encoding else path
+        response = FileResponse(open(target, "rb"), content_type=content_type)
+        if encoding:
+            response["Content-Encoding"] = encoding
+
+    response["ETag"] = etag
+    response["Cache-Control"] = cache_control
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
+
+
+class SpaAssetView(View):
+    """
+    /assets/<arquivo> — somente arquivos listados no manifesto (do build
+    atual ou, por um ciclo, do anterior); nomes com hash de conteúdo,
+    então o cache pode ser eterno (immutable).
+    """
+
+    def get(self, request, path):
+        manifest = assets.load_manifest()
+        name = f"{assets.ASSETS_PREFIX}{path}"
+        entry = manifest and (manifest["files"].get(name) or manifest.get("previous", {}).get(name))
+        if not entry:
+            raise Http404("Arquivo não encontrado.")
+
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        return _serve(request, assets.output_dir() / name, entry, content_type, IMMUTABLE)
+
+    head = get
+
+
+class SpaShellView(TemplateView):
+    """
+    index.html do React. Com o build processado (manage.py build_spa),
+    serve a versão reescrita com ETag e revalidação a cada acesso;
+    sem ele, mantém o comportamento antigo (templates/index.html).
+    """
+
+    template_name = "index.html"
+
+    def get(self, request, *args, **kwargs):
+        manifest = assets.load_manifest()
+        if manifest is None:
+            return super().get(request, *args, **kwargs)
+
+        return _serve(
+            request,
+            assets.output_dir() / assets.SHELL_NAME,
+            manifest["shell"],
+            "text/html; charset=utf-8",
+            "no-cache",
+        )
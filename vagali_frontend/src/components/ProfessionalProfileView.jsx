@@ -26,6 +26,21 @@ const API_BASE_URL = "http://localhost:8000";
 const PROFESSIONALS_URL = "/api/v1/accounts/profissionais/";
 const ITEMS_PER_PAGE = 9;
 
+// backend aceita o parâmetro professional_id; resposta paginada por
+// cursor: segue "next" até o fim
+const loadPortfolio = async (professionalId) => {
+  const items = [];
+  let resp = await axios.get("/api/v1/accounts/portfolio/", {
+    params: { professional_id: professionalId, page_size: 100 },
+  });
+  items.push(...resp.data.results);
+  while (resp.data.next) {
+    resp = await axios.get(resp.data.next);
+    items.push(...resp.data.results);
+  }
+  return items;
+};
+
 const ProfessionalProfileView = () => {
   const { id } = useParams();
   const navigate = useNavigate();
@@ -93,11 +108,7 @@ const ProfessionalProfileView = () => {
       setPortfolioLoading(true);
       setPortfolioError(null);
       try {
-        // backend deve aceitar esse parâmetro professional_id (a gente já preparou)
-        const resp = await axios.get("/api/v1/accounts/portfolio/", {
-          params: { professional_id: id },
-        });
-        setPortfolioItems(resp.data);
+        setPortfolioItems(await loadPortfolio(id));
       } catch (err) {
         console.error("Erro ao carregar portfólio:", err.response || err);
         setPortfolioError("Não foi possível carregar o portfólio.");
@@ -255,10 +266,7 @@ const ProfessionalProfileView = () => {
       }
 
       // recarrega o portfólio
-      const resp = await axios.get("/api/v1/accounts/portfolio/", {
-        params: { professional_id: id },
-      });
-      setPortfolioItems(resp.data);
+      setPortfolioItems(await loadPortfolio(id));
     } catch (err) {
       console.error("Erro ao enviar mídia do portfólio:", err.response || err);
       setPortfolioError("Não foi possível adicionar a(s) mídia(s).");
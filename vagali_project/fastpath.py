@@ -0,0 +1,236 @@
+# vagali_project/fastpath.py
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from rest_framework.response import Response
+
+
+# -------------------------------------------------------------
+# 1. CONVERSÕES — mesmas saídas dos campos do DRF
+# -------------------------------------------------------------
+def iso_datetime(value):
+    """DateTimeField.to_representation (ISO 8601, fuso atual)."""
+    if not value:
+        return None
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def decimal_string(places):
+    """DecimalField.to_representation com COERCE_DECIMAL_TO_STRING."""
+    def convert(value):
+        if value is None:
+            return ""
+        return f"{round(value, places):f}"
+    return convert
+
+
+def file_url(name):
+    """FieldFile.url sem request (ex.: ProfessionalSerializer.get_photo)."""
+    return default_storage.url(name) if name else None
+
+
+def absolute_file_url(context):
+    """FileField.to_representation: URL absoluta quando há request."""
+    request = context.get("request")
+
+    def convert(name):
+        if not name:
+            return None
+        url = default_storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return convert
+
+
+absolute_file_url.contextual = True
+
+
+def name_or_email(full_name, email):
+    """`profile.full_name or user.email`, como nos get_*_name dos serializers."""
+    return full_name or email
+
+
+# -------------------------------------------------------------
+# 2. COMPILADOR DE LINHAS
+# -------------------------------------------------------------
+class Field:
+    """
+    Uma chave da saída: lida de uma ou mais colunas de values_list e,
+    opcionalmente, convertida por `to`. Se `to` tiver o atributo
+    `contextual`, ele recebe o contexto do serializer e devolve a função.
+    """
+
+    def __init__(self, key, *columns, to=None):
+        self.key = key
+        self.columns = columns or (key,)
+        self.to = to
+
+
+class FastRows:
+    """
+    Caminho rápido de leitura: uma consulta values_list() com os joins e
+    anotações necessários e uma função gerada uma única vez que monta o
+    dict de saída direto das tuplas, sem a maquinaria de campos do DRF.
+
+    A ordem das chaves e os valores são os mesmos do serializer, então o
+    JSON renderizado é idêntico byte a byte.
+    """
+
+    def __init__(self, *fields, annotations=None):
+        self.fields = fields
+        self.keys = tuple(field.key for field in fields)
+        self.annotations = annotations or {}
+        self._subsets = {}
+
+        columns = []
+        for field in fields:
+            for column in field.columns:
+                if column not in columns:
+                    columns.append(column)
+        self.columns = tuple(columns)
+
+        index = {column: i for i, column in enumerate(self.columns)}
+        items = []
+        for n, field in enumerate(fields):
+            args = ", ".join(f"r[{index[c]}]" for c in field.columns)
+            if field.to is None:
+                items.append(f"{field.key!r}: {args}")
+            else:
+                items.append(f"{field.key!r}: f{n}({args})")
+
+        source = "def row(r):\n    return {" + ", ".join(items) + "}\n"
+        self.code = compile(source, f"<fastpath {', '.join(f.key for f in fields[:3])}...>", "exec")
+
+    def prepare(self, queryset):
+        annotations = {
+            name: expression
+            for name, expression in self.annotations.items()
+            if name in self.columns
+        }
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return queryset.values_list(*self.columns)
+
+    def subset(self, keys, required=()):
+        """
+        Versão reduzida às chaves pedidas em ?fields= (na ordem original do
+        serializer), mais as `required`. Busca só as colunas e anotações
+        dessas chaves.
+        """
+        wanted = frozenset(keys) & frozenset(self.keys)
+        if not wanted:
+            return self
+        wanted |= frozenset(required) & frozenset(self.keys)
+        if wanted == frozenset(self.keys):
+            return self
+        if wanted not in self._subsets:
+            self._subsets[wanted] = FastRows(
+                *(field for field in self.fields if field.key in wanted),
+                annotations=self.annotations,
+            )
+        return self._subsets[wanted]
+
+    def deferred_loading(self):
+        """
+        (select_related, only) equivalentes às colunas desta versão, para o
+        caminho normal do DRF (retrieve, ?fast=0).
+        """
+        paths = [column for column in self.columns if column not in self.annotations]
+        relations = sorted({path.rsplit("__", 1)[0] for path in paths if "__" in path})
+        return relations, paths
+
+    def bind(self, context):
+        namespace = {}
+        for n, field in enumerate(self.fields):
+            if field.to is None:
+                continue
+            to = field.to
+            namespace[f"f{n}"] = to(context) if getattr(to, "contextual", False) else to
+        exec(self.code, namespace)
+        return namespace["row"]
+
+    def serialize(self, queryset, context):
+        row = self.bind(context)
+        return [row(r) for r in self.prepare(queryset)]
+
+
+# -------------------------------------------------------------
+# 3. ?fields= (sparse fieldsets)
+# -------------------------------------------------------------
+def requested_fields(request):
+    """Chaves pedidas em ?fields=a,b,c (somente em GET) ou None."""
+    if request is None or request.method != "GET":
+        return None
+    raw = request.query_params.get("fields")
+    if not raw:
+        return None
+    return [name.strip() for name in raw.split(",") if name.strip()]
+
+
+class SparseFieldsMixin:
+    """
+    Serializer que descarta os campos fora de ?fields= — os
+    SerializerMethodField descartados nem chegam a rodar. Os campos em
+    context["required_fields"] ficam sempre.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = requested_fields(self.context.get("request"))
+        if wanted and set(wanted) & set(self.fields):
+            keep = set(wanted) | set(self.context.get("required_fields", ()))
+            for name in set(self.fields) - keep:
+                self.fields.pop(name)
+
+
+# -------------------------------------------------------------
+# 4. MIXIN PARA VIEWSETS
+# -------------------------------------------------------------
+class FastListMixin:
+    """
+    `list` usa `serializer_class.fast_rows` quando definido.
+    ?fast=0 força o caminho normal do DRF (útil para comparar saídas).
+
+    Com ?fields=, o caminho rápido lê só as colunas pedidas e o caminho
+    normal aplica select_related() + only() equivalentes.
+    """
+
+    def get_required_fields(self):
+        """Chaves mantidas mesmo fora de ?fields= (a view ainda as usa)."""
+        return ()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["required_fields"] = self.get_required_fields()
+        return context
+
+    def get_fast_rows(self):
+        fast = getattr(self.get_serializer_class(), "fast_rows", None)
+        wanted = requested_fields(self.request)
+        if fast is not None and wanted:
+            fast = fast.subset(wanted, self.get_required_fields())
+        return fast
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fast = self.get_fast_rows()
+        if fast is not None and requested_fields(self.request):
+            relations, paths = fast.deferred_loading()
+            queryset = queryset.select_related(*relations).only(*paths)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        fast = self.get_fast_rows()
+        if fast is None or request.query_params.get("fast") == "0":
+            return super().list(request, *args, **kwargs)
+
+        queryset = fast.prepare(self.filter_queryset(self.get_queryset()))
+        row = fast.bind(self.get_serializer_context())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response([row(r) for r in page])
+        return Response([row(r) for r in queryset])
@@ -0,0 +1,29 @@
+# vagali_project/filters.py
+
+from rest_framework import exceptions
+from rest_framework.filters import BaseFilterBackend
+
+
+class IdsFilter(BaseFilterBackend):
+    """
+    Multi-get: ?ids=1,2,3 devolve apenas esses registros em uma única
+    consulta `pk IN (...)` (índice da chave primária), sempre dentro do
+    queryset que o usuário já pode ver.
+    """
+
+    max_ids = 100
+
+    def filter_queryset(self, request, queryset, view):
+        raw = request.query_params.get("ids")
+        if not raw:
+            return queryset
+
+        try:
+            ids = {int(value) for value in raw.split(",") if value.strip()}
+        except ValueError:
+            raise exceptions.ValidationError({"ids": "Use uma lista de inteiros: ?ids=1,2,3"})
+
+        if len(ids) > self.max_ids:
+            raise exceptions.ValidationError({"ids": f"Máximo de {self.max_ids} ids por requisição."})
+
+        return queryset.filter(pk__in=ids)
@@ -0,0 +1,201 @@
+# vagali_project/instrumentation.py
+
+import logging
+import re
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import DatabaseError
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.renderers import JSONRenderer
+
+
+# -------------------------------------------------------------
+# 1. TEMPOS POR FASE DA REQUISIÇÃO
+# -------------------------------------------------------------
+class RequestTimings:
+    """Tempos acumulados (segundos) de uma requisição, por fase."""
+
+    __slots__ = ("phases", "queries")
+
+    def __init__(self):
+        self.phases = {}
+        self.queries = 0
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+_current = ContextVar("vagali_request_timings", default=None)
+
+
+def start():
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+@contextmanager
+def phase(name):
+    """Soma o tempo do bloco na fase `name` (nada a fazer fora de requisição)."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def sql_timer(timings):
+    """
+    execute_wrapper que conta consultas, soma seu tempo na fase `db` e
+    registra as que passam de settings.SLOW_QUERY_MS.
+    """
+    threshold = getattr(settings, "SLOW_QUERY_MS", None)
+
+    def wrapper(execute, sql, params, many, context):
+        if _explaining.get():
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            timings.queries += 1
+            timings.add("db", elapsed)
+            if threshold is not None and elapsed * 1000 >= threshold:
+                log_slow_query(context["connection"], sql, params, many, elapsed)
+
+    return wrapper
+
+
+# -------------------------------------------------------------
+# 2. LOG DE CONSULTAS LENTAS
+# -------------------------------------------------------------
+slow_query_logger = logging.getLogger("vagali.slow_query")
+
+_site = ContextVar("vagali_query_site", default=None)
+_explaining = ContextVar("vagali_explaining", default=False)
+
+SQL_STRINGS = re.compile(r"'(?:[^']|'')*'")
+SQL_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+SQL_IN_LISTS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+SQL_SPACES = re.compile(r"\s+")
+
+# frames de bibliotecas não interessam como "local da chamada"
+LIBRARY_PATHS = ("site-packages", "/django/", "/rest_framework/", "/django_filters/", __file__)
+
+
+@contextmanager
+def query_site(name):
+    """
+    Rótulo das consultas feitas dentro do bloco (também serve como
+    decorador), mostrado no log de consultas lentas.
+    """
+    token = _site.set(name)
+    try:
+        yield
+    finally:
+        _site.reset(token)
+
+
+def normalize_sql(sql):
+    """Troca literais e parâmetros por ? e resume listas IN (?, ?, ...)."""
+    sql = SQL_STRINGS.sub("?", sql.replace("%s", "?"))
+    sql = SQL_NUMBERS.sub("?", sql)
+    sql = SQL_IN_LISTS.sub("(...)", sql)
+    return SQL_SPACES.sub(" ", sql).strip()
+
+
+def call_site(limit=3):
+    """Os frames mais internos do código do projeto (view, serializer...)."""
+    sites = []
+    frame = sys._getframe(1)
+    while frame is not None and len(sites) < limit:
+        filename = frame.f_code.co_filename
+        if not any(part in filename for part in LIBRARY_PATHS) and not filename.startswith("<"):
+            sites.append(f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_qualname}:{frame.f_lineno}")
+        frame = frame.f_back
+    return sites
+
+
+def explain(connection, sql, params):
+    if many_statements(sql) or not sql.lstrip().upper().startswith("SELECT"):
+        return None
+    prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+    token = _explaining.set(True)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+    except DatabaseError:
+        return None
+    finally:
+        _explaining.reset(token)
+
+
+def many_statements(sql):
+    return ";" in sql.rstrip().rstrip(";")
+
+
+def log_slow_query(connection, sql, params, many, elapsed):
+    plan = None if many else explain(connection, sql, params)
+    site = _site.get()
+    sites = call_site()
+    slow_query_logger.warning(
+        "Consulta lenta (%.1f ms)%s\n  SQL: %s\n  Origem: %s\n  Plano:\n    %s",
+        elapsed * 1000,
+        f" [{site}]" if site else "",
+        normalize_sql(sql),
+        " <- ".join(sites) or "?",
+        (plan or "indisponível").replace("\n", "\n    "),
+        extra={
+            "duration_ms": round(elapsed * 1000, 1),
+            "sql": normalize_sql(sql),
+            "site": site,
+            "call_site": sites,
+            "plan": plan,
+        },
+    )
+
+
+# -------------------------------------------------------------
+# 3. PONTOS INSTRUMENTADOS (auth, render, arquivos)
+# -------------------------------------------------------------
+class TimedTokenAuthentication(TokenAuthentication):
+    def authenticate(self, request):
+        with phase("auth"):
+            return super().authenticate(request)
+
+
+class TimedJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with phase("render"):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class TimedFileSystemStorage(FileSystemStorage):
+    """FileSystemStorage com o tempo de gravação/leitura/remoção na fase `files`."""
+
+    def _save(self, name, content):
+        with phase("files"):
+            return super()._save(name, content)
+
+    def _open(self, name, mode="rb"):
+        with phase("files"):
+            return super()._open(name, mode)
+
+    def delete(self, name):
+        with phase("files"):
+            return super().delete(name)
@@ -0,0 +1,180 @@
+# vagali_project/metrics.py
+
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+
+# Limites dos baldes do histograma de latência (segundos)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PHASES = ("db", "auth", "render", "files")
+
+
+def metrics_dir():
+    path = getattr(settings, "METRICS_DIR", None)
+    if not path:
+        # /dev/shm quando existe: "memória compartilhada" entre os workers
+        base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        path = os.path.join(base, "vagali-metrics")
+    return Path(path)
+
+
+# -------------------------------------------------------------
+# 1. REGISTRO DO PROCESSO
+# -------------------------------------------------------------
+class Registry:
+    """
+    Contadores do worker atual, em memória (um lock curto por requisição).
+    Cada worker grava periodicamente um arquivo próprio (<pid>.json) no
+    diretório compartilhado; /metrics soma os arquivos de todos — sem
+    lock entre processos.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.series = {}
+        self.pid = os.getpid()
+        self.flushed_at = 0.0
+
+    def observe(self, view, method, status, seconds, timings):
+        key = f"{view}|{method}"
+        with self.lock:
+            # processo filho após fork herda o registro do pai: recomeça do zero
+            if os.getpid() != self.pid:
+                self.series, self.pid = {}, os.getpid()
+            entry = self.series.get(key)
+            if entry is None:
+                entry = self.series[key] = {
+                    "buckets": [0] * (len(BUCKETS) + 1),
+                    "sum": 0.0,
+                    "count": 0,
+                    "status": {},
+                    "queries": 0,
+                    "phases": {},
+                }
+            entry["buckets"][bisect.bisect_left(BUCKETS, seconds)] += 1
+            entry["sum"] += seconds
+            entry["count"] += 1
+            status_class = f"{status // 100}xx"
+            entry["status"][status_class] = entry["status"].get(status_class, 0) + 1
+            entry["queries"] += timings.queries
+            for name, value in timings.phases.items():
+                entry["phases"][name] = entry["phases"].get(name, 0.0) + value
+
+        interval = getattr(settings, "METRICS_FLUSH_INTERVAL", 1.0)
+        if time.monotonic() - self.flushed_at >= interval and self.flush_lock.acquire(blocking=False):
+            try:
+                self.flush()
+            finally:
+                self.flush_lock.release()
+
+    def snapshot(self):
+        with self.lock:
+            return json.loads(json.dumps(self.series))
+
+    def flush(self):
+        self.flushed_at = time.monotonic()
+        directory = metrics_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        target = directory / f"{self.pid}.json"
+        tmp = directory / f".{self.pid}.tmp"
+        tmp.write_text(json.dumps(self.snapshot()), encoding="utf-8")
+        os.replace(tmp, target)
+
+
+registry = Registry()
+
+
+# -------------------------------------------------------------
+# 2. AGREGAÇÃO E FORMATO DE TEXTO DO PROMETHEUS
+# -------------------------------------------------------------
+def collect():
+    """Soma os arquivos de todos os workers (inclusive os já encerrados)."""
+    with registry.flush_lock:
+        registry.flush()
+    total = {}
+    for path in metrics_dir().glob("*.json"):
+        try:
+            series = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        for key, entry in series.items():
+            merged = total.setdefault(
+                key,
+                {"buckets": [0] * (len(BUCKETS) + 1), "sum": 0.0, "count": 0, "status": {}, "queries": 0, "phases": {}},
+            )
+            merged["buckets"] = [a + b for a, b in zip(merged["buckets"], entry["buckets"])]
+            merged["sum"] += entry["sum"]
+            merged["count"] += entry["count"]
+            merged["queries"] += entry["queries"]
+            for name, value in entry["status"].items():
+                merged["status"][name] = merged["status"].get(name, 0) + value
+            for name, value in entry["phases"].items():
+                merged["phases"][name] = merged["phases"].get(name, 0.0) + value
+    return total
+
+
+def _labels(**labels):
+    return ",".join(f'{name}="{value}"' for name, value in labels.items())
+
+
+def render(series):
+    lines = [
+        "# HELP vagali_http_request_duration_seconds Latência das requisições por view.",
+        "# TYPE vagali_http_request_duration_seconds histogram",
+    ]
+    for key in sorted(series):
+        view, method = key.split("|", 1)
+        entry = series[key]
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ("+Inf",), entry["buckets"]):
+            cumulative += count
+            lines.append(
+                f"vagali_http_request_duration_seconds_bucket{{{_labels(view=view, method=method, le=bound)}}} {cumulative}"
+            )
+        lines.append(f"vagali_http_request_duration_seconds_sum{{{_labels(view=view, method=method)}}} {entry['sum']:.6f}")
+        lines.append(f"vagali_http_request_duration_seconds_count{{{_labels(view=view, method=method)}}} {entry['count']}")
+
+    lines += ["# HELP vagali_http_responses_total Respostas por classe de status.", "# TYPE vagali_http_responses_total counter"]
+    for key in sorted(series):
+        view, method = key.split("|", 1)
+        for status, count in sorted(series[key]["status"].items()):
+            lines.append(f"vagali_http_responses_total{{{_labels(view=view, method=method, status=status)}}} {count}")
+
+    lines += ["# HELP vagali_db_queries_total Consultas SQL executadas.", "# TYPE vagali_db_queries_total counter"]
+    for key in sorted(series):
+        view, method = key.split("|", 1)
+        lines.append(f"vagali_db_queries_total{{{_labels(view=view, method=method)}}} {series[key]['queries']}")
+
+    lines += [
+        "# HELP vagali_phase_seconds_total Tempo acumulado por fase (db, auth, render, files).",
+        "# TYPE vagali_phase_seconds_total counter",
+    ]
+    for key in sorted(series):
+        view, method = key.split("|", 1)
+        for name in PHASES:
+            value = series[key]["phases"].get(name)
+            if value is not None:
+                lines.append(f"vagali_phase_seconds_total{{{_labels(view=view, method=method, phase=name)}}} {value:.6f}")
+
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    """
+    /metrics no formato de texto do Prometheus. Liberado para os IPs de
+    settings.METRICS_ALLOWED_IPS e para usuários staff.
+    """
+    allowed = getattr(settings, "METRICS_ALLOWED_IPS", ("127.0.0.1", "::1"))
+    if request.META.get("REMOTE_ADDR") not in allowed and not request.user.is_staff:
+        return HttpResponseForbidden("Acesso negado.")
+    return HttpResponse(render(collect()), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,70 @@
+# vagali_project/middleware.py
+
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from vagali_project import instrumentation
+from vagali_project.metrics import PHASES, registry
+
+
+class InstrumentationMiddleware:
+    """
+    Mede cada requisição: tempo total, SQL (consultas e tempo, via
+    execute_wrapper), autenticação, renderização e arquivos.
+
+    - Server-Timing com as fases (DevTools do navegador mostra a quebra);
+    - X-DB-Queries com o número de consultas (manage.py loadtest), só com
+      settings.QUERY_COUNT_HEADER;
+    - histograma por view para o /metrics (vagali_project/metrics.py).
+
+    Deve ser o primeiro middleware, para que o total inclua os demais.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, "SERVER_TIMING_HEADER", True)
+        self.query_count = getattr(settings, "QUERY_COUNT_HEADER", False)
+
+    def __call__(self, request):
+        timings, token = instrumentation.start()
+        wrappers = [connections[alias].execute_wrapper(instrumentation.sql_timer(timings)) for alias in connections]
+        started = time.perf_counter()
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        try:
+            response = self.get_response(request)
+        finally:
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+            instrumentation.stop(token)
+        total = time.perf_counter() - started
+
+        if self.server_timing:
+            response["Server-Timing"] = self.header(timings, total)
+        if self.query_count:
+            response["X-DB-Queries"] = str(timings.queries)
+
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name or match.url_name or "unnamed") if match else "unmatched"
+        registry.observe(view, request.method, response.status_code, total, timings)
+        return response
+
+    @staticmethod
+    def header(timings, total):
+        parts = []
+        measured = 0.0
+        for name in PHASES:
+            seconds = timings.phases.get(name)
+            if seconds is None:
+                continue
+            measured += seconds
+            entry = f"{name};dur={seconds * 1000:.1f}"
+            if name == "db":
+                entry += f';desc="{timings.queries} queries"'
+            parts.append(entry)
+        # restante: código das views/serializers e middlewares
+        parts.append(f"app;dur={max(0.0, total - measured) * 1000:.1f}")
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
@@ -0,0 +1,288 @@
+# vagali_project/mp4.py
+"""
+Leitura de MP4/MOV (ISO BMFF) em streaming, com memória limitada:
+
+- scan(): percorre só os cabeçalhos das caixas de topo (seek por cima
+  do mdat), validando tamanhos;
+- probe(): duração, resolução e codec a partir do moov;
+- faststart(): reescreve o arquivo com o moov antes do mdat, corrigindo
+  os offsets de stco/co64, para o navegador começar a tocar com os
+  primeiros KB em vez de baixar o arquivo quase inteiro.
+
+Só o moov (metadados, tipicamente alguns KB a poucos MB) vai para a
+memória, até MAX_MOOV_SIZE; o mdat é copiado em blocos.
+"""
+
+import struct
+from collections import namedtuple
+
+
+# --- Status do processamento de vídeo (PortfolioItem, Demanda) ---
+VIDEO_STATUS_CHOICES = [
+    ('pendente', 'Pendente'),
+    ('pronto', 'Pronto'),
+    ('invalido', 'Inválido'),
+]
+
+MAX_MOOV_SIZE = 64 * 1024 * 1024
+MAX_TOP_LEVEL_BOXES = 10_000
+COPY_CHUNK = 1024 * 1024
+
+# caixas que só contêm outras caixas (caminho até stco/co64 e metadados)
+CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl", b"edts", b"dinf", b"mvex"}
+
+CODECS = {
+    b"avc1": "h264",
+    b"avc3": "h264",
+    b"hvc1": "hevc",
+    b"hev1": "hevc",
+    b"av01": "av1",
+    b"vp09": "vp9",
+    b"mp4v": "mpeg4",
+}
+
+
+class Mp4Error(ValueError):
+    """Arquivo que não é um MP4/MOV válido (ou que não conseguimos ler)."""
+
+
+Box = namedtuple("Box", "type offset size header")
+
+VideoInfo = namedtuple("VideoInfo", "duration width height codec")
+
+
+# ---------------------------------------------------------
+# 1. Caixas de topo
+# ---------------------------------------------------------
+def _file_size(fh):
+    fh.seek(0, 2)
+    return fh.tell()
+
+
+def scan(fh):
+    """Caixas de topo do arquivo, na ordem. Mp4Error se a estrutura não fecha."""
+    end = _file_size(fh)
+    boxes, offset = [], 0
+    while offset < end:
+        if len(boxes) >= MAX_TOP_LEVEL_BOXES:
+            raise Mp4Error("Caixas demais no nível de topo.")
+        fh.seek(offset)
+        head = fh.read(8)
+        if len(head) < 8:
+            raise Mp4Error(f"Cabeçalho truncado em {offset}.")
+        size, kind = struct.unpack(">I4s", head)
+        header = 8
+        if size == 1:
+            large = fh.read(8)
+            if len(large) < 8:
+                raise Mp4Error(f"Cabeçalho truncado em {offset}.")
+            size, header = struct.unpack(">Q", large)[0], 16
+        elif size == 0:
+            size = end - offset
+        if not all(32 <= byte < 127 for byte in kind):
+            raise Mp4Error(f"Tipo de caixa inválido em {offset}.")
+        if size < header or offset + size > end:
+            raise Mp4Error(f"Caixa {kind.decode()} com tamanho inválido em {offset}.")
+        boxes.append(Box(kind, offset, size, header))
+        offset += size
+
+    types = {box.type for box in boxes}
+    if b"moov" not in types:
+        raise Mp4Error("Arquivo sem moov (não é MP4/MOV ou está incompleto).")
+    if b"mdat" not in types and b"moof" not in types:
+        raise Mp4Error("Arquivo sem mdat.")
+    return boxes
+
+
+def _find(boxes, kind):
+    return next(box for box in boxes if box.type == kind)
+
+
+def read_moov(fh, boxes):
+    moov = _find(boxes, b"moov")
+    if moov.size > MAX_MOOV_SIZE:
+        raise Mp4Error("moov grande demais.")
+    fh.seek(moov.offset)
+    data = fh.read(moov.size)
+    if len(data) != moov.size:
+        raise Mp4Error("moov truncado.")
+    return data
+
+
+def needs_faststart(boxes):
+    """moov depois do primeiro mdat: o player precisa do fim do arquivo."""
+    types = [box.type for box in boxes]
+    return b"mdat" in types and types.index(b"moov") > types.index(b"mdat")
+
+
+# ---------------------------------------------------------
+# 2. Dentro do moov
+# ---------------------------------------------------------
+def _children(data, start, end):
+    """(tipo, início, tamanho do cabeçalho, fim) das caixas em data[start:end]."""
+    offset = start
+    while offset + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", data, offset)
+        header = 8
+        if size == 1:
+            if offset + 16 > end:
+                raise Mp4Error("Caixa truncada no moov.")
+            size, header = struct.unpack_from(">Q", data, offset + 8)[0], 16
+        elif size == 0:
+            size = end - offset
+        if size < header or offset + size > end:
+            raise Mp4Error(f"Caixa {kind.decode(errors='replace')} truncada no moov.")
+        yield kind, offset, header, offset + size
+        offset += size
+
+
+def _child(data, start, end, kind):
+    for found, offset, header, box_end in _children(data, start, end):
+        if found == kind:
+            return offset + header, box_end
+    return None
+
+
+def _path(data, start, end, *kinds):
+    span = (start, end)
+    for kind in kinds:
+        span = _child(data, span[0], span[1], kind)
+        if span is None:
+            return None
+    return span
+
+
+def _duration(data, moov):
+    mvhd = _child(data, *moov, b"mvhd")
+    if mvhd is None:
+        raise Mp4Error("moov sem mvhd.")
+    start = mvhd[0]
+    if data[start] == 1:
+        timescale, duration = struct.unpack_from(">IQ", data, start + 20)
+    else:
+        timescale, duration = struct.unpack_from(">II", data, start + 12)
+    return round(duration / timescale, 3) if timescale else None
+
+
+def probe_moov(data, header=8):
+    """VideoInfo da primeira faixa de vídeo do moov `data`. Mp4Error se não houver."""
+    moov = (header, len(data))
+    try:
+        duration = _duration(data, moov)
+        for kind, offset, header, end in _children(data, *moov):
+            if kind != b"trak":
+                continue
+            trak = (offset + header, end)
+            hdlr = _path(data, *trak, b"mdia", b"hdlr")
+            if hdlr is None or data[hdlr[0] + 8:hdlr[0] + 12] != b"vide":
+                continue
+            tkhd = _child(data, *trak, b"tkhd")
+            width = height = None
+            if tkhd is not None and tkhd[1] - tkhd[0] >= 8:
+                # largura/altura: os dois últimos campos, ponto fixo 16.16
+                width, height = (value >> 16 for value in struct.unpack_from(">II", data, tkhd[1] - 8))
+            stsd = _path(data, *trak, b"mdia", b"minf", b"stbl", b"stsd")
+            codec = None
+            if stsd is not None and stsd[1] - stsd[0] >= 16:
+                fourcc = data[stsd[0] + 12:stsd[0] + 16]
+                codec = CODECS.get(fourcc, fourcc.decode("ascii", errors="replace").strip())
+            return VideoInfo(duration, width, height, codec)
+    except struct.error:
+        raise Mp4Error("moov corrompido.")
+    raise Mp4Error("Nenhuma faixa de vídeo.")
+
+
+def probe(fh):
+    """(VideoInfo, caixas de topo) do arquivo aberto em modo binário."""
+    boxes = scan(fh)
+    return probe_moov(read_moov(fh, boxes), _find(boxes, b"moov").header), boxes
+
+
+# ---------------------------------------------------------
+# 3. Fast start — moov antes do mdat
+# ---------------------------------------------------------
+class _Overflow(Exception):
+    pass
+
+
+def _rebuild(data, start, end, relocate, wide):
+    """
+    Bytes das caixas em data[start:end] com os offsets de blocos
+    (stco/co64) passados por `relocate`. Com `wide`, stco vira co64.
+    """
+    out = bytearray()
+    for kind, offset, header, box_end in _children(data, start, end):
+        if kind in CONTAINERS:
+            body = _rebuild(data, offset + header, box_end, relocate, wide)
+            out += struct.pack(">I4s", 8 + len(body), kind) + body
+            continue
+        if kind in (b"stco", b"co64"):
+            payload = offset + header
+            version_flags, count = struct.unpack_from(">4sI", data, payload)
+            fmt = ">%dI" % count if kind == b"stco" else ">%dQ" % count
+            entries = [relocate(value) for value in struct.unpack_from(fmt, data, payload + 8)]
+            if kind == b"stco" and not wide and entries and max(entries) > 0xFFFFFFFF:
+                raise _Overflow()
+            if kind == b"co64" or wide:
+                body = version_flags + struct.pack(">I%dQ" % count, count, *entries)
+                out += struct.pack(">I4s", 8 + len(body), b"co64") + body
+            else:
+                body = version_flags + struct.pack(">I%dI" % count, count, *entries)
+                out += struct.pack(">I4s", 8 + len(body), b"stco") + body
+            continue
+        out += data[offset:box_end]
+    return out
+
+
+def _relocated_moov(moov_data, moov_box, insert_at):
+    """Novo moov para ficar em `insert_at` (antes do primeiro mdat)."""
+    old_start, old_end = moov_box.offset, moov_box.offset + moov_box.size
+    wide = False
+    while True:
+        size = 8 + len(_rebuild(moov_data, moov_box.header, len(moov_data), lambda value: value, wide))
+
+        def relocate(value):
+            if insert_at <= value < old_start:
+                return value + size
+            if value >= old_end:
+                return value + size - moov_box.size
+            return value
+
+        try:
+            body = _rebuild(moov_data, moov_box.header, len(moov_data), relocate, wide)
+        except _Overflow:
+            wide = True
+            continue
+        return struct.pack(">I4s", 8 + len(body), b"moov") + body
+
+
+def _copy(src, dst, offset, size):
+    src.seek(offset)
+    while size > 0:
+        chunk = src.read(min(COPY_CHUNK, size))
+        if not chunk:
+            raise Mp4Error("Arquivo encurtou durante a cópia.")
+        dst.write(chunk)
+        size -= len(chunk)
+
+
+def faststart(src, dst, boxes=None):
+    """
+    Copia `src` para `dst` com o moov na frente do primeiro mdat. Devolve
+    False (sem escrever nada) se o arquivo já está em ordem.
+    """
+    boxes = boxes or scan(src)
+    if not needs_faststart(boxes):
+        return False
+
+    moov_box = _find(boxes, b"moov")
+    mdat = _find(boxes, b"mdat")
+    moov = _relocated_moov(read_moov(src, boxes), moov_box, mdat.offset)
+
+    for box in boxes:
+        if box is moov_box:
+            continue
+        if box is mdat:
+            dst.write(moov)
+        _copy(src, dst, box.offset, box.size)
+    return True
@@ -0,0 +1,117 @@
+# vagali_project/profiling.py
+
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+
+PROFILE_PARAM = "__profile"
+PROFILE_HEADER = "X-Profile"
+
+
+# -------------------------------------------------------------
+# 1. AMOSTRADOR (stdlib, só a thread da requisição)
+# -------------------------------------------------------------
+def frame_label(frame):
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{code.co_qualname}:{frame.f_lineno}"
+
+
+class Sampler:
+    """
+    Lê a pilha da thread alvo a cada `interval` segundos via
+    sys._current_frames() e conta as pilhas no formato "collapsed"
+    (a;b;c N), pronto para flamegraph.pl / speedscope.
+    """
+
+    def __init__(self, thread_id, interval=0.005, max_seconds=30.0):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="vagali-profiler", daemon=True)
+
+    def _run(self):
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+# -------------------------------------------------------------
+# 2. MIDDLEWARE — ?__profile=1 ou cabeçalho X-Profile: 1 (staff)
+# -------------------------------------------------------------
+def _staff_user(request):
+    """
+    Staff por sessão (admin) ou por token — o token do DRF só seria lido
+    dentro da view, então é verificado aqui antes de ligar o amostrador.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    try:
+        result = TokenAuthentication().authenticate(request)
+    except exceptions.AuthenticationFailed:
+        return False
+    return bool(result and result[0].is_staff)
+
+
+class ProfilingMiddleware:
+    """
+    Roda a requisição sob o amostrador e devolve, no lugar da resposta,
+    o arquivo de pilhas colapsadas (o status original vai em
+    X-Profiled-Status). Pedidos de quem não é staff seguem normalmente.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        wanted = request.GET.get(PROFILE_PARAM) or request.headers.get(PROFILE_HEADER)
+        if not wanted or wanted == "0" or not _staff_user(request):
+            return self.get_response(request)
+
+        interval = getattr(settings, "PROFILER_INTERVAL", 0.005)
+        started = time.perf_counter()
+        with Sampler(threading.get_ident(), interval=interval) as sampler:
+            response = self.get_response(request)
+            # respostas em streaming são consumidas aqui, dentro do perfil
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+        elapsed = time.perf_counter() - started
+
+        profile = HttpResponse(sampler.collapsed(), content_type="text/plain; charset=utf-8")
+        profile["Content-Disposition"] = f'attachment; filename="profile-{int(time.time())}.collapsed"'
+        profile["X-Profiled-Status"] = str(response.status_code)
+        profile["X-Profile-Samples"] = str(sampler.samples)
+        profile["X-Profile-Duration-Ms"] = f"{elapsed * 1000:.1f}"
+        return profile
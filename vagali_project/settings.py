@@ -1,5 +1,6 @@
 # settings.py
 
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -24,6 +25,7 @@ INSTALLED_APPS = [
     # Seus apps
     "accounts",
     "app_servicos",
+    "spa",
 
     # Terceiros
     "corsheaders",
@@ -39,6 +41,10 @@ AUTH_USER_MODEL = "accounts.User"
 # MIDDLEWARE
 # -------------------------------------------------------------
 MIDDLEWARE = [
+    # Server-Timing, X-DB-Queries e histogramas do /metrics — fica em
+    # primeiro para medir a requisição inteira (vagali_project/middleware.py)
+    "vagali_project.middleware.InstrumentationMiddleware",
+
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
 
@@ -48,10 +54,34 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+
+    # ?__profile=1 / X-Profile: 1 (staff) -> pilhas colapsadas para flamegraph
+    "vagali_project.profiling.ProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Instrumentação
+SERVER_TIMING_HEADER = True
+QUERY_COUNT_HEADER = DEBUG  # X-DB-Queries, lido por manage.py loadtest
+METRICS_DIR = None  # padrão: /dev/shm/vagali-metrics (um arquivo por worker)
+METRICS_FLUSH_INTERVAL = 1.0
+METRICS_ALLOWED_IPS = ["127.0.0.1", "::1"]
+PROFILER_INTERVAL = 0.005  # segundos entre amostras do perfil sob demanda
+SLOW_QUERY_MS = 200  # None desliga o log de consultas lentas
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        # SQL normalizado, plano (EXPLAIN) e origem no código
+        "vagali.slow_query": {"handlers": ["console"], "level": "WARNING", "propagate": False},
+    },
+}
+
 # -------------------------------------------------------------
 # CORS CONFIG (CORRETA)
 # -------------------------------------------------------------
@@ -104,6 +134,20 @@ DATABASES = {
     }
 }
 
+# Shards por região de CEP (app_servicos/sharding.py): VAGALI_SHARDS=N usa
+# "default" + shard1..shardN-1, cada um com uma faixa igual das regiões
+# 00-99. Demanda/Offer/Feedback ficam no shard da região; o resto no default.
+VAGALI_SHARDS = max(1, int(os.environ.get("VAGALI_SHARDS", "1")))
+CEP_SHARDS = []
+for _n in range(VAGALI_SHARDS):
+    _alias = "default" if _n == 0 else f"shard{_n}"
+    if _n:
+        DATABASES[_alias] = {"ENGINE": "django.db.backends.sqlite3", "NAME": BASE_DIR / f"db_shard{_n}.sqlite3"}
+    CEP_SHARDS.append((f"{100 * _n // VAGALI_SHARDS:02d}", f"{100 * (_n + 1) // VAGALI_SHARDS - 1:02d}", _alias))
+del _n, _alias
+
+DATABASE_ROUTERS = ["app_servicos.sharding.CepShardRouter"]
+
 # -------------------------------------------------------------
 # AUTH CONFIG
 # -------------------------------------------------------------
@@ -133,12 +177,64 @@ STATIC_URL = "/static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# FileSystemStorage com o tempo de I/O de arquivos no Server-Timing
+STORAGES = {
+    "default": {"BACKEND": "vagali_project.instrumentation.TimedFileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+# Catálogo de serviços (app_servicos/catalog.py): o cache é por processo
+# (LocMemCache) e a invalidação por sinal só vale no worker que salvou;
+# os outros enxergam a mudança em até este tempo
+SERVICE_CATALOG_CACHE_SECONDS = 60
+
+# Expiração (manage.py expire_stale)
+DEMANDA_EXPIRY_DAYS = 30  # demanda pendente sem aceite
+OFFER_EXPIRY_DAYS = 14  # oferta pendente sem resposta
+
+# Arquivo (manage.py archive_closed): demandas encerradas há mais tempo
+# saem das tabelas quentes
+ARCHIVE_AFTER_MONTHS = 6
+
+# Sincronização incremental (?since=): lápides mais velhas que isto são
+# apagadas pelo archive_closed; cursores anteriores recebem 410
+SYNC_TOMBSTONE_DAYS = 30
+
+# E-mail: o request só grava na outbox (accounts/mail.py) e
+# `manage.py send_emails` entrega em lotes pelo EMAIL_DELIVERY_BACKEND.
+# Para testar local: `python -m aiosmtpd -n -l localhost:1025` + EMAIL_PORT=1025
+EMAIL_BACKEND = "accounts.mail.OutboxBackend"
+EMAIL_DELIVERY_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+EMAIL_HOST = os.environ.get("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.environ.get("EMAIL_PORT", "25"))
+EMAIL_TIMEOUT = 10  # segundos por operação SMTP (worker, não request)
+EMAIL_OUTBOX_MAX_ATTEMPTS = 8
+EMAIL_OUTBOX_RETRY_SECONDS = 30  # 30 s, 1 min, 2 min... até 1 h
+EMAIL_OUTBOX_RETENTION_DAYS = 7  # enviadas são apagadas depois disso
+
+# Link do e-mail de reset: rota /password-reset/confirm da SPA
+DJOSER = {
+    "PASSWORD_RESET_CONFIRM_URL": "password-reset/confirm?uid={uid}&token={token}",
+}
+
+# SPA (React/Vite): `npm run build` gera SPA_BUILD_DIR e
+# `manage.py build_spa` publica em SPA_ASSETS_DIR (hash + .br/.gz), um
+# symlink para o build atual em spa_build.builds/
+SPA_BUILD_DIR = BASE_DIR / "vagali_frontend" / "dist"
+SPA_ASSETS_DIR = BASE_DIR / "spa_build"
+
 # -------------------------------------------------------------
 # DRF CONFIG (ATUALIZADA)
 # -------------------------------------------------------------
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        # TokenAuthentication com o tempo na fase "auth" do Server-Timing
+        "vagali_project.instrumentation.TimedTokenAuthentication",
+    ],
+
+    "DEFAULT_RENDERER_CLASSES": [
+        "vagali_project.instrumentation.TimedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ],
 
     # ⚠️ PERMISSÕES MAIS SEGURAS — Views definem seus controles
@@ -147,6 +243,7 @@ REST_FRAMEWORK = {
     ],
 
     "DEFAULT_FILTER_BACKENDS": [
+        "vagali_project.filters.IdsFilter",  # ?ids=1,2,3
         "rest_framework.filters.SearchFilter",
         "django_filters.rest_framework.DjangoFilterBackend",
     ],
@@ -157,6 +254,20 @@ REST_FRAMEWORK = {
         "rest_framework.parsers.FormParser",
         "rest_framework.parsers.MultiPartParser",
     ],
+
+    # 🔐 LOGIN — token bucket por IP e por conta (accounts/api/throttling.py);
+    # sem CACHES compartilhado (Redis/Memcached), o balde é por processo
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": "20/min",
+        "login_email": "5/min",
+    },
 }
 
+# -------------------------------------------------------------
+# LOGIN — pool limitado para o hash de senha
+# -------------------------------------------------------------
+LOGIN_HASH_WORKERS = 4        # threads calculando PBKDF2 ao mesmo tempo
+LOGIN_HASH_QUEUE_DEPTH = 16   # tentativas aguardando; acima disso -> 429
+LOGIN_HASH_TIMEOUT = 10       # segundos
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
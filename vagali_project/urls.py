@@ -2,7 +2,6 @@
 
 from django.contrib import admin
 from django.urls import path, include
-from django.views.generic import TemplateView
 
 from django.conf import settings
 from django.conf.urls.static import static
@@ -10,14 +9,21 @@ from django.conf.urls.static import static
 # IMPORTAÇÕES DA AUTENTICAÇÃO
 from accounts.api.views import CustomAuthToken
 from accounts.views import CadastroView
+from spa.views import SpaAssetView, SpaShellView
+from vagali_project.metrics import metrics_view
 
 
 urlpatterns = [
     # ------------------ ROTAS ADMINISTRATIVAS E TRADICIONAIS (HTML) ------------------
     path('admin/', admin.site.urls),
 
-    # Se você estiver servindo o React pelo Django (index.html em templates/)
-    path('', TemplateView.as_view(template_name='index.html'), name='home'),
+    # Métricas no formato do Prometheus (vagali_project/metrics.py)
+    path('metrics', metrics_view, name='metrics'),
+
+    # React servido pelo Django: index.html com ETag e assets com hash,
+    # pré-comprimidos e cache imutável (ver spa/ e manage.py build_spa)
+    path('', SpaShellView.as_view(), name='home'),
+    path('assets/<path:path>', SpaAssetView.as_view(), name='spa-asset'),
 
     # ------------------ ROTAS DA API (Django REST Framework) ------------------
 